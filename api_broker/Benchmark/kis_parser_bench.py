@@ -0,0 +1,106 @@
+"""
+KIS 실시간 프레임 파서 처리량 측정
+-> 기존 방식(split 후 한글 컬럼 dict 생성)과 realtime_parser 비교
+
+[ 실행 ]
+python -m api_broker.Benchmark.kis_parser_bench [기록된 프레임 파일] [--repeat N]
+-> 프레임 파일은 한 줄에 프레임 하나(없으면 합성 프레임 사용)
+"""
+from ..KIS.constants import COLUMN_TO_KOR_DICT
+from ..KIS.realtime_parser import (
+    ORDERBOOK_COLUMNS, TRADE_COLUMNS,
+    split_frame, parse_orderbook, parse_trade,
+)
+
+from typing import List
+import argparse
+import random
+import time
+
+def make_frames(count: int, records_per_frame: int = 3) -> List[str]:
+    """
+    합성 프레임 생성(호가/체결가 반반, 체결가는 여러 레코드 포함)
+    """
+    frames = []
+    for i in range(count):
+        price = f"{random.uniform(100, 300):.4f}"
+        if i % 2 == 0:
+            fields = ["DNASAAPL", "AAPL", "4", "20250101", "093000", "20250101", "233000",
+                      "100", "200", "1", "-1", price, price, "10", "20", "0", "0"]
+            frames.append("0|HDFSASP0|001|" + "^".join(fields))
+        else:
+            records = []
+            for _ in range(records_per_frame):
+                fields = ["DNASAAPL", "AAPL", "4", "20250101", "20250101", "093000", "20250101", "233000",
+                          price, price, price, price, "2", "0.5", "0.2", price, price, "10", "20",
+                          "5", "1000", "100000", "500", "500", "100", "1"]
+                records.append("^".join(fields))
+            frames.append(f"0|HDFSCNT0|{records_per_frame:03d}|" + "^".join(records))
+    return frames
+
+def legacy_parse(resp: str):
+    """
+    기존 KISBroker 방식(첫 레코드만 처리)
+    """
+    tr_id = resp.split("|")[1]
+    if tr_id == "HDFSASP0":
+        columns = list(ORDERBOOK_COLUMNS)
+        real_data = resp.split("|")[-1].split("^")
+        resp_dict = {COLUMN_TO_KOR_DICT[col]: value for col, value in zip(columns, real_data)}
+        return [{
+            "symbol": resp_dict["종목코드"].replace("DNAS", ""),
+            "bids": [{"price": float(resp_dict["매수호가1"]), "quantity": float(resp_dict["매수잔량1"])}],
+            "asks": [{"price": float(resp_dict["매도호가1"]), "quantity": float(resp_dict["매도잔량1"])}],
+        }]
+    else:
+        columns = list(TRADE_COLUMNS)
+        real_data = resp.split("|")[-1].split("^")
+        resp_dict = {COLUMN_TO_KOR_DICT[col]: value for col, value in zip(columns, real_data)}
+        return [{
+            "symbol": resp_dict["종목코드"].replace("DNAS", ""),
+            "price": float(resp_dict["현재가"]) if resp_dict["현재가"] else 0.0,
+            "quantity": float(resp_dict["체결량"]) if resp_dict["체결량"] else 0.0,
+            "time": resp_dict["한국시간"],
+        }]
+
+def compiled_parse(resp: str):
+    """
+    realtime_parser 방식(모든 레코드 처리)
+    """
+    _, tr_id, count, body = split_frame(resp)
+    if tr_id == "HDFSASP0":
+        return parse_orderbook(body, count)
+    return parse_trade(body, count)
+
+def measure(parse, frames: List[str], repeat: int):
+    records = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            records += len(parse(frame))
+    elapsed = time.perf_counter() - start
+    return len(frames) * repeat / elapsed, records / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="KIS realtime frame parser benchmark")
+    parser.add_argument("frames", nargs="?", help="recorded frames file(one frame per line)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--count", type=int, default=10000, help="synthetic frame count")
+    args = parser.parse_args()
+
+    if args.frames:
+        with open(args.frames, encoding="utf-8") as f:
+            frames = [
+                line.rstrip("\n") for line in f
+                if line.startswith("0|HDFSASP0|") or line.startswith("0|HDFSCNT0|")
+            ]
+    else:
+        frames = make_frames(args.count)
+
+    print(f"frames : {len(frames)}, repeat : {args.repeat}")
+    for name, parse in (("legacy", legacy_parse), ("compiled", compiled_parse)):
+        frames_per_sec, records_per_sec = measure(parse, frames, args.repeat)
+        print(f"{name:>8} : {frames_per_sec:,.0f} frames/s, {records_per_sec:,.0f} records/s")
+
+if __name__ == "__main__":
+    main()
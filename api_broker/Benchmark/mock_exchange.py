@@ -0,0 +1,504 @@
+"""
+Binance/KIS REST API 대역 서버(오프라인 벤치마크/회귀 확인용)
+-> 캔들 백필, 주문 일괄 전송, 요청 제한 처리를 실제 키/네트워크 없이 측정
+-> 같은 요청에는 항상 같은 데이터(심볼/시각 기반 시드)
+-> 응답 지연, 오류 주입(429/418, KIS rt_cd 오류), 요청 제한(가중치/초당 건수) 설정 가능
+-> 주문/미체결 주문은 서버 메모리에만 보관
+
+[ 실행 ]
+python -m api_broker.Benchmark.mock_exchange [--port 8900] [--latency-ms 20] [--jitter-ms 5]
+    [--error-rate 0.01] [--weight-limit 6000] [--kis-tps 20] [--seed 0]
+
+[ 서버 연결 ]
+BINANCE_API_URL=http://127.0.0.1:8900
+KIS_API_URL=http://127.0.0.1:8900
+"""
+from typing import Dict, Any, Optional, Tuple
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qsl
+from datetime import datetime, timedelta, timezone
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+
+# (메서드, 경로) -> 요청 가중치(목록에 없으면 1)
+# -> Binance/common.py의 ENDPOINT_WEIGHTS와 같은 값(서버 측 계산)
+BINANCE_WEIGHTS = {
+    ("GET", "/api/v3/exchangeInfo"): 20,
+    ("GET", "/api/v3/klines"): 2,
+    ("GET", "/api/v3/openOrders"): 6,
+    ("POST", "/sapi/v3/asset/getUserAsset"): 5,
+    ("GET", "/sapi/v1/simple-earn/account"): 150,
+}
+
+# Binance 거래 쌍(가격 단위, 수량 단위)
+BINANCE_SYMBOLS = {
+    "BTCUSDT": ("0.01", "0.00001"),
+    "USDCUSDT": ("0.0001", "1"),
+}
+
+# 캔들 간격(ms)
+KLINE_INTERVALS = {
+    "1m": 60_000,
+    "1h": 3_600_000,
+    "1d": 86_400_000,
+}
+
+# KIS 초당 거래건수 초과 응답
+KIS_RATE_LIMIT_RESPONSE = {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+# KIS 주입 오류 응답
+KIS_ERROR_RESPONSE = {"rt_cd": "1", "msg_cd": "APBK0013", "msg1": "주문 처리 중 오류가 발생했습니다.(mock)"}
+
+def _seed(*parts) -> int:
+    return int.from_bytes(hashlib.sha1("|".join(map(str, parts)).encode()).digest()[:8], "big")
+
+def base_price(symbol: str) -> float:
+    """
+    심볼별 고정 기준 가격
+    """
+    if symbol.upper() == "USDCUSDT":
+        return 1.0
+    return 10.0 + _seed(symbol.upper()) % 100000 / (1.0 if symbol.upper() == "BTCUSDT" else 100.0)
+
+def make_candle(symbol: str, open_time_ms: int) -> Dict[str, float]:
+    """
+    (심볼, 시작 시각)으로 결정되는 캔들
+    """
+    rng = random.Random(_seed(symbol.upper(), open_time_ms))
+    base = base_price(symbol)
+    open_price = base * (1 + rng.uniform(-0.05, 0.05))
+    close_price = open_price * (1 + rng.uniform(-0.01, 0.01))
+    high = max(open_price, close_price) * (1 + rng.uniform(0, 0.005))
+    low = min(open_price, close_price) * (1 - rng.uniform(0, 0.005))
+    volume = rng.uniform(1, 1000)
+    return {
+        "open": round(open_price, 4),
+        "high": round(high, 4),
+        "low": round(low, 4),
+        "close": round(close_price, 4),
+        "volume": round(volume, 4),
+        "quote_volume": round(volume * close_price, 4),
+        "trade_count": rng.randint(10, 5000),
+    }
+
+class MockExchange:
+    """
+    대역 서버 상태(주문, 요청 제한 카운터) 및 설정
+    """
+    def __init__(self, args):
+        self.latency = args.latency_ms / 1000.0
+        self.jitter = args.jitter_ms / 1000.0
+        self.error_rate = args.error_rate
+        self.weight_limit = args.weight_limit
+        self.kis_tps = args.kis_tps
+        self.ban_seconds = args.ban_seconds
+        self._rng = random.Random(args.seed)
+
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(1)
+        # 계정(API 키 또는 계좌번호) -> 주문번호 -> 주문
+        self.binance_orders: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.kis_orders: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+        # Binance : (분, 사용 가중치), 429 이후 요청 수, 차단 해제 시각
+        self._weight_window = (0, 0)
+        self._requests_after_429 = 0
+        self._banned_until = 0.0
+        # KIS : 앱키 -> (초, 요청 수)
+        self._kis_window: Dict[str, Tuple[int, int]] = {}
+
+        self.stats = {"requests": 0, "429": 0, "418": 0, "kis_rate_limit": 0, "injected": 0}
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        if self.latency + jitter > 0:
+            time.sleep(self.latency + jitter)
+
+    def inject_error(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            injected = self._rng.random() < self.error_rate
+            if injected:
+                self.stats["injected"] += 1
+            return injected
+
+    def use_weight(self, weight: int) -> Tuple[Optional[int], int]:
+        """
+        Binance 가중치 차감
+
+        Returns:
+            (오류 상태 코드(429/418) 또는 None, 현재 분의 사용 가중치)
+        """
+        now = time.time()
+        minute = int(now // 60)
+        with self._lock:
+            if now < self._banned_until:
+                self.stats["418"] += 1
+                return 418, self._weight_window[1]
+
+            window_minute, used = self._weight_window
+            if window_minute != minute:
+                used = 0
+                self._requests_after_429 = 0
+            used += weight
+            self._weight_window = (minute, used)
+
+            if used > self.weight_limit:
+                self._requests_after_429 += 1
+                # 429 이후에도 요청을 계속하면 차단
+                if self._requests_after_429 > 10:
+                    self._banned_until = now + self.ban_seconds
+                    self.stats["418"] += 1
+                    return 418, used
+                self.stats["429"] += 1
+                return 429, used
+            return None, used
+
+    def retry_after(self) -> int:
+        now = time.time()
+        if now < self._banned_until:
+            return int(self._banned_until - now) + 1
+        return 60 - int(now % 60)
+
+    def use_kis_tps(self, app_key: str) -> bool:
+        """
+        KIS 초당 거래건수 차감
+
+        Returns:
+            제한 초과 여부
+        """
+        second = int(time.time())
+        with self._lock:
+            window_second, count = self._kis_window.get(app_key, (0, 0))
+            if window_second != second:
+                count = 0
+            count += 1
+            self._kis_window[app_key] = (second, count)
+            if count > self.kis_tps:
+                self.stats["kis_rate_limit"] += 1
+                return True
+            return False
+
+    def next_order_id(self) -> int:
+        with self._lock:
+            return next(self._order_ids)
+
+    # [ Binance ]
+    def binance_exchange_info(self, params, account):
+        symbols = []
+        for symbol, (tick_size, step_size) in BINANCE_SYMBOLS.items():
+            symbols.append({
+                "symbol": symbol,
+                "status": "TRADING",
+                "baseAsset": symbol[:-4],
+                "quoteAsset": "USDT",
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": tick_size, "maxPrice": "1000000.00", "tickSize": tick_size},
+                    {"filterType": "LOT_SIZE", "minQty": step_size, "maxQty": "9000.00", "stepSize": step_size},
+                    {"filterType": "NOTIONAL", "minNotional": "5.00", "maxNotional": "9000000.00"},
+                ],
+            })
+        return 200, {"timezone": "UTC", "serverTime": int(time.time() * 1000), "symbols": symbols}
+
+    def binance_klines(self, params, account):
+        interval_ms = KLINE_INTERVALS.get(params.get("interval"))
+        if interval_ms is None:
+            return 400, {"code": -1120, "msg": "Invalid interval."}
+
+        limit = min(int(params.get("limit", 500)), 1000)
+        end_time = int(params.get("endTime", time.time() * 1000))
+        # KST(+09:00) 기준 캔들 경계
+        offset = 9 * 3_600_000 if params.get("timeZone") == "+09:00" else 0
+        last_open = (end_time + offset) // interval_ms * interval_ms - offset
+        first_open = last_open - (limit - 1) * interval_ms
+        if "startTime" in params:
+            first_open = max(first_open, (int(params["startTime"]) + offset + interval_ms - 1) // interval_ms * interval_ms - offset)
+
+        rows = []
+        for open_time in range(first_open, last_open + 1, interval_ms):
+            c = make_candle(params.get("symbol", ""), open_time)
+            rows.append([
+                open_time, f"{c['open']:.4f}", f"{c['high']:.4f}", f"{c['low']:.4f}", f"{c['close']:.4f}",
+                f"{c['volume']:.4f}", open_time + interval_ms - 1, f"{c['quote_volume']:.4f}", c["trade_count"],
+                f"{c['volume'] / 2:.4f}", f"{c['quote_volume'] / 2:.4f}", "0",
+            ])
+        return 200, rows
+
+    def binance_place_order(self, params, account):
+        if self.inject_error():
+            return 400, {"code": -2010, "msg": "Account has insufficient balance for requested action.(mock)"}
+
+        symbol = str(params.get("symbol", "")).upper()
+        if symbol not in BINANCE_SYMBOLS:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+
+        order_id = self.next_order_id()
+        order = {
+            "symbol": symbol,
+            "orderId": order_id,
+            "clientOrderId": f"mock{order_id}",
+            "transactTime": int(time.time() * 1000),
+            "price": params.get("price", "0"),
+            "origQty": params.get("quantity", "0"),
+            "executedQty": "0",
+            "status": "NEW",
+            "timeInForce": params.get("timeInForce", "GTC"),
+            "type": params.get("type", "LIMIT"),
+            "side": params.get("side", "BUY"),
+        }
+        with self._lock:
+            self.binance_orders.setdefault(account, {})[order_id] = order
+        return 200, order
+
+    def binance_cancel_order(self, params, account):
+        with self._lock:
+            order = self.binance_orders.get(account, {}).pop(int(params.get("orderId", 0)), None)
+        if order is None:
+            return 400, {"code": -2011, "msg": "Unknown order sent."}
+        return 200, dict(order, status="CANCELED")
+
+    def binance_open_orders(self, params, account):
+        symbol = params.get("symbol")
+        with self._lock:
+            orders = list(self.binance_orders.get(account, {}).values())
+        return 200, [order for order in orders if symbol is None or order["symbol"] == symbol]
+
+    def binance_cancel_open_orders(self, params, account):
+        symbol = params.get("symbol")
+        with self._lock:
+            orders = self.binance_orders.get(account, {})
+            canceled = [orders.pop(order_id) for order_id, order in list(orders.items()) if order["symbol"] == symbol]
+        if not canceled:
+            return 400, {"code": -2011, "msg": "Unknown order sent."}
+        return 200, [dict(order, status="CANCELED") for order in canceled]
+
+    def binance_user_asset(self, params, account):
+        return 200, [
+            {"asset": "BTC", "free": "0.50000000", "locked": "0", "freeze": "0", "withdrawing": "0"},
+            {"asset": "USDT", "free": "10000.00000000", "locked": "0", "freeze": "0", "withdrawing": "0"},
+        ]
+
+    def binance_simple_earn(self, params, account):
+        return 200, {"totalAmountInBTC": "0.01", "totalAmountInUSDT": "1000.00", "totalFlexibleAmountInBTC": "0.01"}
+
+    # [ KIS ]
+    def kis_token(self, params, account):
+        return 200, {"access_token": f"mock-access-token-{account}", "token_type": "Bearer", "expires_in": 86400}
+
+    def kis_approval(self, params, account):
+        return 200, {"approval_key": f"mock-approval-key-{account}"}
+
+    def kis_dailyprice(self, params, account):
+        end_date = datetime.strptime(params.get("BYMD") or datetime.now().strftime("%Y%m%d"), "%Y%m%d")
+        symbol = params.get("SYMB", "")
+
+        rows = []
+        day = end_date
+        # 최근 100 영업일(최신 순)
+        while len(rows) < 100:
+            if day.weekday() < 5:
+                c = make_candle(symbol, int(day.replace(tzinfo=timezone.utc).timestamp() * 1000))
+                rows.append({
+                    "xymd": day.strftime("%Y%m%d"),
+                    "clos": f"{c['close']:.4f}",
+                    "open": f"{c['open']:.4f}",
+                    "high": f"{c['high']:.4f}",
+                    "low": f"{c['low']:.4f}",
+                    "tvol": f"{int(c['volume'] * 1000)}",
+                    "tamt": f"{c['quote_volume'] * 1000:.0f}",
+                })
+            day -= timedelta(days=1)
+
+        return 200, {
+            "rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.",
+            "output1": {"rsym": f"DNAS{symbol}", "zdiv": "4", "nrec": str(len(rows))},
+            "output2": rows,
+        }
+
+    def kis_order(self, params, account):
+        if self.inject_error():
+            return 200, dict(KIS_ERROR_RESPONSE, output={})
+
+        order_id = f"{self.next_order_id():010d}"
+        order = {
+            "odno": order_id,
+            "pdno": str(params.get("PDNO", "")).upper(),
+            # 매수(TTTT1002U/TTTS6036U) : 02, 매도 : 01
+            "sll_buy_dvsn_cd": "02" if params.get("_tr_id") in ("TTTT1002U", "TTTS6036U") else "01",
+            "ft_ord_unpr3": params.get("OVRS_ORD_UNPR", "0"),
+            "ft_ord_qty": params.get("ORD_QTY", "0"),
+            "nccs_qty": params.get("ORD_QTY", "0"),
+        }
+        with self._lock:
+            self.kis_orders.setdefault(account, {})[order_id] = order
+        return 200, {
+            "rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다.",
+            "output": {"KRX_FWDG_ORD_ORGNO": "01790", "ODNO": order_id, "ORD_TMD": time.strftime("%H%M%S")},
+        }
+
+    def kis_cancel_order(self, params, account):
+        with self._lock:
+            order = self.kis_orders.get(account, {}).pop(str(params.get("ORGN_ODNO", "")), None)
+        if order is None:
+            return 200, {"rt_cd": "1", "msg_cd": "APBK0918", "msg1": "취소할 수량이 없습니다.", "output": {}}
+        return 200, {
+            "rt_cd": "0", "msg_cd": "APBK0013", "msg1": "주문 전송 완료 되었습니다.",
+            "output": {"KRX_FWDG_ORD_ORGNO": "01790", "ODNO": f"{self.next_order_id():010d}", "ORD_TMD": time.strftime("%H%M%S")},
+        }
+
+    def kis_open_orders(self, params, account):
+        with self._lock:
+            orders = list(self.kis_orders.get(account, {}).values())
+        return 200, {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output": orders}
+
+    def kis_balance(self, params, account):
+        rows = []
+        for symbol, name in (("AAPL", "애플"), ("MSFT", "마이크로소프트"), ("NVDA", "엔비디아")):
+            rows.append({
+                "ovrs_pdno": symbol,
+                "ovrs_item_name": name,
+                "ovrs_cblc_qty": str(1 + _seed(account, symbol) % 50),
+                "ovrs_stck_evlu_amt": f"{base_price(symbol):.2f}",
+            })
+        return 200, {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output1": rows, "output2": {}}
+
+    def kis_foreign_margin(self, params, account):
+        return 200, {
+            "rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.",
+            "output": [{"natn_name": "미국", "crcy_cd": "USD", "frcr_dncl_amt1": "10000.00"}],
+        }
+
+# (메서드, 경로) -> (브로커, 처리 메서드 이름)
+ROUTES = {
+    ("GET", "/api/v3/exchangeInfo"): ("Binance", "binance_exchange_info"),
+    ("GET", "/api/v3/klines"): ("Binance", "binance_klines"),
+    ("POST", "/api/v3/order"): ("Binance", "binance_place_order"),
+    ("DELETE", "/api/v3/order"): ("Binance", "binance_cancel_order"),
+    ("GET", "/api/v3/openOrders"): ("Binance", "binance_open_orders"),
+    ("DELETE", "/api/v3/openOrders"): ("Binance", "binance_cancel_open_orders"),
+    ("POST", "/sapi/v3/asset/getUserAsset"): ("Binance", "binance_user_asset"),
+    ("GET", "/sapi/v1/simple-earn/account"): ("Binance", "binance_simple_earn"),
+
+    ("POST", "/oauth2/tokenP"): ("KIS-auth", "kis_token"),
+    ("POST", "/oauth2/Approval"): ("KIS-auth", "kis_approval"),
+    ("GET", "/uapi/overseas-price/v1/quotations/dailyprice"): ("KIS", "kis_dailyprice"),
+    ("POST", "/uapi/overseas-stock/v1/trading/order"): ("KIS", "kis_order"),
+    ("POST", "/uapi/overseas-stock/v1/trading/daytime-order"): ("KIS", "kis_order"),
+    ("POST", "/uapi/overseas-stock/v1/trading/order-rvsecncl"): ("KIS", "kis_cancel_order"),
+    ("POST", "/uapi/overseas-stock/v1/trading/daytime-order-rvsecncl"): ("KIS", "kis_cancel_order"),
+    ("GET", "/uapi/overseas-stock/v1/trading/inquire-nccs"): ("KIS", "kis_open_orders"),
+    ("GET", "/uapi/overseas-stock/v1/trading/inquire-balance"): ("KIS", "kis_balance"),
+    ("GET", "/uapi/overseas-stock/v1/trading/foreign-margin"): ("KIS", "kis_foreign_margin"),
+}
+
+class MockHandler(BaseHTTPRequestHandler):
+    exchange: MockExchange = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _params(self, url) -> Dict[str, Any]:
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8")
+            if body.lstrip().startswith("{"):
+                params.update(json.loads(body))
+            else:
+                params.update(parse_qsl(body))
+        return params
+
+    def _handle(self, method: str):
+        exchange = self.exchange
+        url = urlparse(self.path)
+        params = self._params(url)
+
+        route = ROUTES.get((method, url.path))
+        if route is None:
+            self._send(404, {"code": -1, "msg": f"Unknown path({method} {url.path})"})
+            return
+
+        with exchange._lock:
+            exchange.stats["requests"] += 1
+        exchange.delay()
+
+        broker, handler_name = route
+        headers = {}
+        if broker == "Binance":
+            account = self.headers.get("X-MBX-APIKEY", "public")
+            weight = BINANCE_WEIGHTS.get((method, url.path), 1)
+            if (method, url.path) == ("GET", "/api/v3/openOrders") and "symbol" not in params:
+                weight = 80
+            status, used = exchange.use_weight(weight)
+            headers["X-MBX-USED-WEIGHT-1M"] = str(used)
+            if status is None and exchange.inject_error() and method == "GET":
+                status = 429
+            if status is not None:
+                headers["Retry-After"] = str(exchange.retry_after())
+                self._send(status, {"code": -1003, "msg": "Too many requests.(mock)"}, headers)
+                return
+        elif broker == "KIS":
+            account = params.get("CANO") or self.headers.get("appkey", "")
+            if exchange.use_kis_tps(self.headers.get("appkey", "")):
+                self._send(500, KIS_RATE_LIMIT_RESPONSE)
+                return
+            params["_tr_id"] = self.headers.get("tr_id", "")
+        else:
+            account = params.get("appkey", "")
+
+        status, body = getattr(exchange, handler_name)(params, account)
+        self._send(status, body, headers)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Binance/KIS REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="base response latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="uniform latency jitter(+-)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="injected error ratio(429 for Binance GET, order rejects)")
+    parser.add_argument("--weight-limit", type=int, default=6000, help="Binance request weight per minute")
+    parser.add_argument("--ban-seconds", type=int, default=120, help="Binance 418 ban duration")
+    parser.add_argument("--kis-tps", type=int, default=20, help="KIS requests per second per app key")
+    parser.add_argument("--seed", type=int, default=0, help="seed for latency jitter/error injection")
+    args = parser.parse_args()
+
+    MockHandler.exchange = MockExchange(args)
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    server.daemon_threads = True
+    print(f"[mock_exchange] listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"[mock_exchange] {json.dumps(MockHandler.exchange.stats)}")
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+/ws/trade, /ws/orderbook 동시 접속 부하 측정
+-> 로컬 Binance 스트림 대역 서버(피드)를 띄우고, server.py를 BINANCE_WSS_URL=피드로 실행
+-> 테스트 세션을 Redis에 저장한 뒤 N개의 클라이언트가 인증 후 구독
+-> N별 전달 메시지 수/초, 클라이언트 종단 지연(피드 전송 -> 클라이언트 수신) 백분위, 서버 CPU/RSS를 JSON으로 저장
+-> --login-burst : 같은 길이의 두 번째 구간 동안 /auth/refresh를 동시에 반복 요청하여 로그인 부하 중 지연 비교
+
+[ 실행 ]
+JWT_SECRET_KEY=<server.py와 같은 값> python -m api_broker.Benchmark.ws_fanout_bench \\
+    --clients 10,100,500 [--stream trade|orderbook|both] [--rate 20] [--duration 20] [--login-burst 50] \\
+    [--launch | --server ws://127.0.0.1:8001 --server-pid PID] [--frames 기록 디렉토리] [--output result.json]
+
+-> --launch : 서버를 하위 프로세스로 실행(JWT_SECRET_KEY, BINANCE_WSS_URL 자동 설정)
+-> --server : 이미 실행 중인 서버 사용(서버가 BINANCE_WSS_URL=ws://<피드 주소>로 실행되어 있어야 함)
+-> 종단 지연은 체결(trade) 메시지의 timestamp(피드 전송 시각, ms)로 계산(호가 메시지에는 시각 정보 없음)
+-> 액세스 토큰 만료(15분) 전에 끝나도록 단계마다 새 토큰 발급
+"""
+from ..Server.session_manager import SecureSessionManager
+from ..Common.RedisManager import redis_manager
+from .ws_replay import load_recording
+
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import glob
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve, broadcast
+from websockets.exceptions import ConnectionClosed
+
+BENCH_USER_AGENT = "ws-fanout-bench/1.0"
+BENCH_SYMBOL = "btcusdt"
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100.0))]
+
+class ProcessSampler:
+    """
+    /proc 기반 CPU 시간/RSS 측정(Linux)
+    """
+    _ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def __init__(self, pid: Optional[int]):
+        self.pid = pid
+
+    def cpu_seconds(self) -> Optional[float]:
+        if self.pid is None:
+            return None
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            # utime, stime (stat의 14, 15번째 필드)
+            return (int(fields[11]) + int(fields[12])) / self._ticks
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def rss_mb(self) -> Optional[float]:
+        if self.pid is None:
+            return None
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024.0
+        except OSError:
+            pass
+        return None
+
+class TickFeed:
+    """
+    Binance 스트림 대역 서버(/ws)
+    -> SUBSCRIBE 메시지로 체결/호가 구분, 같은 프레임을 모든 연결에 broadcast
+    -> 체결 프레임의 T(체결 시각)는 전송 시각으로 교체
+    """
+    def __init__(self, rate: float, frames_dir: Optional[str]):
+        self.rate = rate
+        self.trade_conns = set()
+        self.depth_conns = set()
+        self.sent = 0
+        self._trade_frames = None
+        self._depth_frames = None
+        if frames_dir:
+            self._load(frames_dir)
+
+    def _load(self, frames_dir: str):
+        trade, depth = [], []
+        for path in sorted(glob.glob(os.path.join(frames_dir, "binance-*.jsonl.gz"))):
+            recording = load_recording(path)
+            for _, frame in recording["frames"]:
+                try:
+                    data = json.loads(frame)
+                except json.JSONDecodeError:
+                    continue
+                if data.get("e") == "trade":
+                    trade.append(data)
+                elif "bids" in data and "asks" in data:
+                    depth.append(frame)
+        self._trade_frames = itertools.cycle(trade) if trade else None
+        self._depth_frames = itertools.cycle(depth) if depth else None
+
+    def _trade_frame(self, seq: int) -> str:
+        now_ms = int(time.time() * 1000)
+        if self._trade_frames is not None:
+            data = dict(next(self._trade_frames), T=now_ms, E=now_ms, s=BENCH_SYMBOL.upper())
+        else:
+            data = {
+                "e": "trade", "E": now_ms, "s": BENCH_SYMBOL.upper(), "t": seq,
+                "p": f"{60000 + random.uniform(-50, 50):.2f}", "q": f"{random.uniform(0.0001, 0.5):.5f}",
+                "T": now_ms, "m": seq % 2 == 0, "M": True,
+            }
+        return json.dumps(data)
+
+    def _depth_frame(self, seq: int) -> str:
+        if self._depth_frames is not None:
+            return next(self._depth_frames)
+        mid = 60000 + random.uniform(-50, 50)
+        return json.dumps({
+            "lastUpdateId": seq,
+            "bids": [[f"{mid - i * 0.01:.2f}", f"{random.uniform(0.01, 2):.5f}"] for i in range(1, 21)],
+            "asks": [[f"{mid + i * 0.01:.2f}", f"{random.uniform(0.01, 2):.5f}"] for i in range(1, 21)],
+        })
+
+    async def handler(self, ws):
+        try:
+            subscribe = json.loads(await ws.recv())
+            stream = " ".join(subscribe.get("params", []))
+            conns = self.trade_conns if "@trade" in stream else self.depth_conns
+            conns.add(ws)
+            try:
+                await ws.send(json.dumps({"result": None, "id": subscribe.get("id")}))
+                await ws.wait_closed()
+            finally:
+                conns.discard(ws)
+        except (ConnectionClosed, json.JSONDecodeError):
+            pass
+
+    async def run(self):
+        interval = 1.0 / self.rate
+        next_tick = time.monotonic()
+        for seq in itertools.count(1):
+            if self.trade_conns:
+                broadcast(self.trade_conns, self._trade_frame(seq))
+                self.sent += len(self.trade_conns)
+            if self.depth_conns:
+                broadcast(self.depth_conns, self._depth_frame(seq))
+                self.sent += len(self.depth_conns)
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+
+class ClientStats:
+    def __init__(self):
+        self.messages = 0
+        self.latencies_ms: List[float] = []
+        self.recording = False
+
+    def on_message(self, data):
+        if not self.recording:
+            return
+        now_ms = time.time() * 1000
+        for item in data if isinstance(data, list) else [data]:
+            if not isinstance(item, dict):
+                continue
+            self.messages += 1
+            if "timestamp" in item and item["timestamp"]:
+                self.latencies_ms.append(now_ms - float(item["timestamp"]))
+
+async def run_client(url: str, token: str, stats: ClientStats, failures: List[str]):
+    try:
+        async with connect(url, user_agent_header=BENCH_USER_AGENT, open_timeout=30, max_queue=None) as ws:
+            await ws.send(json.dumps({"token": token}))
+            auth = json.loads(await ws.recv())
+            if auth.get("type") != "authenticated":
+                failures.append(f"auth: {auth}")
+                return
+            async for message in ws:
+                data = json.loads(message)
+                if isinstance(data, dict) and data.get("type") in ("error", "gap"):
+                    continue
+                stats.on_message(data)
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        failures.append(f"{type(e).__name__}: {e}")
+
+def issue_token(user_id: int) -> str:
+    """
+    테스트 세션 발급(서버와 같은 Redis/JWT_SECRET_KEY 사용)
+    """
+    session_manager = SecureSessionManager(redis_manager.redis_client)
+    token = session_manager.create_access_token({"user_id": user_id})
+    session_manager.save_session(user_id, token, "127.0.0.1", BENCH_USER_AGENT, {"benchmark": True})
+    return token
+
+def issue_refresh_token(user_id: int) -> str:
+    session_manager = SecureSessionManager(redis_manager.redis_client)
+    return session_manager.create_refresh_token({"user_id": user_id})
+
+def post_refresh(url: str, refresh_token: str) -> str:
+    """
+    /auth/refresh 요청(스레드에서 실행)
+
+    Returns:
+        새 Refresh 토큰
+    """
+    request = urllib.request.Request(
+        url,
+        data=json.dumps({"refresh_token": refresh_token}).encode("utf-8"),
+        headers={"Content-Type": "application/json", "User-Agent": BENCH_USER_AGENT},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=30) as resp:
+        return json.loads(resp.read())["refresh_token"]
+
+class LoginBurst:
+    """
+    /auth/refresh 동시 반복 요청(로그인 부하)
+    -> 인증 경로(JWT 검증, Redis 세션 저장)가 이벤트 루프를 막으면 같은 서버의 체결 지연이 증가
+    """
+    def __init__(self, url: str, user_id: int, concurrency: int):
+        self.url = url
+        self.user_id = user_id
+        self.concurrency = concurrency
+        self.completed = 0
+        self.failures: List[str] = []
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._tasks: List[asyncio.Task] = []
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        token = issue_refresh_token(self.user_id)
+        while True:
+            try:
+                token = await loop.run_in_executor(self._executor, post_refresh, self.url, token)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures.append(f"{type(e).__name__}: {e}")
+                await asyncio.sleep(0.1)
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+async def measure(args, feed: TickFeed, stats: ClientStats, server_sampler: ProcessSampler) -> Dict[str, Any]:
+    """
+    측정 구간 하나(args.duration초)의 전달 메시지 수, 지연, CPU
+    """
+    stats.messages = 0
+    stats.latencies_ms = []
+    bench_sampler = ProcessSampler(os.getpid())
+    server_cpu_start, bench_cpu_start = server_sampler.cpu_seconds(), bench_sampler.cpu_seconds()
+    feed_sent_start = feed.sent
+    start = time.monotonic()
+    stats.recording = True
+    await asyncio.sleep(args.duration)
+    stats.recording = False
+    elapsed = time.monotonic() - start
+    server_cpu_end, bench_cpu_end = server_sampler.cpu_seconds(), bench_sampler.cpu_seconds()
+    feed_sent = feed.sent - feed_sent_start
+
+    latencies = sorted(stats.latencies_ms)
+    def cpu_percent(start_value, end_value):
+        if start_value is None or end_value is None:
+            return None
+        return round((end_value - start_value) / elapsed * 100.0, 1)
+
+    return {
+        "elapsed": elapsed,
+        "feed_msgs_per_sec": round(feed_sent / elapsed, 1),
+        "delivered_msgs_per_sec": round(stats.messages / elapsed, 1),
+        "delivery_ratio": round(stats.messages / feed_sent, 4) if feed_sent else None,
+        "latency_ms": {
+            "samples": len(latencies),
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+        "server_cpu_percent": cpu_percent(server_cpu_start, server_cpu_end),
+        "bench_cpu_percent": cpu_percent(bench_cpu_start, bench_cpu_end),
+    }
+
+async def run_step(args, feed: TickFeed, server_sampler: ProcessSampler, clients: int) -> Dict[str, Any]:
+    token = issue_token(args.user_id)
+    streams = ["trade", "orderbook"] if args.stream == "both" else [args.stream]
+
+    stats = ClientStats()
+    failures: List[str] = []
+    tasks = []
+    connect_start = time.monotonic()
+    for i in range(clients):
+        stream = streams[i % len(streams)]
+        url = f"{args.server}/ws/{stream}/Binance/{BENCH_SYMBOL}"
+        tasks.append(asyncio.create_task(run_client(url, token, stats, failures)))
+        # 접속 속도 제한(서버 accept 큐 보호)
+        if (i + 1) % args.connect_batch == 0:
+            await asyncio.sleep(0.05)
+
+    # 모든 업스트림 구독이 붙을 때까지 대기
+    deadline = time.monotonic() + 60
+    while len(feed.trade_conns) + len(feed.depth_conns) + len(failures) < clients and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    connect_seconds = time.monotonic() - connect_start
+    await asyncio.sleep(args.warmup)
+
+    baseline = await measure(args, feed, stats, server_sampler)
+
+    # 로그인 부하 중 같은 길이로 다시 측정
+    burst_result = None
+    if args.login_burst > 0:
+        refresh_url = args.server.replace("ws://", "http://", 1).replace("wss://", "https://", 1) + "/auth/refresh"
+        burst = LoginBurst(refresh_url, args.user_id, args.login_burst)
+        burst.start()
+        try:
+            burst_result = await measure(args, feed, stats, server_sampler)
+        finally:
+            await burst.stop()
+        burst_result.update({
+            "concurrency": args.login_burst,
+            "refresh_per_sec": round(burst.completed / burst_result["elapsed"], 1),
+            "refresh_failures": len(burst.failures),
+            "refresh_failure_samples": burst.failures[:5],
+        })
+        del burst_result["elapsed"]
+    del baseline["elapsed"]
+
+    server_rss = server_sampler.rss_mb()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    # 서버가 업스트림 연결을 정리할 시간
+    await asyncio.sleep(1.0)
+
+    return {
+        "clients": clients,
+        "connected": clients - len(failures),
+        "connect_failures": len(failures),
+        "failure_samples": failures[:5],
+        "connect_seconds": round(connect_seconds, 2),
+        **baseline,
+        "server_rss_mb": round(server_rss, 1) if server_rss is not None else None,
+        "login_burst": burst_result,
+    }
+
+def launch_server(args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["BINANCE_WSS_URL"] = f"ws://127.0.0.1:{args.feed_port}"
+    if args.api_url:
+        env["BINANCE_API_URL"] = args.api_url
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_broker.Server.server:app",
+         "--host", "127.0.0.1", "--port", str(args.server_port), "--log-level", "warning"],
+        cwd=package_root, env=env,
+    )
+
+async def wait_for_server(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, port = url.rsplit(":", 1)
+            reader, writer = await asyncio.open_connection("127.0.0.1", int(port.split("/")[0]))
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server not ready({url})")
+
+async def run(args):
+    if not os.environ.get("JWT_SECRET_KEY"):
+        raise SystemExit("JWT_SECRET_KEY must be set(same value as the server process)")
+
+    feed = TickFeed(args.rate, args.frames)
+    server_process = None
+    async with serve(feed.handler, "127.0.0.1", args.feed_port, max_size=None):
+        feed_task = asyncio.create_task(feed.run())
+        try:
+            if args.launch:
+                server_process = launch_server(args)
+                args.server = f"ws://127.0.0.1:{args.server_port}"
+                args.server_pid = server_process.pid
+            await wait_for_server(args.server)
+
+            server_sampler = ProcessSampler(args.server_pid)
+            results = []
+            for clients in [int(n) for n in args.clients.split(",")]:
+                result = await run_step(args, feed, server_sampler, clients)
+                results.append(result)
+                latency = result["latency_ms"]
+                print(
+                    f"N={clients:>5} : {result['delivered_msgs_per_sec']:>10,.0f} msgs/s"
+                    f"(ratio {result['delivery_ratio']}), "
+                    f"p50 {latency['p50']} / p99 {latency['p99']} ms, "
+                    f"server cpu {result['server_cpu_percent']}%, rss {result['server_rss_mb']} MB, "
+                    f"failures {result['connect_failures']}"
+                )
+                burst = result["login_burst"]
+                if burst is not None:
+                    print(
+                        f"  login burst({burst['concurrency']}) : {burst['refresh_per_sec']:,.1f} refresh/s, "
+                        f"p50 {burst['latency_ms']['p50']} / p99 {burst['latency_ms']['p99']} ms, "
+                        f"server cpu {burst['server_cpu_percent']}%, refresh failures {burst['refresh_failures']}"
+                    )
+        finally:
+            feed_task.cancel()
+            if server_process is not None:
+                server_process.terminate()
+                server_process.wait(timeout=10)
+
+    report = {
+        "benchmark": "ws_fanout",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "stream": args.stream,
+            "rate": args.rate,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "frames": args.frames,
+            "login_burst": args.login_burst,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved : {args.output}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Websocket fan-out load benchmark for server.py")
+    parser.add_argument("--clients", default="10,100", help="comma separated client counts")
+    parser.add_argument("--stream", choices=["trade", "orderbook", "both"], default="trade")
+    parser.add_argument("--rate", type=float, default=20.0, help="feed ticks per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="measure seconds per step")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--connect-batch", type=int, default=50, help="clients connected per 50ms")
+    parser.add_argument("--user-id", type=int, default=1, help="user id of the test session")
+    parser.add_argument("--login-burst", type=int, default=0, help="concurrent /auth/refresh loops in a second measure window(0: off)")
+    parser.add_argument("--frames", help="WS_RECORD_DIR recording to replay instead of synthetic ticks")
+    parser.add_argument("--feed-port", type=int, default=8766)
+    parser.add_argument("--launch", action="store_true", help="start server.py as a subprocess")
+    parser.add_argument("--server-port", type=int, default=8011)
+    parser.add_argument("--server", default="ws://127.0.0.1:8001", help="running server(without --launch)")
+    parser.add_argument("--server-pid", type=int, help="pid of running server for CPU/RSS")
+    parser.add_argument("--api-url", help="BINANCE_API_URL for launched server(e.g. mock_exchange)")
+    parser.add_argument("--output", help="result JSON path")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+기록된 브로커 웹소켓 프레임 재생 서버
+-> Common/FrameRecorder.py가 WS_RECORD_DIR에 남긴 파일(*.jsonl.gz)을 로컬 웹소켓 서버로 재생
+-> 접속 경로(/ws, /ws-api/v3, / 등)와 기록 당시 URL의 경로가 같은 파일을 순서대로(라운드 로빈) 배정
+-> 클라이언트가 보내는 메시지(구독/로그인 등)는 읽고 무시하며, 기록된 응답을 그대로 전송
+
+[ 실행 ]
+python -m api_broker.Benchmark.ws_replay <기록 디렉토리> [--port 8765] [--speed 1|10|max] [--loop]
+
+[ 서버 연결 ]
+BINANCE_WSS_URL=ws://127.0.0.1:8765
+BINANCE_WS_URL=ws://127.0.0.1:8765/ws-api/v3
+KIS_WS_URL=ws://127.0.0.1:8765
+"""
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
+import argparse
+import asyncio
+import glob
+import gzip
+import itertools
+import json
+import time
+import zlib
+import os
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+def load_recording(path: str) -> Dict[str, Any]:
+    """
+    기록 파일 로드
+    -> 프로세스가 비정상 종료되어 gzip 끝이 잘린 파일은 읽을 수 있는 부분까지만 사용
+
+    Returns:
+        {"source", "url", "path", "frames": [(경과 시간, 프레임), ...]}
+    """
+    header = None
+    frames = []
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = json.loads(line)
+                if header is None:
+                    header = line
+                else:
+                    frames.append((line["t"], line["d"]))
+    except (EOFError, zlib.error, json.JSONDecodeError):
+        pass
+
+    header = header or {}
+    return {
+        "source": header.get("source", os.path.basename(path)),
+        "url": header.get("url", ""),
+        "path": urlparse(header.get("url", "")).path or "/",
+        "frames": frames,
+    }
+
+class ReplayServer:
+    def __init__(self, recordings: List[Dict[str, Any]], speed: Optional[float], loop: bool):
+        self.speed = speed
+        self.loop = loop
+        # 경로 -> 기록 순환자
+        self._by_path: Dict[str, itertools.cycle] = {}
+        paths: Dict[str, List[Dict[str, Any]]] = {}
+        for recording in recordings:
+            paths.setdefault(recording["path"], []).append(recording)
+        for path, items in paths.items():
+            self._by_path[path] = itertools.cycle(items)
+
+    async def _drain(self, ws):
+        # 클라이언트 메시지는 무시(연결 종료 감지용)
+        async for _ in ws:
+            pass
+
+    async def _play(self, ws, recording: Dict[str, Any]) -> int:
+        sent = 0
+        start = time.monotonic()
+        for offset, frame in recording["frames"]:
+            if self.speed is not None:
+                delay = start + offset / self.speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await ws.send(frame)
+            sent += 1
+        return sent
+
+    async def handler(self, ws):
+        path = urlparse(ws.request.path).path or "/"
+        recordings = self._by_path.get(path)
+        if recordings is None:
+            print(f"[ws_replay] no recording for path {path}")
+            await ws.close(1008, "no recording")
+            return
+
+        recording = next(recordings)
+        print(f"[ws_replay] {ws.remote_address} {path} <- {recording['source']}({len(recording['frames'])} frames)")
+
+        drain_task = asyncio.create_task(self._drain(ws))
+        sent = 0
+        start = time.monotonic()
+        try:
+            while True:
+                sent += await self._play(ws, recording)
+                if not self.loop:
+                    break
+            # 재생이 끝나도 클라이언트가 끊을 때까지 연결 유지
+            await drain_task
+        except ConnectionClosed:
+            pass
+        finally:
+            drain_task.cancel()
+            elapsed = time.monotonic() - start
+            print(f"[ws_replay] {recording['source']} : {sent} frames in {elapsed:.2f}s({sent / max(elapsed, 1e-9):,.0f} frames/s)")
+
+async def run(args):
+    files = sorted(glob.glob(os.path.join(args.directory, "*.jsonl.gz")))
+    recordings = [load_recording(path) for path in files]
+    recordings = [recording for recording in recordings if recording["frames"]]
+    if not recordings:
+        print(f"[ws_replay] no recordings in {args.directory}")
+        return
+
+    for recording in recordings:
+        print(f"[ws_replay] {recording['path']:<14} {recording['source']}({len(recording['frames'])} frames)")
+
+    speed = None if args.speed == "max" else float(args.speed)
+    server = ReplayServer(recordings, speed, args.loop)
+    async with serve(server.handler, args.host, args.port, max_size=None):
+        print(f"[ws_replay] listening on ws://{args.host}:{args.port}(speed {args.speed})")
+        await asyncio.Future()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded broker websocket frames")
+    parser.add_argument("directory", help="WS_RECORD_DIR of the recording session")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--speed", default="1", help="playback speed(1, 10, ... or max)")
+    parser.add_argument("--loop", action="store_true", help="repeat recording until client disconnects")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 from ..BrokerCommon.BrokerInterface import BrokerInterface
 from ..BrokerCommon.DataTypes import *
 from ..BrokerCommon.BrokerData import *
-from .common import API_URL, WSS_URL, WS_URL, get_key
+from .common import API_URL, WSS_URL, WS_URL, get_key, send_request
 from .common import get_signed_payload_ws, get_signed_payload_post
 from .price import get_realtime_orderbook_price, get_realtime_trade_price
-from .order import place_order, cancel_order, cancel_all_orders
-from .account import get_assets
+from .order import place_order, place_order_async, place_orders_async, validate_order, cancel_order, cancel_order_async, cancel_all_orders, cancel_all_orders_async
+from .account import get_assets, get_assets_async, apply_userdata_event
+from .symbol_rules import fetch_exchange_info, update_rules
+from ..BrokerCommon.AccountState import balance_store, open_order_store
+from ..Common.AsyncRunner import run_blocking
+from ..Common.FrameRecorder import frame_recorder, NULL_RECORDING, REDACTED
+from ..Common.Metrics import tick_stages, begin_dispatch, end_dispatch
+from decimal import Decimal
 from ..Common.Debug import *
 
 from typing import List, Dict, Any, Callable, Awaitable
@@ -27,12 +33,23 @@ from pprint import pprint
 # -> 클라이언트의 웹소켓 : Display
 # -> 서버의 웹소켓(24/7 연결 유지) : 서버 사이드 자동 거래 스크립트 등에 활용
 
-# Endpoint 마다 rate limit 관리 코드 추가하기!!
-# HTTP 429 return code is used when breaking a request rate limit.
-# HTTP 418 return code is used when an IP has been auto-banned for continuing to send requests after receiving 429 codes.
+# REST 요청 제한(가중치, 429/418 처리)은 common.send_request에서 관리
 # Ping 프레임 수신시 pong 프레임으로 응답 필요(Ping 프레임과 같은 내용으로)
 # -> 라이브러리에서 자동으로 처리되는건가?
 
+def _redact_logon_frame(frame: str) -> str:
+    """
+    프레임 기록 전 session.logon 응답의 result(apiKey 등) 제거
+    """
+    try:
+        message = json.loads(frame)
+    except ValueError:
+        return frame
+    if isinstance(message, dict) and isinstance(message.get("result"), dict) and "apiKey" in message["result"]:
+        message["result"] = REDACTED
+        return json.dumps(message)
+    return frame
+
 class BinanceBroker(BrokerInterface):
     def __init__(self, user_id: str = None):
         self.user_id = user_id
@@ -245,7 +262,7 @@ class BinanceBroker(BrokerInterface):
             if api_start_time_dt != None:
                 params["startTime"] = int(api_start_time_dt.timestamp() * 1000)
             
-            resp = requests.get(url, params=params, timeout=10)
+            resp = send_request("GET", url, params=params, timeout=10)
             resp.raise_for_status()
             resp_json = resp.json()
 
@@ -285,12 +302,36 @@ class BinanceBroker(BrokerInterface):
         Binance 주문 전송
         """
         return place_order(self.user_id, order)
+
+    async def place_order_async(self, order) -> Dict[str, Any]:
+        """
+        Binance 주문 전송(WebSocket API 세션 우선)
+        """
+        return await place_order_async(self.user_id, order)
+
+    def validate_order(self, order) -> str:
+        """
+        Binance 주문 전송 전 검사
+        """
+        return validate_order(order)
+
+    async def place_orders_async(self, orders) -> List[Dict[str, Any]]:
+        """
+        Binance 일괄 주문(요청 순서대로 결과 반환)
+        """
+        return await place_orders_async(self.user_id, orders)
     
     def cancel_order(self, order) -> List[Dict[str, Any]]:
         """
         Binance 주문 취소
         """
         return cancel_order(self.user_id, order)
+
+    async def cancel_order_async(self, order) -> Dict[str, Any]:
+        """
+        Binance 주문 취소(WebSocket API 세션 우선)
+        """
+        return await cancel_order_async(self.user_id, order)
     
     def cancel_all_orders(self) -> List[Dict[str, Any]]:
         """
@@ -298,36 +339,52 @@ class BinanceBroker(BrokerInterface):
         """
         return cancel_all_orders(self.user_id)
 
-    def get_orders(self) -> List[NormalizedOrder]:
+    async def cancel_all_orders_async(self) -> Dict[str, Any]:
         """
-        Binance 미체결 주문 목록
+        Binance 모든 주문 취소(심볼별 일괄 취소 요청을 동시에 전송)
+        -> 미체결 주문 심볼은 메모리 저장소가 아닌 REST로 조회(누락 없이 취소)
         """
-        try:
-            headers = {
-                "X-MBX-APIKEY": get_key(self.user_id)["API"],
-            }
+        return await cancel_all_orders_async(self.user_id)
 
-            params = {}
-            payload = get_signed_payload_post(self.user_id, params)
+    def _fetch_orders(self) -> List[NormalizedOrder]:
+        """
+        Binance 미체결 주문 목록(REST 조회)
 
-            url = API_URL + f"/api/v3/openOrders"
-            resp = requests.get(url, headers=headers, params=payload, timeout=10)
-            resp_json = resp.json()
+        Raises:
+            조회 실패 시 예외를 그대로 전달
+        """
+        headers = {
+            "X-MBX-APIKEY": get_key(self.user_id)["API"],
+        }
 
-            orders: List[NormalizedOrder] = []
-            for order in resp_json:
-                orders.append({
-                    "order_id": order["orderId"],
-                    # e.g. BTCUSDT
-                    "symbol": order["symbol"],
-                    # BUY or SELL
-                    "side": str(order["side"]).lower(),
-                    "price": order["price"],
-                    "amount": order["origQty"],
-                })
+        params = {}
+        payload = get_signed_payload_post(self.user_id, params)
 
-            return orders
-            
+        url = API_URL + f"/api/v3/openOrders"
+        resp = send_request("GET", url, self.user_id, headers=headers, params=payload, timeout=10)
+        resp_json = resp.json()
+
+        orders: List[NormalizedOrder] = []
+        for order in resp_json:
+            orders.append({
+                "order_id": order["orderId"],
+                # e.g. BTCUSDT
+                "symbol": order["symbol"],
+                # BUY or SELL
+                "side": str(order["side"]).lower(),
+                "price": order["price"],
+                "amount": order["origQty"],
+            })
+
+        return orders
+
+    def get_orders(self) -> List[NormalizedOrder]:
+        """
+        Binance 미체결 주문 목록
+        -> 조회 실패 시 빈 목록
+        """
+        try:
+            return self._fetch_orders()
         except requests.exceptions.RequestException as e:
             print("[ get_orders ]")
             print("requests.exceptions.RequestException:")
@@ -340,21 +397,41 @@ class BinanceBroker(BrokerInterface):
             traceback.print_exc()
             return []
 
+    async def get_orders_async(self) -> List[NormalizedOrder]:
+        """
+        Binance 미체결 주문 목록
+        -> 실시간 주문 업데이트 스트림이 연결되어 있으면 메모리 주문 목록 사용
+        """
+        cached_orders = open_order_store.get(self.user_id, "Binance")
+        if cached_orders is not None:
+            return cached_orders
+
+        fetched_at = time.monotonic()
+        # 조회 실패 시 저장소에 반영하지 않고 예외 전달(빈 목록이 미체결 주문 없음으로 저장되지 않도록)
+        orders = await run_blocking(self._fetch_orders)
+        open_order_store.seed(self.user_id, "Binance", orders, fetched_at)
+        return orders
+
     # https://developers.binance.com/docs/binance-spot-api-docs/user-data-stream#order-update
     async def subscribe_order_update_async(self, callback: Callable[[Dict[str, Any]], Awaitable[None]]):
         """
         Binance 실시간 주문 업데이트 구독
         -> 주문 접수/체결/취소 등
         """
+        stream_attached = False
+        recording = NULL_RECORDING
         try:
             url = WS_URL
             async with websockets.connect(url, ping_interval=10.0, ping_timeout=10.0) as ws:
+                recording = frame_recorder.open("binance-order-update", url, private=True, redact=_redact_logon_frame)
                 params = {
                     "apiKey": get_key(self.user_id)["API"],
                 }
                 payload = get_signed_payload_ws(self.user_id, "session.logon", params)
                 await ws.send(json.dumps(payload))
-                resp = json.loads(await ws.recv())
+                raw = await ws.recv()
+                recording.write(raw)
+                resp = json.loads(raw)
 
                 #print("[ session.logon ]")
                 #print(resp)
@@ -364,17 +441,29 @@ class BinanceBroker(BrokerInterface):
                     "method": "userDataStream.subscribe",
                 }
                 await ws.send(json.dumps(payload))
-                resp = json.loads(await ws.recv())
+                raw = await ws.recv()
+                recording.write(raw)
+                resp = json.loads(raw)
 
                 #print("[ userDataStream.subscribe ]")
                 #print(resp)
 
+                # 잔고/미체결 주문 저장소에 실시간 계좌 스트림 연결 알림
+                balance_store.attach_stream(self.user_id, "Binance")
+                open_order_store.attach_stream(self.user_id, "Binance")
+                stream_attached = True
+
                 while True:
                     try:
-                        resp_json = json.loads(await ws.recv())
+                        raw = await ws.recv()
+                        recording.write(raw)
+                        resp_json = json.loads(raw)
                         #pprint(resp_json)
 
                         if "event" in resp_json:
+                            # 잔고 변경 이벤트 반영
+                            apply_userdata_event(self.user_id, resp_json["event"])
+
                             normalized_json = {}
                             # 주문 처리
                             if resp_json["event"]["e"] == "executionReport":
@@ -411,6 +500,12 @@ class BinanceBroker(BrokerInterface):
                                         "price": resp_json["event"]["p"],
                                         # Order quantity
                                         "quantity": resp_json["event"]["q"],
+                                        # Last executed quantity
+                                        "filled_quantity": resp_json["event"]["l"],
+                                        # Remaining quantity(주문 수량 - 누적 체결 수량)
+                                        "remaining_quantity": format(
+                                            Decimal(resp_json["event"]["q"]) - Decimal(resp_json["event"]["z"]), "f"
+                                        ),
                                     }
                                 # 주문 취소
                                 elif resp_json["event"]["x"] == "CANCELED":
@@ -425,6 +520,13 @@ class BinanceBroker(BrokerInterface):
                                         # -> 대문자 S
                                         "side": resp_json["event"]["S"],
                                     }
+
+                                # 미체결 주문 저장소 반영
+                                if normalized_json:
+                                    remaining = open_order_store.apply_event(self.user_id, "Binance", normalized_json)
+                                    if remaining is not None:
+                                        normalized_json["remaining_quantity"] = remaining
+
                                 await callback(normalized_json)
                         
                     except json.JSONDecodeError as e:
@@ -449,17 +551,27 @@ class BinanceBroker(BrokerInterface):
         except Exception as e:
             Error(f"Binance WebSocket error: {e}")
             print(traceback.format_exc())
+        finally:
+            recording.close()
+            if stream_attached:
+                balance_store.detach_stream(self.user_id, "Binance")
+                open_order_store.detach_stream(self.user_id, "Binance")
     
     async def subscribe_userdata_async(self, callback: Callable[[Dict[str, Any]], Awaitable[None]]):
+        stream_attached = False
+        recording = NULL_RECORDING
         try:
             url = WS_URL
             async with websockets.connect(url, ping_interval=20, ping_timeout=10) as ws:
+                recording = frame_recorder.open("binance-userdata", url, private=True, redact=_redact_logon_frame)
                 params = {
                     "apiKey": get_key(self.user_id)["API"],
                 }
                 payload = get_signed_payload_ws(self.user_id, "session.logon", params)
                 await ws.send(json.dumps(payload))
-                resp = json.loads(await ws.recv())
+                raw = await ws.recv()
+                recording.write(raw)
+                resp = json.loads(raw)
 
                 print("[ session.logon ]")
                 print(resp)
@@ -469,14 +581,27 @@ class BinanceBroker(BrokerInterface):
                     "method": "userDataStream.subscribe",
                 }
                 await ws.send(json.dumps(payload))
-                resp = json.loads(await ws.recv())
+                raw = await ws.recv()
+                recording.write(raw)
+                resp = json.loads(raw)
 
                 print("[ userDataStream.subscribe ]")
                 print(resp)
 
+                # 잔고 저장소에 실시간 계좌 스트림 연결 알림
+                balance_store.attach_stream(self.user_id, "Binance")
+                stream_attached = True
+
                 while True:
                     try:
-                        resp_json = json.loads(await ws.recv())
+                        raw = await ws.recv()
+                        recording.write(raw)
+                        resp_json = json.loads(raw)
+
+                        # 잔고 변경 이벤트 반영
+                        if "event" in resp_json:
+                            apply_userdata_event(self.user_id, resp_json["event"])
+
                         await callback(resp_json)
                         
                     except json.JSONDecodeError as e:
@@ -501,6 +626,10 @@ class BinanceBroker(BrokerInterface):
             import traceback
             traceback.print_exc()
             print(traceback.format_exc())
+        finally:
+            recording.close()
+            if stream_attached:
+                balance_store.detach_stream(self.user_id, "Binance")
 
     def get_assets(self) -> List[Dict[str, Any]]:
         """
@@ -508,18 +637,17 @@ class BinanceBroker(BrokerInterface):
         """
         return get_assets(self.user_id)
 
+    async def get_assets_async(self) -> List[Dict[str, Any]]:
+        """
+        Binance 자산 조회 (하위 요청 병렬 처리)
+        """
+        return await get_assets_async(self.user_id)
+
     def get_symbols(self) -> List[Dict[str, Any]]:
         try:
-            url = API_URL + "/api/v3/exchangeInfo"
-            params = {
-                "permissions": "SPOT",
-                "showPermissionSets": "false"
-            }
-            
-            resp = requests.get(url, params=params, timeout=10)
-            resp.raise_for_status()
-            
-            resp_json = resp.json()
+            resp_json = fetch_exchange_info()
+            # 같은 응답으로 주문 규칙 캐시도 갱신
+            update_rules(resp_json)
             
             symbols = []
             for symbol in resp_json["symbols"]:
@@ -562,9 +690,12 @@ class BinanceBroker(BrokerInterface):
         }
     
     async def subscribe_orderbook_async(self, user_id: str, symbol: str, callback: Callable[[Dict[str, Any]], Awaitable[None]]):
+        recording = NULL_RECORDING
+        stages = tick_stages("Binance", "orderbook")
         try:
             url = WSS_URL + "/ws"
             async with websockets.connect(url, ping_interval=20, ping_timeout=10) as ws:
+                recording = frame_recorder.open(f"binance-orderbook-{symbol}", url)
                 payload = {
                     "method": "SUBSCRIBE",
                     "params": [
@@ -577,7 +708,10 @@ class BinanceBroker(BrokerInterface):
 
                 while True:
                     try:
-                        resp = json.loads(await ws.recv())
+                        raw = await ws.recv()
+                        recv_time = time.perf_counter()
+                        recording.write(raw)
+                        resp = json.loads(raw)
                         
                         if "bids" in resp and "asks" in resp:
                             normalized_data = {
@@ -593,7 +727,9 @@ class BinanceBroker(BrokerInterface):
                             }
                             
                             # 콜백 호출 - 예외 발생 시 루프 종료
+                            dispatch_start = begin_dispatch(stages, recv_time)
                             await callback(normalized_data)
+                            end_dispatch(stages, dispatch_start)
                         
                     except json.JSONDecodeError as e:
                         print(f"❌ JSON decode error: {e}")
@@ -615,12 +751,17 @@ class BinanceBroker(BrokerInterface):
             import traceback
             traceback.print_exc()
             print(traceback.format_exc())
+        finally:
+            recording.close()
 
     async def subscribe_trade_price_async(self, user_id: str, symbol: str, callback: Callable[[Dict[str, Any]], Awaitable[None]]):
         url = WSS_URL + "/ws"
         
+        recording = NULL_RECORDING
+        stages = tick_stages("Binance", "trade")
         try:
             async with websockets.connect(url, ping_interval=20, ping_timeout=10) as ws:
+                recording = frame_recorder.open(f"binance-trade-{symbol}", url)
                 payload = {
                     "method": "SUBSCRIBE",
                     "params": [
@@ -633,7 +774,10 @@ class BinanceBroker(BrokerInterface):
 
                 while True:
                     try:
-                        resp = json.loads(await ws.recv())
+                        raw = await ws.recv()
+                        recv_time = time.perf_counter()
+                        recording.write(raw)
+                        resp = json.loads(raw)
                         
                         if "e" in resp and resp["e"] == "trade":
                             # 시간 포맷팅 (HH:MM:SS)
@@ -654,7 +798,9 @@ class BinanceBroker(BrokerInterface):
                             }
                             
                             # 콜백 호출 - 예외 발생 시 루프 종료
+                            dispatch_start = begin_dispatch(stages, recv_time)
                             await callback(normalized_data)
+                            end_dispatch(stages, dispatch_start)
                         
                     except json.JSONDecodeError as e:
                         print(f"❌ JSON decode error: {e}")
@@ -674,4 +820,6 @@ class BinanceBroker(BrokerInterface):
         except Exception as e:
             print(f"❌ Binance WebSocket error: {e}")
             import traceback
-            traceback.print_exc()
\ No newline at end of file
+            traceback.print_exc()
+        finally:
+            recording.close()
\ No newline at end of file
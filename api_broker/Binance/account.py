@@ -1,14 +1,23 @@
-from .common import API_URL, get_key
+from .common import API_URL, get_key, send_request
 from .common import get_signed_payload_post
 from ..Common.Debug import *
+from ..Common.AsyncRunner import run_blocking
+from ..BrokerCommon.AccountState import balance_store
 
-from typing import List, Dict, Any, Callable, Awaitable
+from typing import List, Dict, Any, Callable, Awaitable, Optional
 import requests
+import asyncio
 import time
 
 from pprint import pprint
 
-def get_assets(user_id) -> List[Dict[str, Any]]:
+def get_spot_assets(user_id) -> Optional[List[Dict[str, Any]]]:
+    """
+    현물 자산 조회
+
+    Returns:
+        자산 목록(조회 실패 시 None)
+    """
     try:
         headers = {
             "X-MBX-APIKEY": get_key(user_id)["API"],
@@ -18,7 +27,7 @@ def get_assets(user_id) -> List[Dict[str, Any]]:
         payload = get_signed_payload_post(user_id, params)
 
         url = API_URL + f"/sapi/v3/asset/getUserAsset"
-        resp = requests.post(url, headers=headers, data=payload, timeout=10)
+        resp = send_request("POST", url, user_id, headers=headers, data=payload, timeout=10)
         resp_json = resp.json()
 
         assets = []
@@ -30,26 +39,106 @@ def get_assets(user_id) -> List[Dict[str, Any]]:
                 "amount": asset["free"],
             })
 
+        return assets
+    except requests.exceptions.RequestException as e:
+        Error("requests.exceptions.RequestException")
+        print(e)
+        return None
+    except Exception as e:
+        Error("Exception")
+        print(e)
+        return None
+
+def get_earn_assets(user_id) -> Optional[List[Dict[str, Any]]]:
+    """
+    Simple Earn 자산 조회
+
+    Returns:
+        자산 목록(조회 실패 시 None)
+    """
+    try:
+        headers = {
+            "X-MBX-APIKEY": get_key(user_id)["API"],
+        }
+
         params = {}
         payload = get_signed_payload_post(user_id, params)
 
         url = API_URL + f"/sapi/v1/simple-earn/account"
-        resp = requests.get(url, headers=headers, params=payload, timeout=10)
+        resp = send_request("GET", url, user_id, headers=headers, params=payload, timeout=10)
         resp_json = resp.json()
 
-        assets.append({
+        return [{
             "type": "crypto",
             "display_name": "Simple Earn USDT",
             "symbol": "USDT",
             "amount": resp_json["totalAmountInUSDT"],
-        })
-
-        return assets
+        }]
     except requests.exceptions.RequestException as e:
         Error("requests.exceptions.RequestException")
         print(e)
-        return []
+        return None
     except Exception as e:
         Error("Exception")
         print(e)
-        return []
\ No newline at end of file
+        return None
+
+def get_assets(user_id) -> List[Dict[str, Any]]:
+    return (get_spot_assets(user_id) or []) + (get_earn_assets(user_id) or [])
+
+async def get_assets_async(user_id) -> List[Dict[str, Any]]:
+    """
+    현물/Simple Earn 자산을 동시에 조회
+    -> 실시간 계좌 스트림이 연결되어 있으면 메모리 잔고 사용
+    """
+    cached_assets = balance_store.get(user_id, "Binance")
+    if cached_assets is not None:
+        return cached_assets
+
+    fetched_at = time.monotonic()
+
+    # 키는 한 번만 조회(Redis 캐싱)한 뒤 하위 요청을 병렬로 전송
+    await run_blocking(get_key, user_id)
+    spot_assets, earn_assets = await asyncio.gather(
+        run_blocking(get_spot_assets, user_id),
+        run_blocking(get_earn_assets, user_id),
+    )
+    assets = (spot_assets or []) + (earn_assets or [])
+
+    # 일부라도 조회에 실패한 경우 저장소에 반영하지 않음(잘못된 잔고 위에 실시간 변경분이 누적되지 않도록)
+    if spot_assets is None or earn_assets is None:
+        return assets
+
+    balance_store.seed(user_id, "Binance", assets, fetched_at)
+    return assets
+
+# https://developers.binance.com/docs/binance-spot-api-docs/user-data-stream#account-update
+def apply_userdata_event(user_id, event: Dict[str, Any]):
+    """
+    실시간 계좌 이벤트를 잔고 저장소에 반영
+    """
+    event_type = event.get("e")
+
+    # 잔고 변경(절대값)
+    if event_type == "outboundAccountPosition":
+        for balance in event.get("B", []):
+            balance_store.set_amount(
+                user_id,
+                "Binance",
+                "crypto",
+                balance["a"],
+                balance["f"],
+                display_name="Spot " + balance["a"],
+                event_time=event.get("u", 0)
+            )
+    # 입출금/이체(증감)
+    elif event_type == "balanceUpdate":
+        balance_store.apply_delta(
+            user_id,
+            "Binance",
+            "crypto",
+            event["a"],
+            event["d"],
+            display_name="Spot " + event["a"],
+            event_time=event.get("T", 0)
+        )
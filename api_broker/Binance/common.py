@@ -1,6 +1,7 @@
 from ..Common.RedisManager import redis_manager
 from ..Common.Debug import *
 from ..Common.DBManager import get_db_conn
+from ..Common.RateLimiter import rate_limiter
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -8,12 +9,14 @@ from psycopg2.extras import RealDictCursor
 import os
 import time
 import json
+import requests
 import hmac, hashlib, base64, uuid
 from cryptography.hazmat.primitives.serialization import load_pem_private_key
 
-API_URL = "https://api.binance.com"
-WSS_URL = "wss://stream.binance.com:9443"
-WS_URL = "wss://ws-api.binance.com:443/ws-api/v3"
+# 테스트/벤치마크 시 로컬 서버(Benchmark/mock_exchange.py, ws_replay.py)로 교체할 수 있도록 환경 변수 지원
+API_URL = os.environ.get("BINANCE_API_URL", "https://api.binance.com")
+WSS_URL = os.environ.get("BINANCE_WSS_URL", "wss://stream.binance.com:9443")
+WS_URL = os.environ.get("BINANCE_WS_URL", "wss://ws-api.binance.com:443/ws-api/v3")
 
 # 암호화폐 거래 쌍 화이트 리스트
 # -> 화이트 리스트 이외의 거래 쌍에 대해서는 모든 요청 거부
@@ -22,6 +25,35 @@ CRYPTO_PAIR_WHITELIST = {
     "USDCUSDT",
 }
 
+# (메서드, 경로) -> 요청 가중치(목록에 없으면 1)
+# https://developers.binance.com/docs/binance-spot-api-docs/rest-api
+ENDPOINT_WEIGHTS = {
+    ("GET", "/api/v3/exchangeInfo"): 20,
+    ("GET", "/api/v3/klines"): 2,
+    ("GET", "/api/v3/openOrders"): 6,
+    ("POST", "/api/v3/order"): 1,
+    ("DELETE", "/api/v3/order"): 1,
+    ("DELETE", "/api/v3/openOrders"): 1,
+    ("POST", "/sapi/v3/asset/getUserAsset"): 5,
+    ("GET", "/sapi/v1/simple-earn/account"): 150,
+}
+# 심볼 없이 전체 미체결 주문 조회 시 가중치
+OPEN_ORDERS_ALL_WEIGHT = 80
+
+# UID 가중치가 적용되는 SAPI (메서드, 경로)
+# -> 그 외 SAPI는 IP 가중치(엔드포인트별 IP당 12000/분)
+# https://developers.binance.com/docs/wallet/asset/user-assets
+# https://developers.binance.com/docs/simple_earn/account/Simple-Account
+SAPI_UID_WEIGHTED_ENDPOINTS = set()
+
+# WebSocket API 메서드 -> 요청 가중치(REST와 같은 IP 가중치 공유)
+# https://developers.binance.com/docs/binance-spot-api-docs/websocket-api/rate-limits
+WS_API_WEIGHTS = {
+    "session.logon": 2,
+    "order.place": 1,
+    "order.cancel": 1,
+}
+
 def get_key(user_id):
     key = f"{user_id}_Binance_KEY"
 
@@ -36,21 +68,15 @@ def get_key(user_id):
         api_key = ""
         private_key = ""
         
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'Binance' and token_name = %s",
-            (user_id, "API",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            api_key = token["token"]
-
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'Binance' and token_name = %s",
-            (user_id, "Private",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            private_key = token["token"]
+        # 브로커의 모든 토큰을 한 번에 조회
+        conn.execute_prepared(cursor, "user_tokens_by_broker", (user_id, "Binance"))
+        tokens = {row["token_name"]: row["token"] for row in cursor.fetchall()}
+
+        if "API" in tokens:
+            api_key = tokens["API"]
+
+        if "Private" in tokens:
+            private_key = tokens["Private"]
 
         key_json = {
             "API": api_key,
@@ -101,8 +127,12 @@ def get_signed_payload_ws(user_id, method, params):
     return payload
 
 # https://developers.binance.com/docs/binance-spot-api-docs/rest-api/request-security
-def get_signed_payload_post(user_id, params):
-    private_key_str = get_key(user_id)["Private"]
+def get_signed_payload_post(user_id, params, key=None):
+    """
+    Args:
+        key: 미리 조회한 get_key() 결과(없으면 조회)
+    """
+    private_key_str = (key or get_key(user_id))["Private"]
 
     private_key_pem = private_key_str.replace('\\n', '\n').encode('utf-8')
     private_key = load_pem_private_key(data=private_key_pem, password=None)
@@ -118,4 +148,78 @@ def get_signed_payload_post(user_id, params):
     signature = base64.b64encode(private_key.sign(payload_for_sign.encode("ASCII")))
     params["signature"] = signature.decode("ASCII")
 
-    return params
\ No newline at end of file
+    return params
+
+def send_request(method: str, url: str, user_id=None, **kwargs) -> requests.Response:
+    """
+    요청 제한을 적용한 REST 요청
+    -> 요청 전 가중치만큼 토큰 차감, 응답 헤더의 사용량으로 보정
+    -> 429/418 응답 시 Retry-After 동안 모든 요청 중단
+
+    Raises:
+        RateLimitExceeded: 요청 제한으로 전송하지 못한 경우
+    """
+    path = url[len(API_URL):] if url.startswith(API_URL) else url
+    weight = ENDPOINT_WEIGHTS.get((method, path), 1)
+    if (method, path) == ("GET", "/api/v3/openOrders") and "symbol" not in (kwargs.get("params") or {}):
+        weight = OPEN_ORDERS_ALL_WEIGHT
+
+    # IP 차단(429/418) 중에는 사용자별 버킷도 요청하지 않음
+    if (method, path) in SAPI_UID_WEIGHTED_ENDPOINTS:
+        rate_limiter.acquire("Binance", user_id, "sapi", weight, block_scope="ip")
+    elif path.startswith("/sapi/"):
+        rate_limiter.acquire("Binance", f"ip:{path}", "sapi_ip", weight, block_scope="ip")
+    else:
+        rate_limiter.acquire("Binance", "ip", "weight", weight)
+        if (method, path) == ("POST", "/api/v3/order"):
+            rate_limiter.acquire("Binance", user_id, "orders", 1, block_scope="ip")
+
+    resp = requests.request(method, url, **kwargs)
+
+    if "X-MBX-USED-WEIGHT-1M" in resp.headers:
+        rate_limiter.sync_usage("Binance", "ip", "weight", float(resp.headers["X-MBX-USED-WEIGHT-1M"]))
+    if "X-MBX-ORDER-COUNT-10S" in resp.headers:
+        rate_limiter.sync_usage("Binance", user_id, "orders", float(resp.headers["X-MBX-ORDER-COUNT-10S"]))
+    if "X-SAPI-USED-IP-WEIGHT-1M" in resp.headers:
+        rate_limiter.sync_usage("Binance", f"ip:{path}", "sapi_ip", float(resp.headers["X-SAPI-USED-IP-WEIGHT-1M"]))
+    if "X-SAPI-USED-UID-WEIGHT-1M" in resp.headers:
+        rate_limiter.sync_usage("Binance", user_id, "sapi", float(resp.headers["X-SAPI-USED-UID-WEIGHT-1M"]))
+
+    # 429 : 요청 제한 초과, 418 : 429 이후에도 요청을 계속하여 IP 차단
+    if resp.status_code in (429, 418):
+        retry_after = float(resp.headers.get("Retry-After", "60"))
+        Error(f"Binance rate limit({resp.status_code}), retry after {retry_after}s")
+        rate_limiter.block("Binance", "ip", retry_after)
+
+    return resp
+
+def acquire_ws_api(user_id, method: str):
+    """
+    WebSocket API 요청 전 토큰 차감(REST와 같은 IP 가중치/주문 수 버킷)
+
+    Raises:
+        RateLimitExceeded: 요청 제한으로 전송하지 못한 경우
+    """
+    rate_limiter.acquire("Binance", "ip", "weight", WS_API_WEIGHTS.get(method, 1))
+    if method == "order.place":
+        rate_limiter.acquire("Binance", user_id, "orders", 1, block_scope="ip")
+
+def sync_ws_api_usage(user_id, resp: dict):
+    """
+    WebSocket API 응답의 rateLimits로 버킷 보정
+    -> 429/418 응답 시 retryAfter(없으면 60초) 동안 모든 요청 중단
+    """
+    for limit in resp.get("rateLimits") or []:
+        interval = (limit.get("rateLimitType"), limit.get("interval"), limit.get("intervalNum"))
+        if interval == ("REQUEST_WEIGHT", "MINUTE", 1):
+            rate_limiter.sync_usage("Binance", "ip", "weight", float(limit["count"]))
+        elif interval == ("ORDERS", "SECOND", 10):
+            rate_limiter.sync_usage("Binance", user_id, "orders", float(limit["count"]))
+
+    if resp.get("status") in (429, 418):
+        retry_after = 60.0
+        retry_at = ((resp.get("error") or {}).get("data") or {}).get("retryAfter")
+        if retry_at:
+            retry_after = max(1.0, retry_at / 1000 - time.time())
+        Error(f"Binance ws-api rate limit({resp.get('status')}), retry after {retry_after:.0f}s")
+        rate_limiter.block("Binance", "ip", retry_after)
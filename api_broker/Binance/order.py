@@ -1,11 +1,55 @@
-from .common import API_URL, CRYPTO_PAIR_WHITELIST, get_signed_payload_post, get_key
+from .common import API_URL, CRYPTO_PAIR_WHITELIST, get_signed_payload_post, get_key, send_request
 from ..Common.Debug import *
+from ..Common.AsyncRunner import run_blocking, gather_bounded
+from .symbol_rules import normalize_order
+from ..BrokerCommon.DataTypes import summarize_cancel_results
+from .ws_api import ORDER_ENTRY_MODE, ORDER_LATENCY, WsApiNotConnected, place_order_ws, cancel_order_ws
 
+from typing import List, Dict, Any
 import requests
 import traceback
+import time
+import os
 from pprint import pprint
 
-def place_order(user_id, order):
+# 모든 주문 취소 시 동시에 전송할 심볼별 요청 수
+CANCEL_ALL_CONCURRENCY = int(os.environ.get("BINANCE_CANCEL_ALL_CONCURRENCY", "10"))
+# 일괄 주문 시 동시에 전송할 주문 수
+# -> Binance 주문 수 제한(10초당 100건)에 걸리지 않도록 제한
+PLACE_ORDERS_CONCURRENCY = int(os.environ.get("BINANCE_PLACE_ORDERS_CONCURRENCY", "5"))
+
+def validate_order(order) -> str:
+    """
+    주문 전송 전 검사
+
+    Returns:
+        오류 메시지(문제가 없으면 빈 문자열)
+    """
+    for field in ("symbol", "side", "price", "quantity"):
+        if field not in order:
+            return f"Missing field({field})"
+
+    if str(order["symbol"]).upper() not in CRYPTO_PAIR_WHITELIST:
+        return f"Not a white-listed pair({str(order["symbol"]).upper()})"
+
+    if order["side"] not in ("BUY", "SELL"):
+        return f"Invalid side({order["side"]})"
+
+    try:
+        if float(order["price"]) <= 0 or float(order["quantity"]) <= 0:
+            return "Price and quantity must be positive"
+    except (TypeError, ValueError):
+        return "Invalid price or quantity"
+
+    # 호가/수량 단위, 최소 주문 금액 검사
+    _, message = normalize_order(order)
+    return message
+
+def place_order(user_id, order, key=None):
+    """
+    Args:
+        key: 미리 조회한 get_key() 결과(일괄 주문 시 한 번만 조회)
+    """
     try:
         result = {
             "result": "error",
@@ -17,8 +61,19 @@ def place_order(user_id, order):
             result["message"] = f"Not a white-listed pair({order["symbol"].upper()})"
             return result
 
+        # 전송 전에 가격/수량을 단위에 맞추고 필터 검사
+        # -> 규칙이 아직 없으면 조회하지 않고 그대로 전송(refresh_rules_loop에서 재시도)
+        order, message = normalize_order(order)
+        if message:
+            result["result"] = "reject"
+            result["message"] = message
+            return result
+
+        if key is None:
+            key = get_key(user_id)
+
         headers = {
-            "X-MBX-APIKEY": get_key(user_id)["API"],
+            "X-MBX-APIKEY": key["API"],
         }
 
         params = {
@@ -30,15 +85,15 @@ def place_order(user_id, order):
             "price": str(order["price"]),
             "quantity": str(order["quantity"]),
         }
-        payload = get_signed_payload_post(user_id, params)
+        payload = get_signed_payload_post(user_id, params, key)
 
         url = API_URL + f"/api/v3/order"
-        resp = requests.post(url, headers=headers, data=payload, timeout=10)
+        resp = send_request("POST", url, user_id, headers=headers, data=payload, timeout=10)
         resp_json = resp.json()
 
         if "orderId" in resp_json:
             result["result"] = "success"
-            result["order_id"] = "order_id"
+            result["order_id"] = str(resp_json["orderId"])
             result["order"] = order
         
         if "msg" in resp_json:
@@ -58,6 +113,55 @@ def place_order(user_id, order):
         traceback.print_exc()
         return []
 
+async def place_order_async(user_id, order, key=None):
+    """
+    주문 전송(BINANCE_ORDER_ENTRY에 따라 WebSocket API 또는 REST)
+    -> WebSocket API로 전송하지 못한 경우에만 REST로 재전송
+    """
+    # 규칙이 아직 없으면 조회하지 않고 그대로 전송(refresh_rules_loop에서 재시도)
+    order, message = normalize_order(order)
+    if message:
+        return {"result": "reject", "message": message}
+
+    if ORDER_ENTRY_MODE == "ws" and str(order["symbol"]).upper() in CRYPTO_PAIR_WHITELIST:
+        start = time.perf_counter()
+        try:
+            result = await place_order_ws(user_id, order)
+            ORDER_LATENCY["ws"].observe(time.perf_counter() - start)
+            return result
+        except WsApiNotConnected as e:
+            Info(f"Binance ws-api unavailable, fallback to REST : {e}")
+
+    start = time.perf_counter()
+    result = await run_blocking(place_order, user_id, order, key)
+    ORDER_LATENCY["rest"].observe(time.perf_counter() - start)
+    return result
+
+async def place_orders_async(user_id, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    여러 주문을 동시에 전송(최대 PLACE_ORDERS_CONCURRENCY 건씩)
+    -> 키는 한 번만 조회하여 모든 주문에 사용
+
+    Returns:
+        주문별 결과 리스트(요청 순서 유지)
+    """
+    key = await run_blocking(get_key, user_id)
+
+    place_results = await gather_bounded(
+        [place_order_async(user_id, order, key) for order in orders],
+        PLACE_ORDERS_CONCURRENCY
+    )
+
+    results = []
+    for result in place_results:
+        if isinstance(result, Exception):
+            results.append({"result": "error", "message": str(result)})
+        elif not result:
+            results.append({"result": "error", "message": "Unknown error."})
+        else:
+            results.append(result)
+    return results
+
 def cancel_order(user_id, order):
     try:
         params = {
@@ -72,7 +176,7 @@ def cancel_order(user_id, order):
         payload = get_signed_payload_post(user_id, params)
 
         url = API_URL + f"/api/v3/order"
-        resp = requests.delete(url, headers=headers, data=payload, timeout=10)
+        resp = send_request("DELETE", url, user_id, headers=headers, data=payload, timeout=10)
         resp_json = resp.json()
 
         #pprint(resp_json)
@@ -102,32 +206,105 @@ def cancel_order(user_id, order):
         traceback.print_exc()
         return []
     
-def cancel_all_orders(user_id):
+async def cancel_order_async(user_id, order):
+    """
+    주문 취소(BINANCE_ORDER_ENTRY에 따라 WebSocket API 또는 REST)
+    """
+    if ORDER_ENTRY_MODE == "ws":
+        start = time.perf_counter()
+        try:
+            result = await cancel_order_ws(user_id, order)
+            ORDER_LATENCY["ws"].observe(time.perf_counter() - start)
+            return result
+        except WsApiNotConnected as e:
+            Info(f"Binance ws-api unavailable, fallback to REST : {e}")
+
+    start = time.perf_counter()
+    result = await run_blocking(cancel_order, user_id, order)
+    ORDER_LATENCY["rest"].observe(time.perf_counter() - start)
+    return result
+
+def cancel_open_orders(user_id, symbol: str) -> List[Dict[str, Any]]:
+    """
+    심볼의 모든 미체결 주문 취소(DELETE /api/v3/openOrders, 1회 요청)
+
+    Returns:
+        주문별 취소 결과 리스트 [{"order_id", "symbol", "result", "message"}]
+    """
     try:
+        params = {
+            "symbol": str(symbol).upper(),
+        }
+
         headers = {
             "X-MBX-APIKEY": get_key(user_id)["API"],
         }
 
-        params = {}
         payload = get_signed_payload_post(user_id, params)
 
         url = API_URL + f"/api/v3/openOrders"
-        resp = requests.get(url, headers=headers, params=payload, timeout=10)
+        resp = send_request("DELETE", url, user_id, headers=headers, data=payload, timeout=10)
         resp_json = resp.json()
 
-        for order in resp_json:
-            normalized_order = {
-                "symbol": order["symbol"],
-                "order_id": order["orderId"],
-            }
-            cancel_order(user_id, normalized_order)
-        
-        result = {
-            "result": "success",
-            "message": "",
-        }
+        # 오류 응답
+        # -> 미체결 주문이 없는 경우(-2011)는 취소할 주문이 없는 것으로 처리
+        if isinstance(resp_json, dict):
+            if resp_json.get("code") == -2011:
+                return []
+            return [{
+                "order_id": None,
+                "symbol": symbol,
+                "result": "error",
+                "message": resp_json.get("msg", ""),
+            }]
 
-        return result
+        results = []
+        for item in resp_json:
+            # OCO 등 주문 목록은 개별 주문 결과로 펼침
+            reports = item.get("orderReports", [item])
+            for report in reports:
+                results.append({
+                    "order_id": report.get("orderId"),
+                    "symbol": report.get("symbol", symbol),
+                    "result": "success" if report.get("status") == "CANCELED" else "error",
+                    "message": report.get("status", ""),
+                })
+
+        return results
+
+    except requests.exceptions.RequestException as e:
+        Error("requests.exceptions.RequestException")
+        print(e)
+        return [{"order_id": None, "symbol": symbol, "result": "error", "message": str(e)}]
+    except Exception as e:
+        Error("Exception")
+        traceback.print_exc()
+        return [{"order_id": None, "symbol": symbol, "result": "error", "message": str(e)}]
+
+def get_open_order_symbols(user_id) -> List[str]:
+    """
+    미체결 주문이 있는 심볼 목록 조회
+    """
+    headers = {
+        "X-MBX-APIKEY": get_key(user_id)["API"],
+    }
+
+    params = {}
+    payload = get_signed_payload_post(user_id, params)
+
+    url = API_URL + f"/api/v3/openOrders"
+    resp = send_request("GET", url, user_id, headers=headers, params=payload, timeout=10)
+    resp_json = resp.json()
+
+    return sorted({order["symbol"] for order in resp_json})
+
+def cancel_all_orders(user_id):
+    try:
+        results = []
+        for symbol in get_open_order_symbols(user_id):
+            results.extend(cancel_open_orders(user_id, symbol))
+
+        return summarize_cancel_results(results)
 
     except requests.exceptions.RequestException as e:
         Error("requests.exceptions.RequestException")
@@ -136,4 +313,39 @@ def cancel_all_orders(user_id):
     except Exception as e:
         Error("Exception")
         traceback.print_exc()
-        return []
\ No newline at end of file
+        return []
+
+async def cancel_all_orders_async(user_id, symbols: List[str] = None):
+    """
+    모든 미체결 주문 취소
+    -> 심볼별 일괄 취소 요청을 동시에 전송
+
+    Args:
+        symbols: 미체결 주문이 있는 심볼 목록(없으면 REST로 조회)
+    """
+    try:
+        if symbols is None:
+            symbols = await run_blocking(get_open_order_symbols, user_id)
+
+        symbol_results = await gather_bounded(
+            [run_blocking(cancel_open_orders, user_id, symbol) for symbol in symbols],
+            CANCEL_ALL_CONCURRENCY
+        )
+
+        results = []
+        for symbol, symbol_result in zip(symbols, symbol_results):
+            if isinstance(symbol_result, Exception):
+                results.append({"order_id": None, "symbol": symbol, "result": "error", "message": str(symbol_result)})
+            else:
+                results.extend(symbol_result)
+
+        return summarize_cancel_results(results)
+
+    except requests.exceptions.RequestException as e:
+        Error("requests.exceptions.RequestException")
+        print(e)
+        return {"result": "error", "message": str(e), "orders": []}
+    except Exception as e:
+        Error("Exception")
+        traceback.print_exc()
+        return {"result": "error", "message": str(e), "orders": []}
@@ -0,0 +1,170 @@
+"""
+Binance 심볼별 주문 규칙(exchangeInfo 필터) 캐시
+-> PRICE_FILTER / LOT_SIZE / NOTIONAL(MIN_NOTIONAL)만 보관
+-> 주문 전송 전에 로컬에서 가격/수량을 단위에 맞게 내림하고 범위 검사
+"""
+from .common import API_URL, send_request
+from ..Common.AsyncRunner import run_blocking
+from ..Common.Debug import *
+
+from typing import Dict, Any, Optional, Tuple
+from decimal import Decimal, InvalidOperation, ROUND_FLOOR, ROUND_CEILING
+import asyncio
+import traceback
+import time
+import os
+
+# 규칙 최대 유지 시간(초)
+# -> 정상 시에는 심볼 목록 갱신(BinanceBroker.get_symbols)이 같은 exchangeInfo 응답으로 규칙도 갱신
+SYMBOL_RULES_MAX_AGE_SECONDS = float(os.environ.get("BINANCE_SYMBOL_RULES_MAX_AGE_SECONDS", "7200"))
+# 규칙이 없거나 오래되었는지 확인하는 간격(초)
+SYMBOL_RULES_RETRY_SECONDS = float(os.environ.get("BINANCE_SYMBOL_RULES_RETRY_SECONDS", "60"))
+
+class SymbolRules:
+    """
+    심볼 하나의 주문 규칙(0이면 제한 없음)
+    """
+    __slots__ = (
+        "tick_size", "min_price", "max_price",
+        "step_size", "min_qty", "max_qty",
+        "min_notional", "max_notional",
+    )
+
+    def __init__(self):
+        self.tick_size = Decimal(0)
+        self.min_price = Decimal(0)
+        self.max_price = Decimal(0)
+        self.step_size = Decimal(0)
+        self.min_qty = Decimal(0)
+        self.max_qty = Decimal(0)
+        self.min_notional = Decimal(0)
+        self.max_notional = Decimal(0)
+
+# 심볼 -> 주문 규칙(갱신 시 dict 전체를 교체)
+_rules: Dict[str, SymbolRules] = {}
+_loaded_at = 0.0
+
+def fetch_exchange_info() -> Dict[str, Any]:
+    """
+    /api/v3/exchangeInfo 조회(SPOT)
+    -> get_symbols()와 주문 규칙 캐시가 같은 응답을 사용
+    """
+    url = API_URL + "/api/v3/exchangeInfo"
+    params = {
+        "permissions": "SPOT",
+        "showPermissionSets": "false"
+    }
+
+    resp = send_request("GET", url, params=params, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+def _parse_rules(symbol: Dict[str, Any]) -> SymbolRules:
+    rules = SymbolRules()
+    for f in symbol.get("filters", []):
+        filter_type = f.get("filterType")
+        if filter_type == "PRICE_FILTER":
+            rules.tick_size = Decimal(f["tickSize"])
+            rules.min_price = Decimal(f["minPrice"])
+            rules.max_price = Decimal(f["maxPrice"])
+        elif filter_type == "LOT_SIZE":
+            rules.step_size = Decimal(f["stepSize"])
+            rules.min_qty = Decimal(f["minQty"])
+            rules.max_qty = Decimal(f["maxQty"])
+        elif filter_type == "NOTIONAL":
+            rules.min_notional = Decimal(f.get("minNotional", "0"))
+            rules.max_notional = Decimal(f.get("maxNotional", "0"))
+        elif filter_type == "MIN_NOTIONAL":
+            rules.min_notional = Decimal(f.get("minNotional", "0"))
+    return rules
+
+def update_rules(exchange_info: Dict[str, Any]):
+    """
+    exchangeInfo 응답으로 캐시 교체
+    """
+    global _rules, _loaded_at
+
+    _rules = {
+        symbol["symbol"]: _parse_rules(symbol)
+        for symbol in exchange_info.get("symbols", [])
+        if symbol.get("status") == "TRADING"
+    }
+    _loaded_at = time.monotonic()
+
+def refresh_rules() -> bool:
+    """
+    exchangeInfo를 다시 조회하여 캐시 갱신
+
+    Returns:
+        성공 여부
+    """
+    try:
+        update_rules(fetch_exchange_info())
+        Info(f"Binance symbol rules loaded({len(_rules)})")
+        return True
+    except Exception as e:
+        Error(f"Failed to load Binance symbol rules : {e}")
+        traceback.print_exc()
+        return False
+
+def rules_loaded() -> bool:
+    return _loaded_at > 0.0
+
+def get_rules(symbol: str) -> Optional[SymbolRules]:
+    return _rules.get(str(symbol).upper())
+
+async def refresh_rules_loop():
+    """
+    규칙이 없거나 오래된 경우에만 다시 조회(서버 시작 시 실행)
+    -> exchangeInfo 주기 조회는 심볼 목록 갱신(symbol_catalog.refresh_loop) 하나로 처리
+    -> 주문 경로에서는 조회하지 않으므로 심볼 목록 갱신이 실패한 경우 여기서 재시도
+    """
+    while True:
+        await asyncio.sleep(SYMBOL_RULES_RETRY_SECONDS)
+        if rules_loaded() and time.monotonic() - _loaded_at < SYMBOL_RULES_MAX_AGE_SECONDS:
+            continue
+        await run_blocking(refresh_rules)
+
+def _quantize(value: Decimal, unit: Decimal, rounding) -> Decimal:
+    if unit <= 0:
+        return value
+    return ((value / unit).to_integral_value(rounding=rounding) * unit).normalize()
+
+def normalize_order(order: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """
+    가격/수량을 단위에 맞게 맞추고 필터 검사
+    -> 매수 가격은 내림, 매도 가격은 올림(불리한 가격으로 체결되지 않도록), 수량은 내림
+    -> 규칙이 아직 없으면(조회 실패 등) 검사 없이 그대로 반환
+
+    Returns:
+        (변환된 주문, 오류 메시지(문제가 없으면 빈 문자열))
+    """
+    rules = get_rules(order["symbol"])
+    if rules is None:
+        if rules_loaded():
+            return order, f"Unknown symbol({str(order['symbol']).upper()})"
+        return order, ""
+
+    try:
+        price = Decimal(str(order["price"]))
+        quantity = Decimal(str(order["quantity"]))
+    except (InvalidOperation, ValueError):
+        return order, "Invalid price or quantity"
+
+    price = _quantize(price, rules.tick_size, ROUND_FLOOR if order["side"] == "BUY" else ROUND_CEILING)
+    quantity = _quantize(quantity, rules.step_size, ROUND_FLOOR)
+
+    if price < rules.min_price or (rules.max_price > 0 and price > rules.max_price):
+        return order, f"Price out of range({rules.min_price} ~ {rules.max_price})"
+
+    if quantity <= 0 or quantity < rules.min_qty or (rules.max_qty > 0 and quantity > rules.max_qty):
+        return order, f"Quantity out of range({rules.min_qty} ~ {rules.max_qty}, step {rules.step_size})"
+
+    notional = price * quantity
+    if notional < rules.min_notional or (rules.max_notional > 0 and notional > rules.max_notional):
+        return order, f"Notional out of range(min {rules.min_notional})"
+
+    normalized = dict(order)
+    normalized["price"] = format(price, "f")
+    normalized["quantity"] = format(quantity, "f")
+    return normalized, ""
@@ -0,0 +1,256 @@
+"""
+Binance WebSocket API 주문 세션
+-> 사용자별로 session.logon 된 ws-api 연결을 유지하고 order.place/order.cancel 전송
+-> 요청마다 TLS 연결과 서명이 필요한 REST보다 주문 왕복 시간이 짧음
+-> REST와 같은 요청 제한 버킷(IP 가중치, 계정 주문 수)을 차감하고 응답의 rateLimits로 보정
+"""
+from .common import WS_URL, get_key, get_signed_payload_ws, acquire_ws_api, sync_ws_api_usage
+from ..Common.RateLimiter import RateLimitExceeded
+from ..Common.AsyncRunner import run_blocking
+from ..Common.Metrics import Histogram
+from ..Common.Debug import *
+
+from typing import Dict, Any, Optional
+import websockets
+import asyncio
+import json
+import time
+import uuid
+import os
+
+# 주문 전송 경로("ws" : WebSocket API 우선, "rest" : REST만 사용)
+ORDER_ENTRY_MODE = os.environ.get("BINANCE_ORDER_ENTRY", "ws").lower()
+# WebSocket API 요청 응답 대기 시간(초)
+WS_API_REQUEST_TIMEOUT_SECONDS = float(os.environ.get("BINANCE_WS_API_REQUEST_TIMEOUT_SECONDS", "5"))
+
+# 주문 왕복 시간(경로별)
+ORDER_LATENCY = {
+    "ws": Histogram("binance_order_latency_ws_seconds"),
+    "rest": Histogram("binance_order_latency_rest_seconds"),
+}
+
+class WsApiNotConnected(Exception):
+    """
+    요청을 전송하지 못한 경우(연결/로그온 실패)
+    -> 주문이 거래소에 도달하지 않았으므로 REST로 재전송해도 안전
+    """
+    pass
+
+class WsApiTimeout(Exception):
+    """
+    요청은 전송했으나 응답을 받지 못한 경우
+    -> 주문 접수 여부를 알 수 없으므로 재전송하지 않음
+    """
+    pass
+
+class WsApiSession:
+    """
+    사용자별 ws-api 세션(session.logon 상태 유지)
+    -> 요청 id로 응답을 매칭하므로 여러 요청을 동시에 보낼 수 있음
+    """
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.ws = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._connect_lock = asyncio.Lock()
+
+    def _connected(self) -> bool:
+        return self.ws is not None and self._reader_task is not None and not self._reader_task.done()
+
+    async def _connect(self):
+        """
+        연결 및 session.logon
+        """
+        async with self._connect_lock:
+            if self._connected():
+                return
+
+            ws = await websockets.connect(WS_URL, ping_interval=20, ping_timeout=10)
+            try:
+                params = {
+                    "apiKey": (await run_blocking(get_key, self.user_id))["API"],
+                }
+                payload = await run_blocking(get_signed_payload_ws, self.user_id, "session.logon", params)
+                await run_blocking(acquire_ws_api, self.user_id, "session.logon")
+                await ws.send(json.dumps(payload))
+                resp = json.loads(await asyncio.wait_for(ws.recv(), WS_API_REQUEST_TIMEOUT_SECONDS))
+                await run_blocking(sync_ws_api_usage, self.user_id, resp)
+
+                if resp.get("status") != 200:
+                    raise WsApiNotConnected(f"session.logon failed: {resp.get('error')}")
+            except Exception:
+                await ws.close()
+                raise
+
+            self.ws = ws
+            self._reader_task = asyncio.create_task(self._read_loop(ws))
+            Info(f"Binance ws-api session logged on({self.user_id})")
+
+    async def _read_loop(self, ws):
+        """
+        응답을 요청 id로 매칭
+        """
+        try:
+            async for message in ws:
+                resp = json.loads(message)
+                future = self._pending.pop(str(resp.get("id")), None)
+                if future is not None and not future.done():
+                    future.set_result(resp)
+        except websockets.exceptions.ConnectionClosed:
+            Info(f"Binance ws-api session closed({self.user_id})")
+        except Exception as e:
+            Error(f"Binance ws-api read error : {e}")
+        finally:
+            if self.ws is ws:
+                self.ws = None
+            # 응답을 받지 못한 요청은 접수 여부를 알 수 없음
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(WsApiTimeout("Connection closed before response"))
+
+    async def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        로그온된 세션으로 요청 전송
+        -> 로그온 상태에서는 apiKey, signature 없이 timestamp만 필요
+
+        Returns:
+            응답 전체({"id", "status", "result" 또는 "error"})
+
+        Raises:
+            RateLimitExceeded: 요청 제한으로 전송하지 못한 경우(REST로 재전송하지 않음)
+        """
+        try:
+            if not self._connected():
+                await self._connect()
+        except WsApiNotConnected:
+            raise
+        except Exception as e:
+            raise WsApiNotConnected(str(e))
+
+        # 제한 대기(sleep)는 이벤트 루프를 막지 않도록 스레드에서 처리
+        await run_blocking(acquire_ws_api, self.user_id, method)
+
+        request_id = str(uuid.uuid4())
+        params["timestamp"] = int(time.time() * 1000)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            await self.ws.send(json.dumps({"id": request_id, "method": method, "params": params}))
+        except Exception as e:
+            self._pending.pop(request_id, None)
+            raise WsApiNotConnected(str(e))
+
+        try:
+            resp = await asyncio.wait_for(future, WS_API_REQUEST_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._pending.pop(request_id, None)
+            raise WsApiTimeout(f"No response for {method}")
+
+        await run_blocking(sync_ws_api_usage, self.user_id, resp)
+        return resp
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+# 사용자별 세션
+_sessions: Dict[str, WsApiSession] = {}
+
+def get_session(user_id) -> WsApiSession:
+    session = _sessions.get(str(user_id))
+    if session is None:
+        session = WsApiSession(user_id)
+        _sessions[str(user_id)] = session
+    return session
+
+async def close_all_sessions():
+    """
+    모든 세션 종료(서버 종료 시)
+    """
+    sessions = list(_sessions.values())
+    _sessions.clear()
+    for session in sessions:
+        await session.close()
+
+async def place_order_ws(user_id, order) -> Dict[str, Any]:
+    """
+    order.place 전송
+
+    Raises:
+        WsApiNotConnected: 주문을 전송하지 못한 경우
+    """
+    result = {
+        "result": "error",
+        "message": "",
+    }
+
+    params = {
+        "symbol": str(order["symbol"]).upper(),
+        "side": order["side"],
+        "type": "LIMIT",
+
+        "timeInForce": "GTC",
+        "price": str(order["price"]),
+        "quantity": str(order["quantity"]),
+    }
+
+    try:
+        resp = await get_session(user_id).request("order.place", params)
+    except WsApiTimeout as e:
+        result["message"] = f"{e}(order status unknown)"
+        return result
+    except RateLimitExceeded as e:
+        result["result"] = "reject"
+        result["message"] = str(e)
+        return result
+
+    if resp.get("status") == 200:
+        result["result"] = "success"
+        result["order_id"] = str(resp["result"]["orderId"])
+        result["order"] = order
+    elif "error" in resp:
+        result["message"] = resp["error"].get("msg", "")
+
+    return result
+
+async def cancel_order_ws(user_id, order) -> Dict[str, Any]:
+    """
+    order.cancel 전송
+
+    Raises:
+        WsApiNotConnected: 취소 요청을 전송하지 못한 경우
+    """
+    result = {
+        "result": "error",
+        "message": "",
+    }
+
+    params = {
+        "symbol": str(order["symbol"]).upper(),
+        "orderId": int(order["order_id"]),
+    }
+
+    try:
+        resp = await get_session(user_id).request("order.cancel", params)
+    except WsApiTimeout as e:
+        result["message"] = str(e)
+        return result
+    except RateLimitExceeded as e:
+        result["message"] = str(e)
+        return result
+
+    if resp.get("status") == 200 and resp["result"].get("status") == "CANCELED":
+        result["result"] = "success"
+    elif "error" in resp:
+        result["message"] = resp["error"].get("msg", "")
+
+    return result
+
+def get_order_latency_stats() -> Dict[str, Any]:
+    """
+    경로별 주문 왕복 시간 히스토그램 조회
+    """
+    return {path: histogram.snapshot() for path, histogram in ORDER_LATENCY.items()}
@@ -0,0 +1,366 @@
+"""
+사용자/브로커별 계좌 상태(잔고, 미체결 주문) 메모리 저장소
+-> REST 조회로 초기화한 뒤 실시간 계좌 이벤트로 갱신
+-> 실시간 스트림이 연결되어 있는 동안에만 메모리 값을 신뢰하고, 주기적으로 REST 재조회
+"""
+from typing import List, Dict, Any, Optional, Tuple
+from decimal import Decimal, InvalidOperation
+import threading
+import time
+import os
+
+# 스트림 연결 중에도 이 시간이 지나면 REST로 재조회(누락/오차 보정)
+BALANCE_RECONCILE_SECONDS = float(os.environ.get("BALANCE_RECONCILE_SECONDS", "60"))
+ORDERS_RECONCILE_SECONDS = float(os.environ.get("ORDERS_RECONCILE_SECONDS", "30"))
+
+def _to_decimal(value) -> Decimal:
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return Decimal(0)
+
+def _format_amount(value: Decimal) -> str:
+    # 지수 표기 없이 불필요한 0 제거
+    text = format(value, "f")
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    return text or "0"
+
+class _StreamState:
+    __slots__ = ("seeded_at", "streams", "attached_at", "event_at")
+
+    def __init__(self):
+        # REST 조회 시각(0이면 미초기화)
+        self.seeded_at = 0.0
+        # 연결된 실시간 스트림 수
+        self.streams = 0
+        # 마지막 스트림 연결 시각
+        self.attached_at = 0.0
+        # 마지막 실시간 이벤트 수신 시각(미초기화 상태에서 받은 이벤트 포함)
+        self.event_at = 0.0
+
+class _BalanceState(_StreamState):
+    __slots__ = ("assets", "updated_at")
+
+    def __init__(self):
+        super().__init__()
+        # (type, symbol, display_name) -> 자산 정보
+        self.assets: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        # 자산별 마지막 절대값 갱신 시각(거래소 이벤트 시각, ms)
+        self.updated_at: Dict[Tuple[str, str, str], int] = {}
+
+class _OrderState(_StreamState):
+    __slots__ = ("orders",)
+
+    def __init__(self):
+        super().__init__()
+        # order_id -> 미체결 주문
+        self.orders: Dict[str, Dict[str, Any]] = {}
+
+class _StreamBackedStore:
+    """
+    실시간 스트림으로 갱신되는 사용자/브로커별 저장소 공통 부분
+    """
+    # 상태 클래스
+    state_class = _StreamState
+    # 스트림 연결 중 REST 재조회 주기(초)
+    reconcile_seconds = 60.0
+
+    def __init__(self):
+        self._states: Dict[Tuple[str, str], _StreamState] = {}
+        self._lock = threading.Lock()
+
+    def _fresh_state(self, user_id, broker: str):
+        """
+        메모리 값을 그대로 사용할 수 있는 상태 조회(lock 안에서 호출)
+        """
+        state = self._states.get((str(user_id), broker))
+        if state is None or state.streams <= 0 or state.seeded_at == 0.0:
+            return None
+        if time.monotonic() - state.seeded_at > self.reconcile_seconds:
+            return None
+        return state
+
+    def _begin_seed(self, user_id, broker: str, fetched_at: float):
+        """
+        REST 조회 결과를 저장할 상태 조회(lock 안에서 호출)
+        -> 스트림이 연결되지 않았거나 조회 도중 스트림이 새로 연결된 경우 None
+        -> 조회 도중 이벤트를 받은 경우에도 None(조회 결과가 이벤트보다 오래되었을 수 있음)
+           기존 값은 유지하고 seeded_at은 갱신하지 않으므로 다음 조회 시 다시 REST 조회
+        """
+        state = self._states.get((str(user_id), broker))
+        if state is None or fetched_at < state.attached_at or fetched_at < state.event_at:
+            return None
+        state.seeded_at = fetched_at
+        return state
+
+    def _event_state(self, user_id, broker: str):
+        """
+        이벤트 수신 시각 기록 후 이벤트를 반영할 수 있는 상태 조회(lock 안에서 호출)
+        """
+        state = self._states.get((str(user_id), broker))
+        if state is None:
+            return None
+        state.event_at = time.monotonic()
+        if state.seeded_at == 0.0:
+            return None
+        return state
+
+    def attach_stream(self, user_id, broker: str):
+        """
+        실시간 스트림 연결
+        -> 연결 전의 이벤트는 누락되었을 수 있으므로 다음 조회 시 REST 재조회
+        """
+        with self._lock:
+            key = (str(user_id), broker)
+            state = self._states.get(key)
+            if state is None:
+                state = self.state_class()
+                self._states[key] = state
+            state.streams += 1
+            state.attached_at = time.monotonic()
+            state.seeded_at = 0.0
+
+    def mark_gap(self, user_id, broker: str):
+        """
+        실시간 스트림 재연결
+        -> 연결이 끊긴 동안의 이벤트는 누락되었을 수 있으므로 다음 조회 시 REST 재조회
+        """
+        with self._lock:
+            state = self._states.get((str(user_id), broker))
+            if state is None:
+                return
+            state.attached_at = time.monotonic()
+            state.seeded_at = 0.0
+
+    def detach_stream(self, user_id, broker: str):
+        """
+        실시간 스트림 연결 해제
+        """
+        with self._lock:
+            key = (str(user_id), broker)
+            state = self._states.get(key)
+            if state is None:
+                return
+            state.streams = max(0, state.streams - 1)
+            if state.streams == 0:
+                del self._states[key]
+
+class BalanceStore(_StreamBackedStore):
+    """
+    사용자/브로커별 잔고 저장소
+    """
+    state_class = _BalanceState
+    reconcile_seconds = BALANCE_RECONCILE_SECONDS
+
+    def _find(self, state: _BalanceState, asset_type: str, symbol: str, display_name: Optional[str]):
+        if display_name is not None:
+            key = (asset_type, symbol, display_name)
+            return key if key in state.assets else None
+        for key in state.assets:
+            if key[0] == asset_type and key[1] == symbol:
+                return key
+        return None
+
+    def _store_amount(self, state: _BalanceState, key, asset_type: str, symbol: str, display_name: Optional[str], value: Decimal):
+        """
+        수량 저장(없는 자산이면 추가, 0이면 제거)
+
+        Returns:
+            저장된 자산의 키
+        """
+        if value == 0:
+            if key is not None:
+                del state.assets[key]
+            return key
+
+        if key is None:
+            key = (asset_type, symbol, display_name or symbol)
+            state.assets[key] = {
+                "type": asset_type,
+                "display_name": key[2],
+                "symbol": symbol,
+            }
+        state.assets[key]["amount"] = _format_amount(value)
+        return key
+
+    def get(self, user_id, broker: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        메모리 잔고 조회
+
+        Returns:
+            자산 리스트 또는 REST 재조회가 필요한 경우 None
+            (스트림 미연결, 미초기화, 재조회 주기 경과)
+        """
+        with self._lock:
+            state = self._fresh_state(user_id, broker)
+            if state is None:
+                return None
+            return [dict(asset) for asset in state.assets.values()]
+
+    def seed(self, user_id, broker: str, assets: List[Dict[str, Any]], fetched_at: float):
+        """
+        REST 조회 결과로 잔고 전체를 교체
+
+        Args:
+            fetched_at: REST 조회 시작 시각(time.monotonic())
+            -> 조회 도중 스트림이 새로 연결되었거나 이벤트를 받은 경우 무시
+        """
+        with self._lock:
+            state = self._begin_seed(user_id, broker, fetched_at)
+            if state is None:
+                return
+            state.assets = {
+                (asset["type"], asset["symbol"], asset["display_name"]): dict(asset)
+                for asset in assets
+            }
+            state.updated_at = {}
+
+    def set_amount(
+        self,
+        user_id,
+        broker: str,
+        asset_type: str,
+        symbol: str,
+        amount,
+        display_name: Optional[str] = None,
+        event_time: int = 0,
+        default_display_name: Optional[str] = None
+    ):
+        """
+        자산 수량을 절대값으로 갱신(수량이 0이면 제거)
+
+        Args:
+            display_name: 지정 시 (type, symbol, display_name)이 일치하는 자산만 갱신
+            event_time: 거래소 이벤트 시각(ms), 이후의 증감 이벤트 중복 적용 방지용
+            default_display_name: 새 자산 추가 시 사용할 표시 이름
+        """
+        with self._lock:
+            state = self._event_state(user_id, broker)
+            if state is None:
+                return
+
+            key = self._find(state, asset_type, symbol, display_name)
+            key = self._store_amount(state, key, asset_type, symbol, display_name or default_display_name, _to_decimal(amount))
+            if event_time and key is not None:
+                state.updated_at[key] = event_time
+
+    def apply_delta(
+        self,
+        user_id,
+        broker: str,
+        asset_type: str,
+        symbol: str,
+        delta,
+        display_name: Optional[str] = None,
+        event_time: int = 0,
+        default_display_name: Optional[str] = None
+    ):
+        """
+        자산 수량을 증감
+
+        Args:
+            display_name: 지정 시 (type, symbol, display_name)이 일치하는 자산만 갱신
+            event_time: 거래소 이벤트 시각(ms)
+            -> 이 시각 이후의 절대값 갱신이 이미 반영된 경우 무시
+            default_display_name: 새 자산 추가 시 사용할 표시 이름
+        """
+        with self._lock:
+            state = self._event_state(user_id, broker)
+            if state is None:
+                return
+
+            key = self._find(state, asset_type, symbol, display_name)
+            if key is not None and event_time and state.updated_at.get(key, 0) >= event_time:
+                return
+
+            current = _to_decimal(state.assets[key]["amount"]) if key is not None else Decimal(0)
+            self._store_amount(state, key, asset_type, symbol, display_name or default_display_name, current + _to_decimal(delta))
+
+class OpenOrderStore(_StreamBackedStore):
+    """
+    사용자/브로커별 미체결 주문 저장소(order_id 기준)
+    """
+    state_class = _OrderState
+    reconcile_seconds = ORDERS_RECONCILE_SECONDS
+
+    def get(self, user_id, broker: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        메모리 미체결 주문 조회
+
+        Returns:
+            주문 리스트 또는 REST 재조회가 필요한 경우 None
+        """
+        with self._lock:
+            state = self._fresh_state(user_id, broker)
+            if state is None:
+                return None
+            return [dict(order) for order in state.orders.values()]
+
+    def seed(self, user_id, broker: str, orders: List[Dict[str, Any]], fetched_at: float):
+        """
+        REST 조회 결과로 미체결 주문 전체를 교체
+
+        Args:
+            fetched_at: REST 조회 시작 시각(time.monotonic())
+            -> 조회 도중 스트림이 새로 연결되었거나 이벤트를 받은 경우 무시
+        """
+        with self._lock:
+            state = self._begin_seed(user_id, broker, fetched_at)
+            if state is None:
+                return
+            state.orders = {str(order["order_id"]): dict(order) for order in orders}
+
+    def apply_event(self, user_id, broker: str, event: Dict[str, Any]) -> Optional[str]:
+        """
+        정규화된 주문 이벤트(NEW/TRADE/CANCELED) 반영
+
+        Returns:
+            이벤트 반영 후 잔여 수량(알 수 없으면 None)
+        """
+        order_id = str(event.get("order_id"))
+        status = event.get("order_status")
+
+        with self._lock:
+            state = self._event_state(user_id, broker)
+
+            if status == "NEW":
+                if state is not None:
+                    state.orders[order_id] = {
+                        "order_id": event["order_id"],
+                        "symbol": event["symbol"],
+                        "side": str(event["side"]).lower(),
+                        "price": event["price"],
+                        "amount": event["quantity"],
+                    }
+                return event.get("quantity")
+
+            if status == "CANCELED":
+                if state is not None:
+                    state.orders.pop(order_id, None)
+                return "0"
+
+            if status == "TRADE":
+                # 거래소가 잔여 수량을 알려주는 경우 그대로 사용
+                remaining = event.get("remaining_quantity")
+                order = state.orders.get(order_id) if state is not None else None
+
+                if remaining is None:
+                    if order is None:
+                        return None
+                    remaining = _format_amount(
+                        _to_decimal(order["amount"]) - _to_decimal(event.get("filled_quantity", 0))
+                    )
+
+                if order is not None:
+                    if _to_decimal(remaining) <= 0:
+                        del state.orders[order_id]
+                    else:
+                        order["amount"] = remaining
+                return remaining
+
+        return None
+
+# 전역 잔고/미체결 주문 저장소
+balance_store = BalanceStore()
+open_order_store = OpenOrderStore()
@@ -21,35 +21,50 @@ def get_candles_from_db(
         with get_db_conn() as conn:
             cursor = conn.cursor()
             
-            query = """
-                SELECT 
-                    broker_name, symbol, interval,
-                    open_time, close_time,
-                    open, high, low, close, volume,
-                    quote_volume, trade_count,
-                    taker_buy_base_asset_volume, taker_buy_quote_asset_volume,
-                    inserted_at
-                FROM candle_data
-                WHERE broker_name = %s
-                    AND symbol = %s
-                    AND interval = %s
-            """
+            # 자주 사용되는 조회 범위는 Prepared Statement 사용
+            if start_time is None and end_time:
+                conn.execute_prepared(
+                    cursor,
+                    "candle_range_before",
+                    (broker_name, symbol, interval, end_time, limit)
+                )
+            elif start_time and end_time:
+                conn.execute_prepared(
+                    cursor,
+                    "candle_range_between",
+                    (broker_name, symbol, interval, start_time, end_time, limit)
+                )
+            else:
+                query = """
+                    SELECT 
+                        broker_name, symbol, interval,
+                        open_time, close_time,
+                        open, high, low, close, volume,
+                        quote_volume, trade_count,
+                        taker_buy_base_asset_volume, taker_buy_quote_asset_volume,
+                        inserted_at
+                    FROM candle_data
+                    WHERE broker_name = %s
+                        AND symbol = %s
+                        AND interval = %s
+                """
+            
+                params = [broker_name, symbol, interval]
             
-            params = [broker_name, symbol, interval]
+                if start_time:
+                    query += " AND open_time >= %s"
+                    params.append(start_time)
             
-            if start_time:
-                query += " AND open_time >= %s"
-                params.append(start_time)
+                if end_time:
+                    query += " AND open_time <= %s"
+                    params.append(end_time)
             
-            if end_time:
-                query += " AND open_time <= %s"
-                params.append(end_time)
+                # 가져오는 것은 최신 데이터부터 가져오기
+                query += " ORDER BY open_time DESC LIMIT %s"
+                params.append(limit)
             
-            # 가져오는 것은 최신 데이터부터 가져오기
-            query += " ORDER BY open_time DESC LIMIT %s"
-            params.append(limit)
+                cursor.execute(query, params)
             
-            cursor.execute(query, params)
             rows = cursor.fetchall()
             
             cursor.close()
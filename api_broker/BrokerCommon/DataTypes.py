@@ -1,7 +1,7 @@
 """
 주문, 자산, 거래 등에 대한 정규화된 데이터 형식 정의
 """
-from typing import TypedDict, Literal
+from typing import TypedDict, Literal, List, Dict, Any
 
 class NormalizedAsset(TypedDict):
     display_name: str
@@ -31,4 +31,15 @@ class NormalizedPlaceOrder(TypedDict):
 
 class NormalizedCancelOrder(TypedDict):
     symbol: str
-    order_id: str
\ No newline at end of file
+    order_id: str
+
+def summarize_cancel_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    주문별 취소 결과를 하나의 응답으로 정리(모든 주문 취소)
+    """
+    failed = [result for result in results if result["result"] != "success"]
+    return {
+        "result": "success" if not failed else "error",
+        "message": "" if not failed else f"{len(failed)} of {len(results)} cancels failed",
+        "orders": results,
+    }
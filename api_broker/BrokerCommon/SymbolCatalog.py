@@ -0,0 +1,179 @@
+"""
+브로커별 심볼 목록 캐시 및 검색 인덱스
+-> 브로커의 get_symbols()는 한 번만 호출하고 주기적으로 백그라운드에서 갱신
+-> 전체 목록 응답(JSON)과 ETag는 미리 만들어 두고, 검색은 접두어/trigram 인덱스로 처리
+"""
+from .BrokerFactory import BrokerFactory
+from ..Common.AsyncRunner import run_blocking
+from ..Common.Debug import *
+
+from typing import List, Dict, Any, Optional, Set, Tuple
+import asyncio
+import bisect
+import hashlib
+import json
+import threading
+import time
+import os
+
+# 백그라운드 갱신 주기(초)
+SYMBOL_CATALOG_REFRESH_SECONDS = float(os.environ.get("SYMBOL_CATALOG_REFRESH_SECONDS", "3600"))
+# 검색 결과 최대 개수
+SYMBOL_SEARCH_MAX_LIMIT = 100
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SymbolIndex:
+    """
+    심볼/표시 이름 검색 인덱스
+    -> 접두어 : 정렬된 (키, 번호) 리스트에서 bisect
+    -> 부분 문자열 : trigram별 번호 집합의 교집합 후 확인
+    """
+    def __init__(self, symbols: List[Dict[str, Any]]):
+        self.symbols = symbols
+        self._symbol_keys = [str(s["symbol"]).lower() for s in symbols]
+        self._name_keys = [str(s.get("display_name") or "").lower() for s in symbols]
+
+        # 심볼 접두어 인덱스
+        self._symbol_prefix: List[Tuple[str, int]] = sorted(
+            (key, i) for i, key in enumerate(self._symbol_keys)
+        )
+        # 표시 이름 단어별 접두어 인덱스
+        self._word_prefix: List[Tuple[str, int]] = sorted(
+            (word, i) for i, name in enumerate(self._name_keys) for word in set(name.split())
+        )
+        # trigram -> 번호 집합(심볼 + 표시 이름)
+        self._trigram: Dict[str, Set[int]] = {}
+        for i in range(len(symbols)):
+            for gram in _trigrams(self._symbol_keys[i]) | _trigrams(self._name_keys[i]):
+                self._trigram.setdefault(gram, set()).add(i)
+
+    def _prefix(self, entries: List[Tuple[str, int]], query: str, limit: int) -> List[int]:
+        result = []
+        start = bisect.bisect_left(entries, (query, -1))
+        for key, i in entries[start:]:
+            if not key.startswith(query) or len(result) >= limit:
+                break
+            result.append(i)
+        return result
+
+    def _substring(self, query: str) -> List[int]:
+        grams = sorted(_trigrams(query), key=lambda gram: len(self._trigram.get(gram, ())))
+        if not grams:
+            return []
+
+        candidates = set(self._trigram.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates &= self._trigram.get(gram, set())
+
+        return sorted(
+            i for i in candidates
+            if query in self._symbol_keys[i] or query in self._name_keys[i]
+        )
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        검색(정확히 일치 -> 심볼 접두어 -> 이름 단어 접두어 -> 부분 문자열 순)
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.symbols[:limit]
+
+        order: List[int] = []
+        seen: Set[int] = set()
+
+        def add(indices):
+            for i in indices:
+                if i not in seen:
+                    seen.add(i)
+                    order.append(i)
+
+        add(self._prefix(self._symbol_prefix, query, limit))
+        # 정확히 일치하는 심볼을 맨 앞으로
+        order.sort(key=lambda i: self._symbol_keys[i] != query)
+
+        if len(order) < limit:
+            add(self._prefix(self._word_prefix, query, limit))
+        if len(order) < limit and len(query) >= 3:
+            add(self._substring(query))
+
+        return [self.symbols[i] for i in order[:limit]]
+
+class _CatalogEntry:
+    __slots__ = ("body", "etag", "index", "loaded_at")
+
+    def __init__(self, body: bytes, etag: str, index: SymbolIndex):
+        self.body = body
+        self.etag = etag
+        self.index = index
+        self.loaded_at = time.monotonic()
+
+class SymbolCatalog:
+    """
+    브로커별 심볼 목록 캐시
+    """
+    def __init__(self):
+        self._entries: Dict[str, _CatalogEntry] = {}
+        # get() 안에서 refresh()를 호출하므로 재진입 가능한 lock
+        self._lock = threading.RLock()
+
+    def refresh(self, broker_name: str) -> Optional[_CatalogEntry]:
+        """
+        브로커에서 심볼 목록을 다시 조회하여 교체
+        -> 조회 실패(빈 목록) 시 기존 목록 유지
+        -> get()의 최초 조회와 동시에 조회/교체하지 않도록 lock
+        """
+        with self._lock:
+            symbols = BrokerFactory.create_broker(broker_name).get_symbols()
+            if not symbols:
+                Error(f"Empty symbol list({broker_name}), keep previous catalog")
+                return self._entries.get(broker_name)
+
+            body = json.dumps({
+                "message": "success",
+                "broker": broker_name,
+                "symbols": symbols,
+            }, ensure_ascii=False).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+            entry = _CatalogEntry(body, etag, SymbolIndex(symbols))
+            self._entries[broker_name] = entry
+            Info(f"Symbol catalog loaded({broker_name}, {len(symbols)})")
+            return entry
+
+    def get(self, broker_name: str) -> Optional[_CatalogEntry]:
+        """
+        캐시된 목록 조회(없으면 조회, 동시에 여러 번 조회하지 않도록 lock)
+        """
+        entry = self._entries.get(broker_name)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(broker_name)
+            if entry is None:
+                entry = self.refresh(broker_name)
+            return entry
+
+    def search(self, broker_name: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        entry = self.get(broker_name)
+        if entry is None:
+            return []
+        return entry.index.search(query, max(1, min(limit, SYMBOL_SEARCH_MAX_LIMIT)))
+
+    async def refresh_loop(self):
+        """
+        주기적으로 모든 브로커의 목록 갱신(서버 시작 시 실행)
+        """
+        while True:
+            for broker_name in BrokerFactory.get_available_brokers():
+                try:
+                    await run_blocking(self.refresh, broker_name)
+                except Exception as e:
+                    Error(f"Symbol catalog refresh failed({broker_name}) : {e}")
+            await asyncio.sleep(SYMBOL_CATALOG_REFRESH_SECONDS)
+
+symbol_catalog = SymbolCatalog()
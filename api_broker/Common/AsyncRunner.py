@@ -0,0 +1,39 @@
+"""
+블로킹 호출(psycopg2, redis-py, requests 등)을 이벤트 루프 밖에서 실행하기 위한 유틸리티
+-> FastAPI의 동기(def) 엔드포인트/의존성과 같은 스레드 풀(anyio limiter)을 공유
+"""
+from anyio import to_thread
+from typing import Any, Awaitable, Callable, Iterable, List
+import asyncio
+import functools
+import os
+
+# 블로킹 작업용 스레드 풀 크기
+# -> DB 커넥션 풀 최대 크기(DB_MAX_CONN)보다 작아야 함
+THREAD_POOL_SIZE = int(os.environ.get("THREAD_POOL_SIZE", "40"))
+
+def configure_thread_pool(size: int = THREAD_POOL_SIZE):
+    """
+    스레드 풀 크기 설정
+    -> 이벤트 루프 안에서(서버 시작 시) 호출해야 함
+    """
+    to_thread.current_default_thread_limiter().total_tokens = size
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    블로킹 함수를 스레드 풀에서 실행하고 결과를 반환
+    """
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+async def gather_bounded(aws: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """
+    동시 실행 수를 limit 이하로 제한하여 gather
+    -> 결과는 입력 순서대로 반환하며, 예외는 결과 자리에 그대로 담김
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*[run(aw) for aw in aws], return_exceptions=True)
@@ -1,7 +1,13 @@
 from .Debug import *
+from .Metrics import Histogram, Gauge
+from .AsyncRunner import run_blocking
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import pool, extensions
 from psycopg2.extras import RealDictCursor
+from collections import deque
+from typing import Dict, Any
+import threading
+import time
 import os
 
 # DB 서버 관련 환경변수 읽기
@@ -13,20 +19,332 @@ DB_ROOT_CA_PATH = os.environ.get("DB_ROOT_CA_PATH")
 DB_CERT_PATH = os.environ.get("DB_CERT_PATH")
 DB_CERT_KEY_PATH = os.environ.get("DB_CERT_KEY_PATH")
 
-DB_MIN_CONN = 1
-DB_MAX_CONN = 100
+DB_MIN_CONN = int(os.environ.get("DB_MIN_CONN", "1"))
+DB_MAX_CONN = int(os.environ.get("DB_MAX_CONN", "100"))
+# 커넥션 풀이 가득 찬 경우 최대 대기 시간(초)
+DB_POOL_TIMEOUT_SECONDS = float(os.environ.get("DB_POOL_TIMEOUT_SECONDS", "10"))
+# 이 시간 이상 유휴 상태였던 커넥션은 사용 전 생존 확인(SELECT 1)
+DB_HEALTHCHECK_IDLE_SECONDS = float(os.environ.get("DB_HEALTHCHECK_IDLE_SECONDS", "30"))
+# 이 시간 이상 사용된 커넥션은 폐기 후 재생성
+DB_MAX_LIFETIME_SECONDS = float(os.environ.get("DB_MAX_LIFETIME_SECONDS", "1800"))
+
+# 자주 실행되는 쿼리의 Prepared Statement 목록
+# -> 이름: (파라미터 타입, 쿼리)
+PREPARED_STATEMENTS = {
+    # 종료 시각 이전의 최신 캔들 조회
+    "candle_range_before": (
+        ("text", "text", "text", "timestamp", "integer"),
+        """
+        SELECT
+            broker_name, symbol, interval,
+            open_time, close_time,
+            open, high, low, close, volume,
+            quote_volume, trade_count,
+            taker_buy_base_asset_volume, taker_buy_quote_asset_volume,
+            inserted_at
+        FROM candle_data
+        WHERE broker_name = $1
+            AND symbol = $2
+            AND interval = $3
+            AND open_time <= $4
+        ORDER BY open_time DESC LIMIT $5
+        """,
+    ),
+    # 시작~종료 시각 범위의 최신 캔들 조회
+    "candle_range_between": (
+        ("text", "text", "text", "timestamp", "timestamp", "integer"),
+        """
+        SELECT
+            broker_name, symbol, interval,
+            open_time, close_time,
+            open, high, low, close, volume,
+            quote_volume, trade_count,
+            taker_buy_base_asset_volume, taker_buy_quote_asset_volume,
+            inserted_at
+        FROM candle_data
+        WHERE broker_name = $1
+            AND symbol = $2
+            AND interval = $3
+            AND open_time >= $4
+            AND open_time <= $5
+        ORDER BY open_time DESC LIMIT $6
+        """,
+    ),
+    # 사용자의 브로커별 토큰 전체 조회
+    "user_tokens_by_broker": (
+        ("integer", "text"),
+        """
+        SELECT token_name, token
+        FROM user_tokens
+        WHERE user_id = $1 AND broker_name = $2
+        """,
+    ),
+    # Passkey 로그인 사용자 조회
+    "passkey_user_by_username": (
+        ("text",),
+        "SELECT user_id FROM users WHERE username = $1",
+    ),
+    # Passkey 로그인 Credential 조회
+    "passkey_credential": (
+        ("integer", "text"),
+        """
+        SELECT credential_id, public_key, sign_count
+        FROM passkey_credentials
+        WHERE user_id = $1 AND credential_id = $2
+        """,
+    ),
+}
 
 _db_pool = None
 
+class PoolTimeoutError(Exception):
+    """
+    커넥션 풀 대기 시간 초과
+    """
+    pass
+
+class _PoolEntry:
+    """
+    풀에서 관리하는 커넥션과 부가 정보
+    """
+    __slots__ = ("conn", "created_at", "last_used", "prepared")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+        # 이 커넥션에 PREPARE 된 statement 이름
+        self.prepared = set()
+
+class ConnectionPool:
+    """
+    스레드 안전한 PostgreSQL 커넥션 풀
+
+    - 풀이 가득 차면 timeout 까지만 대기(PoolTimeoutError)
+    - 오래 유휴 상태였던 커넥션은 사용 전 생존 확인
+    - 최대 수명을 넘긴 커넥션은 재생성
+    - 반환 시 열려있는 트랜잭션은 rollback
+    """
+    def __init__(self, minconn: int, maxconn: int, timeout: float, **connect_kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        # 가장 최근에 반환된 커넥션부터 재사용(LIFO)
+        self._idle = deque()
+        # 생성된 전체 커넥션 수(생성 중인 커넥션 포함)
+        self._size = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._closed = False
+
+        # 지표
+        self.wait_time = Histogram("db_pool_wait_seconds")
+        # 풀 상태는 /metrics 조회 시점의 값을 그대로 노출
+        Gauge("db_pool_connections", {"state": "in_use"}).set_function(lambda: self._in_use)
+        Gauge("db_pool_connections", {"state": "idle"}).set_function(lambda: len(self._idle))
+        Gauge("db_pool_waiters").set_function(lambda: self._waiters)
+        Gauge("db_pool_size").set_function(lambda: self._size)
+        self.timeouts = 0
+        self.recycled = 0
+        self.health_check_failures = 0
+
+        for _ in range(minconn):
+            self._idle.append(self._new_entry())
+            self._size += 1
+
+    def _new_entry(self) -> _PoolEntry:
+        return _PoolEntry(psycopg2.connect(**self._connect_kwargs))
+
+    def _close_entry(self, entry: _PoolEntry):
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+
+    def _is_alive(self, entry: _PoolEntry) -> bool:
+        if entry.conn.closed:
+            return False
+        try:
+            cursor = entry.conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            entry.conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _prepare_for_use(self, entry: _PoolEntry) -> _PoolEntry:
+        """
+        대기열에서 꺼낸 커넥션의 수명/생존 여부 확인
+        -> 사용할 수 없는 경우 새 커넥션으로 교체
+        """
+        now = time.monotonic()
+
+        if now - entry.created_at > DB_MAX_LIFETIME_SECONDS:
+            self._close_entry(entry)
+            self.recycled += 1
+            return self._new_entry()
+
+        if now - entry.last_used > DB_HEALTHCHECK_IDLE_SECONDS and not self._is_alive(entry):
+            self._close_entry(entry)
+            self.health_check_failures += 1
+            return self._new_entry()
+
+        return entry
+
+    def getconn(self, timeout: float = None) -> _PoolEntry:
+        """
+        커넥션 대여
+
+        Args:
+            timeout: 최대 대기 시간(초), None 이면 풀 기본값
+
+        Raises:
+            PoolTimeoutError: 대기 시간 초과 시
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        start = time.monotonic()
+        deadline = start + timeout
+        entry = None
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise pool.PoolError("connection pool is closed")
+
+                if self._idle:
+                    entry = self._idle.pop()
+                    break
+
+                # 여유가 있으면 새 커넥션 생성(생성은 lock 밖에서)
+                if self._size < self.maxconn:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeoutError(
+                        f"DB connection pool exhausted ({self.maxconn} in use, waited {timeout}s)"
+                    )
+
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+            self._in_use += 1
+
+        self.wait_time.observe(time.monotonic() - start)
+
+        try:
+            if entry is None:
+                return self._new_entry()
+            return self._prepare_for_use(entry)
+        except Exception:
+            # 커넥션 생성 실패 시 자리 반환
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, entry: _PoolEntry, discard: bool = False):
+        """
+        커넥션 반환
+
+        Args:
+            entry: getconn() 으로 받은 커넥션
+            discard: True 이면 재사용하지 않고 폐기
+        """
+        conn = entry.conn
+
+        if not discard:
+            try:
+                if conn.closed:
+                    discard = True
+                else:
+                    status = conn.info.transaction_status
+                    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                        discard = True
+                    elif status != extensions.TRANSACTION_STATUS_IDLE:
+                        # 커밋되지 않은 트랜잭션 정리
+                        conn.rollback()
+            except Exception:
+                discard = True
+
+        if not discard and time.monotonic() - entry.created_at > DB_MAX_LIFETIME_SECONDS:
+            discard = True
+            self.recycled += 1
+
+        if discard:
+            self._close_entry(entry)
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+            self._cond.notify()
+
+        if self._closed and not discard:
+            self._close_entry(entry)
+
+    def closeall(self):
+        """
+        모든 유휴 커넥션 종료
+        -> 사용 중인 커넥션은 반환 시 종료됨
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+
+        for entry in idle:
+            self._close_entry(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        풀 상태 및 지표 조회
+        """
+        with self._cond:
+            stats = {
+                "size": self._size,
+                "max": self.maxconn,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiters": self._waiters,
+            }
+
+        stats.update({
+            "timeouts": self.timeouts,
+            "recycled": self.recycled,
+            "health_check_failures": self.health_check_failures,
+            "wait_seconds": self.wait_time.snapshot(),
+        })
+        return stats
+
 def init_db_pool():
     global _db_pool
     if _db_pool is None:
         try:
             # SSL 인증서가 모두 있으면 인증서 기반 인증 사용
             if DB_ROOT_CA_PATH and DB_CERT_PATH and DB_CERT_KEY_PATH:
-                _db_pool = pool.ThreadedConnectionPool(
+                _db_pool = ConnectionPool(
                     minconn=DB_MIN_CONN,
                     maxconn=DB_MAX_CONN,
+                    timeout=DB_POOL_TIMEOUT_SECONDS,
                     host=DB_HOST,
                     database=DB_NAME,
                     user=DB_ID,
@@ -38,9 +356,10 @@ def init_db_pool():
                 )
             # 그 외에는 비밀번호 기반 인증 사용
             else:
-                _db_pool = pool.ThreadedConnectionPool(
+                _db_pool = ConnectionPool(
                     minconn=DB_MIN_CONN,
                     maxconn=DB_MAX_CONN,
+                    timeout=DB_POOL_TIMEOUT_SECONDS,
                     host=DB_HOST,
                     database=DB_NAME,
                     user=DB_ID,
@@ -53,44 +372,88 @@ def init_db_pool():
             Error(f"{e}")
 
 class PooledConnection:
-    def __init__(self, pool, conn):
+    def __init__(self, pool, entry):
         self._pool = pool
-        self._conn = conn
+        self._entry = entry
+        self._conn = entry.conn
         self._closed = False
 
     def close(self):
         if not self._closed and self._conn:
             # 연결을 닫지 않고 Pool에 반환
-            self._pool.putconn(self._conn)
+            self._pool.putconn(self._entry)
             self._closed = True
             self._conn = None
+            self._entry = None
+
+    def execute_prepared(self, cursor, name: str, params: tuple):
+        """
+        PREPARED_STATEMENTS 에 등록된 쿼리를 실행
+        -> 커넥션마다 최초 1회만 PREPARE 하고 이후에는 EXECUTE 만 수행
+
+        Args:
+            cursor: 이 커넥션에서 생성한 커서
+            name: PREPARED_STATEMENTS 의 키
+            params: 쿼리 파라미터
+        """
+        param_types, query = PREPARED_STATEMENTS[name]
+
+        if name not in self._entry.prepared:
+            cursor.execute(f"PREPARE {name} ({', '.join(param_types)}) AS {query}")
+            self._entry.prepared.add(name)
+
+        placeholders = ", ".join(["%s"] * len(param_types))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        print("DB Pool Closed!")
         self.close()
 
     def __getattr__(self, name):
         # 그 외 모든 속성/메서드는 원본 연결 객체로 전달
         return getattr(self._conn, name)
 
-def get_db_conn():
-    global _db_pool
+def get_db_conn(timeout: float = None):
+    """
+    커넥션 풀에서 커넥션 대여
+
+    Args:
+        timeout: 최대 대기 시간(초), None 이면 DB_POOL_TIMEOUT_SECONDS
+
+    Raises:
+        PoolTimeoutError: 풀이 가득 차 대기 시간을 초과한 경우
+    """
     if _db_pool is None:
         init_db_pool()
     
     if _db_pool:
         try:
-            conn = _db_pool.getconn()
-            if conn:
-                return PooledConnection(_db_pool, conn)
+            entry = _db_pool.getconn(timeout)
+            return PooledConnection(_db_pool, entry)
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             Error(f"{e}")
     
     return None
 
+async def get_db_conn_async(timeout: float = None):
+    """
+    get_db_conn() 의 비동기 버전
+    -> 풀 대기를 스레드 풀에서 수행하여 이벤트 루프 차단 방지
+    """
+    return await run_blocking(get_db_conn, timeout)
+
+def get_db_pool_stats() -> Dict[str, Any]:
+    """
+    커넥션 풀 상태 조회(in_use, idle, waiters, 대기 시간 히스토그램 등)
+    """
+    if _db_pool is None:
+        return {}
+    return _db_pool.stats()
+
 class DBManager:
     def __init__(self):
         self.conn = None
@@ -1,26 +1,97 @@
-import inspect
+"""
+로그 출력
+-> Error/Info/Debug는 호출 위치와 값만 큐에 넣고, 문자열 변환/출력은 별도 스레드(QueueListener)에서 처리
+-> LOG_LEVEL(DEBUG/INFO/ERROR/OFF)보다 낮은 로그는 호출 위치도 조회하지 않음
+-> LOG_FORMAT=json이면 한 줄 JSON(로그 수집용), 기본값은 기존과 같은 텍스트 형식
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
 import os
 
-def func_name(depth=2):
-    if len(inspect.stack()) > depth:
-        return inspect.stack()[depth].function
+__all__ = ["Error", "Info", "Debug", "func_name", "file_name"]
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+
+_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "ERROR": logging.ERROR,
+    "OFF": logging.CRITICAL + 1,
+}
+_LEVEL_NAMES = {
+    logging.DEBUG: "Debug",
+    logging.INFO: "Info",
+    logging.ERROR: "Error",
+}
+_level = _LEVELS.get(LOG_LEVEL, logging.INFO)
 
-    return "None"
+def func_name(depth=2):
+    try:
+        return sys._getframe(depth).f_code.co_name
+    except ValueError:
+        return "None"
 
 def file_name(depth=2):
     try:
-        if len(inspect.stack()) > depth:
-            return inspect.stack()[depth].filename
-            #return os.path.basename(inspect.stack()[depth].filename)
-    except:
-        pass
-    
-    return "None"
+        return sys._getframe(depth).f_code.co_filename
+    except ValueError:
+        return "None"
+
+class _Formatter(logging.Formatter):
+    """
+    출력 스레드에서 값 -> 문자열 변환
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        message = " ".join(str(value) for value in record.values)
+        if LOG_FORMAT == "json":
+            return json.dumps({
+                "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+                "level": record.levelname,
+                "file": record.pathname,
+                "func": record.funcName,
+                "line": record.lineno,
+                "message": message,
+            }, ensure_ascii=False)
+        return f"[ {_LEVEL_NAMES.get(record.levelno, record.levelname)} : {record.pathname} / {record.funcName} ]\n{message}"
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 기본 구현은 호출 스레드에서 문자열로 변환하므로 레코드를 그대로 전달
+        return record
+
+_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(_Formatter())
+_listener = logging.handlers.QueueListener(_queue, _stream_handler)
+_listener.start()
+atexit.register(_listener.stop)
+
+_logger = logging.getLogger("api_broker")
+_logger.setLevel(_level)
+_logger.propagate = False
+_logger.addHandler(_QueueHandler(_queue))
+
+def _log(level: int, frame, values: tuple):
+    code = frame.f_code
+    record = _logger.makeRecord(
+        _logger.name, level, code.co_filename, frame.f_lineno,
+        "", None, None, code.co_name, {"values": values},
+    )
+    _logger.handle(record)
 
 def Error(*values):
-    print(f"[ Error : {file_name()} / {func_name()} ]")
-    print(*values)
+    if _level <= logging.ERROR:
+        _log(logging.ERROR, sys._getframe(1), values)
 
 def Info(*values):
-    print(f"[ Info : {file_name()} / {func_name()} ]")
-    print(*values)
\ No newline at end of file
+    if _level <= logging.INFO:
+        _log(logging.INFO, sys._getframe(1), values)
+
+def Debug(*values):
+    if _level <= logging.DEBUG:
+        _log(logging.DEBUG, sys._getframe(1), values)
@@ -0,0 +1,125 @@
+"""
+브로커 웹소켓 원본 프레임 기록
+-> WS_RECORD_DIR 환경 변수가 설정된 경우에만 기록(설정되지 않으면 아무 것도 하지 않음)
+-> 연결 하나당 파일 하나(gzip JSONL), 첫 줄은 연결 정보, 이후 {"t": 연결 후 경과 시간(초), "d": 프레임}
+-> 압축/쓰기는 별도 스레드에서 처리하여 수신 루프를 막지 않음
+-> 기록한 파일은 Benchmark/ws_replay.py로 재생
+-> 계좌/주문 등 개인 스트림은 WS_RECORD_PRIVATE=1인 경우에만 기록, 인증 응답/복호화 키는 기록 전 제거(redact)
+"""
+from .Debug import *
+
+from typing import Optional, Callable
+import gzip
+import itertools
+import json
+import queue
+import threading
+import time
+import os
+
+# 기록 디렉토리(빈 값이면 기록하지 않음)
+WS_RECORD_DIR = os.environ.get("WS_RECORD_DIR", "")
+# 개인 스트림(계좌/주문) 기록 여부(기본값은 기록하지 않음)
+WS_RECORD_PRIVATE = os.environ.get("WS_RECORD_PRIVATE", "0") == "1"
+
+# 제거한 값 대신 기록할 문자열
+REDACTED = "[REDACTED]"
+
+class _NullRecording:
+    """
+    기록 비활성화 시 사용(write는 아무 것도 하지 않음)
+    """
+    def write(self, frame):
+        pass
+
+    def close(self):
+        pass
+
+# 기록 전(연결 전) 초기값으로 사용
+NULL_RECORDING = _NullRecording()
+
+class Recording:
+    """
+    연결 하나의 기록
+    """
+    def __init__(self, recorder: "FrameRecorder", path: str, redact: Optional[Callable[[str], Optional[str]]] = None):
+        self._recorder = recorder
+        self.path = path
+        self.redact = redact
+        self._started = time.monotonic()
+
+    def write(self, frame):
+        if isinstance(frame, bytes):
+            frame = frame.decode("utf-8", errors="replace")
+        self._recorder._queue.put((self, {"t": round(time.monotonic() - self._started, 6), "d": frame}))
+
+    def close(self):
+        self._recorder._queue.put((self, None))
+
+class FrameRecorder:
+    def __init__(self, record_dir: str, record_private: bool = False):
+        self.record_dir = record_dir
+        self.record_private = record_private
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._files = {}
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enabled(self) -> bool:
+        return bool(self.record_dir)
+
+    def open(self, source: str, url: str, private: bool = False, redact: Optional[Callable[[str], Optional[str]]] = None):
+        """
+        기록 시작
+
+        Args:
+            source: 스트림 이름(파일 이름에 사용, 예: binance-orderbook-btcusdt)
+            url: 연결한 웹소켓 URL(재생 시 경로 매칭에 사용)
+            private: 개인 스트림 여부(WS_RECORD_PRIVATE=1이 아니면 기록하지 않음)
+            redact: 기록 전 프레임 변환 함수(None 반환 시 해당 프레임은 기록하지 않음, 기록 스레드에서 실행)
+
+        Returns:
+            Recording(기록 비활성화 시 아무 것도 하지 않는 객체)
+        """
+        if not self.enabled():
+            return _NullRecording()
+        if private and not self.record_private:
+            return _NullRecording()
+
+        self._start_writer()
+        name = f"{source}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(self._seq)}.jsonl.gz"
+        recording = Recording(self, os.path.join(self.record_dir, name), redact)
+        self._queue.put((recording, {"source": source, "url": url, "started": time.time()}))
+        Info(f"Recording websocket frames({recording.path})")
+        return recording
+
+    def _start_writer(self):
+        with self._lock:
+            if self._thread is None:
+                os.makedirs(self.record_dir, exist_ok=True)
+                self._thread = threading.Thread(target=self._writer, name="FrameRecorder", daemon=True)
+                self._thread.start()
+
+    def _writer(self):
+        while True:
+            recording, line = self._queue.get()
+            try:
+                f = self._files.get(recording)
+                if line is None:
+                    if f is not None:
+                        f.close()
+                        del self._files[recording]
+                    continue
+                if recording.redact is not None and "d" in line:
+                    line["d"] = recording.redact(line["d"])
+                    if line["d"] is None:
+                        continue
+                if f is None:
+                    f = gzip.open(recording.path, "at", encoding="utf-8")
+                    self._files[recording] = f
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+            except Exception as e:
+                Error(f"Failed to record websocket frame({recording.path}) : {e}")
+
+frame_recorder = FrameRecorder(WS_RECORD_DIR, WS_RECORD_PRIVATE)
@@ -0,0 +1,302 @@
+"""
+서버 내부 지표 수집용 유틸리티
+-> 외부 의존성 없이 스레드 안전한 히스토그램/카운터/게이지 제공
+-> 생성된 지표는 REGISTRY에 등록되어 /metrics(Prometheus 텍스트 형식)로 조회
+-> 실시간 데이터(업스트림 수신 -> 클라이언트 전송) 단계별 지연 측정
+"""
+from typing import Dict, Any, Sequence, Optional, Tuple, Callable
+from contextvars import ContextVar
+from time import perf_counter
+import bisect
+import threading
+
+# 기본 버킷 경계(초 단위)
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+def exponential_buckets(start: float, factor: float, count: int) -> Tuple[float, ...]:
+    """
+    지수 버킷 경계(HDR 히스토그램처럼 상대 오차가 일정)
+    """
+    return tuple(start * factor ** i for i in range(count))
+
+# 단계별 지연 버킷(1us ~ 약 8초, 2배 간격)
+STAGE_BUCKETS = exponential_buckets(0.000001, 2.0, 24)
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items())
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in items) + "}"
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+class MetricsRegistry:
+    """
+    지표 목록(Prometheus 텍스트 형식 출력)
+    """
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+
+        # 같은 이름의 지표는 한 번만 TYPE 출력
+        lines = []
+        typed = set()
+        for metric in sorted(metrics, key=lambda m: m.name):
+            if metric.name not in typed:
+                typed.add(metric.name)
+                lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+class Histogram:
+    """
+    고정 버킷 히스토그램(Prometheus의 누적 버킷 형식으로 조회 가능)
+    """
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labels: Optional[Dict[str, str]] = None,
+        thread_safe: bool = True,
+    ):
+        """
+        Args:
+            thread_safe: False이면 lock 없이 기록(이벤트 루프에서만 기록하는 지표용)
+        """
+        self.name = name
+        self.labels = labels or {}
+        self.buckets = tuple(sorted(buckets))
+        # 마지막 칸은 +Inf 버킷
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+        if not thread_safe:
+            self.observe = self._observe_unlocked
+        REGISTRY.register(self)
+
+    def observe(self, value: float):
+        """
+        값 하나를 기록
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def _observe_unlocked(self, value: float):
+        self._counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sum += value
+        self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        현재까지의 누적 값 조회
+
+        Returns:
+            {"count", "sum", "buckets": {경계: 누적 개수, ..., "+Inf": 전체 개수}}
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+            total_count = self._count
+
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        buckets["+Inf"] = total_count
+
+        return {
+            "count": total_count,
+            "sum": total_sum,
+            "buckets": buckets,
+        }
+
+    def render(self):
+        snapshot = self.snapshot()
+        for bound, count in snapshot["buckets"].items():
+            le = bound if bound == "+Inf" else f"{bound:.6g}"
+            yield f"{self.name}_bucket{_format_labels(self.labels, ('le', le))} {count}"
+        yield f"{self.name}_sum{_format_labels(self.labels)} {_format_value(snapshot['sum'])}"
+        yield f"{self.name}_count{_format_labels(self.labels)} {snapshot['count']}"
+
+class Counter:
+    """
+    증가만 하는 값
+    """
+    TYPE = "counter"
+
+    def __init__(self, name: str, labels: Optional[Dict[str, str]] = None, thread_safe: bool = True):
+        self.name = name
+        self.labels = labels or {}
+        self.value = 0
+        self._lock = threading.Lock()
+        if not thread_safe:
+            self.inc = self._inc_unlocked
+        REGISTRY.register(self)
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def _inc_unlocked(self, amount: int = 1):
+        self.value += amount
+
+    def render(self):
+        yield f"{self.name}{_format_labels(self.labels)} {_format_value(self.value)}"
+
+class Gauge:
+    """
+    현재 값(연결 수 등)
+    """
+    TYPE = "gauge"
+
+    def __init__(self, name: str, labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.labels = labels or {}
+        self.value = 0
+        self._lock = threading.Lock()
+        self._function: Optional[Callable[[], float]] = None
+        REGISTRY.register(self)
+
+    def set(self, value: float):
+        self.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """
+        조회 시점에 값을 계산(다른 객체가 관리하는 상태를 그대로 노출할 때 사용)
+        """
+        self._function = function
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: int = 1):
+        with self._lock:
+            self.value -= amount
+
+    def render(self):
+        value = self.value if self._function is None else self._function()
+        yield f"{self.name}{_format_labels(self.labels)} {_format_value(value)}"
+
+# [ 실시간 데이터 단계별 지연 ]
+# 업스트림 수신 시각을 기준으로
+# -> parse : 수신 -> 파싱 완료
+# -> dispatch : 프레임 하나를 모든 구독자에게 전달하는 데 걸린 시간
+# -> queue : 파싱 완료 -> 해당 구독자 전송 시작(앞선 구독자 전송 대기 포함)
+# -> send : 클라이언트 소켓 전송
+# -> total : 수신 -> 클라이언트 전송 완료
+TICK_STAGES = ("parse", "dispatch", "queue", "send", "total")
+
+class TickStages:
+    """
+    (브로커, 스트림)별 단계 히스토그램 및 카운터
+    -> 이벤트 루프에서만 기록하므로 lock 없이 기록
+    """
+    __slots__ = ("parse", "dispatch", "queue", "send", "total", "frames", "sent", "dropped")
+
+    def __init__(self, broker: str, stream: str):
+        for stage in TICK_STAGES:
+            setattr(self, stage, Histogram(
+                "tick_stage_seconds", STAGE_BUCKETS,
+                {"broker": broker, "stream": stream, "stage": stage},
+                thread_safe=False,
+            ))
+        labels = {"broker": broker, "stream": stream}
+        # 업스트림 수신 프레임 수
+        self.frames = Counter("tick_frames_received_total", labels, thread_safe=False)
+        # 클라이언트 전송 메시지 수
+        self.sent = Counter("tick_messages_sent_total", labels, thread_safe=False)
+        # 클라이언트 연결 종료/오류로 전송하지 못한 메시지 수
+        self.dropped = Counter("tick_messages_dropped_total", labels, thread_safe=False)
+
+_tick_stages: Dict[Tuple[str, str], TickStages] = {}
+_tick_stages_lock = threading.Lock()
+
+# 현재 전달 중인 프레임(TickStages, 수신 시각, 파싱 완료 시각)
+# -> 브로커 수신 루프에서 설정하고 같은 태스크에서 호출되는 구독자 콜백에서 조회
+_current_tick: ContextVar[Optional[Tuple[TickStages, float, float]]] = ContextVar("current_tick", default=None)
+
+def tick_stages(broker: str, stream: str) -> TickStages:
+    stages = _tick_stages.get((broker, stream))
+    if stages is None:
+        with _tick_stages_lock:
+            stages = _tick_stages.get((broker, stream))
+            if stages is None:
+                stages = TickStages(broker, stream)
+                _tick_stages[(broker, stream)] = stages
+    return stages
+
+def begin_dispatch(stages: TickStages, recv_time: float) -> float:
+    """
+    파싱 완료 후 구독자 콜백 호출 전에 호출
+
+    Args:
+        recv_time: 업스트림 수신 직후의 perf_counter()
+
+    Returns:
+        파싱 완료 시각(end_dispatch에 전달)
+    """
+    now = perf_counter()
+    stages.frames.inc()
+    stages.parse.observe(now - recv_time)
+    _current_tick.set((stages, recv_time, now))
+    return now
+
+def end_dispatch(stages: TickStages, dispatch_start: float):
+    """
+    모든 구독자 콜백 호출 후 호출
+    """
+    stages.dispatch.observe(perf_counter() - dispatch_start)
+    _current_tick.set(None)
+
+def current_tick() -> Optional[Tuple[TickStages, float, float]]:
+    """
+    구독자 콜백에서 현재 전달 중인 프레임 정보 조회(전송 시작 전에 호출)
+    """
+    return _current_tick.get()
+
+def record_send(tick: Optional[Tuple[TickStages, float, float]], send_start: float, sent: bool = True):
+    """
+    클라이언트 전송 결과 기록
+
+    Args:
+        tick: 전송 전에 조회한 current_tick()
+        send_start: 전송 시작 시각(perf_counter)
+        sent: 전송 성공 여부
+    """
+    if tick is None:
+        return
+    stages, recv_time, dispatch_time = tick
+    if not sent:
+        stages.dropped.inc()
+        return
+    now = perf_counter()
+    stages.sent.inc()
+    stages.queue.observe(send_start - dispatch_time)
+    stages.send.observe(now - send_start)
+    stages.total.observe(now - recv_time)
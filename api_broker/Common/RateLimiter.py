@@ -0,0 +1,183 @@
+"""
+브로커 REST 요청 제한(Token Bucket)
+-> (브로커, 자격 증명, 엔드포인트 분류)별 버킷을 Redis에 저장하여 여러 워커가 공유
+-> 요청 전에 가중치만큼 토큰을 차감하고, 부족하면 대기하거나 거부
+"""
+from .RedisManager import redis_manager
+from .Debug import *
+
+from typing import Dict, Tuple
+import time
+import os
+
+# 거래소 제한 대비 실제로 사용할 비율(다른 클라이언트/오차 대비 여유분)
+RATE_LIMIT_SAFETY = float(os.environ.get("RATE_LIMIT_SAFETY", "0.8"))
+# 토큰이 부족할 때 최대 대기 시간(초), 초과 시 RateLimitExceeded
+RATE_LIMIT_MAX_WAIT_SECONDS = float(os.environ.get("RATE_LIMIT_MAX_WAIT_SECONDS", "2"))
+
+# (브로커, 엔드포인트 분류) -> (허용량, 기간(초))
+# https://developers.binance.com/docs/binance-spot-api-docs/rest-api/limits
+# https://apiportal.koreainvestment.com/community/10000000-0000-0011-0000-000000000001
+RATE_LIMITS: Dict[Tuple[str, str], Tuple[int, float]] = {
+    # IP당 요청 가중치
+    ("Binance", "weight"): (6000, 60),
+    # 계정당 주문 수
+    ("Binance", "orders"): (100, 10),
+    # SAPI(IP당 가중치, 엔드포인트별로 따로 계산)
+    ("Binance", "sapi_ip"): (12000, 60),
+    # SAPI(UID당 가중치, UID 가중치 엔드포인트만)
+    ("Binance", "sapi"): (180000, 60),
+    # 앱키당 초당 거래건수
+    ("KIS", "tr"): (20, 1),
+}
+
+# KEYS[1] : 버킷, KEYS[2] : 차단(429/418) 키
+# ARGV : 용량, 초당 충전량, 차감량
+# 반환 : 대기해야 하는 시간(ms), 0이면 차감 완료
+_ACQUIRE_SCRIPT = """
+local blocked = redis.call('PTTL', KEYS[2])
+if blocked > 0 then
+    return blocked
+end
+
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + (now - ts) / 1000 * rate)
+
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = math.ceil((cost - tokens) / rate * 1000)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return wait
+"""
+
+# 거래소가 알려준 사용량으로 남은 토큰 보정(더 적은 쪽으로만)
+# KEYS[1] : 버킷, ARGV : 용량, 초당 충전량, 사용량
+_SYNC_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local used = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + (now - ts) / 1000 * rate)
+tokens = math.max(0, math.min(tokens, capacity - used))
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return 0
+"""
+
+class RateLimitExceeded(Exception):
+    """
+    최대 대기 시간 안에 요청 가능한 상태가 되지 않는 경우
+    """
+    pass
+
+class RateLimiter:
+    def __init__(self, redis_client=None):
+        self.redis_client = redis_client or redis_manager.redis_client
+        self._acquire = self.redis_client.register_script(_ACQUIRE_SCRIPT)
+        self._sync = self.redis_client.register_script(_SYNC_SCRIPT)
+
+    def _bucket(self, broker: str, endpoint_class: str) -> Tuple[float, float]:
+        """
+        Returns:
+            (용량, 초당 충전량)
+        """
+        limit, period = RATE_LIMITS[(broker, endpoint_class)]
+        capacity = max(1.0, limit * RATE_LIMIT_SAFETY)
+        return capacity, capacity / period
+
+    def _keys(self, broker: str, credential: str, endpoint_class: str, block_scope: str = None):
+        return [
+            f"ratelimit:{broker}:{credential}:{endpoint_class}",
+            f"ratelimit:block:{broker}:{credential if block_scope is None else block_scope}",
+        ]
+
+    def acquire(self, broker: str, credential: str, endpoint_class: str, cost: float = 1, max_wait: float = None, block_scope: str = None):
+        """
+        요청 전 토큰 차감(부족하면 충전될 때까지 대기)
+
+        Args:
+            credential: 제한이 적용되는 단위(Binance 가중치는 "ip", 주문/KIS는 사용자)
+            cost: 요청 가중치
+            max_wait: 최대 대기 시간(초), 기본값 RATE_LIMIT_MAX_WAIT_SECONDS
+            block_scope: 확인할 차단(429/418) 단위(기본값은 credential, Binance는 항상 "ip")
+
+        Raises:
+            RateLimitExceeded: 최대 대기 시간을 초과하는 경우
+        """
+        if max_wait is None:
+            max_wait = RATE_LIMIT_MAX_WAIT_SECONDS
+
+        capacity, rate = self._bucket(broker, endpoint_class)
+        keys = self._keys(broker, str(credential), endpoint_class, block_scope)
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            try:
+                wait_ms = self._acquire(keys=keys, args=[capacity, rate, min(cost, capacity)])
+            except Exception as e:
+                # Redis 장애 시 요청은 허용(거래소 응답 코드로만 보호)
+                Error(f"Rate limiter unavailable : {e}")
+                return
+
+            if wait_ms <= 0:
+                return
+
+            wait = wait_ms / 1000
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(f"{broker} {endpoint_class} rate limit(retry after {wait:.3f}s)")
+            time.sleep(wait)
+
+    def sync_usage(self, broker: str, credential: str, endpoint_class: str, used: float):
+        """
+        거래소 응답 헤더의 사용량으로 버킷 보정
+        """
+        limit, _ = RATE_LIMITS[(broker, endpoint_class)]
+        capacity, rate = self._bucket(broker, endpoint_class)
+        # 거래소 허용량 대비 사용량을 버킷 용량 기준으로 환산
+        scaled_used = used * capacity / limit
+        try:
+            self._sync(keys=self._keys(broker, str(credential), endpoint_class)[:1], args=[capacity, rate, scaled_used])
+        except Exception as e:
+            Error(f"Rate limiter unavailable : {e}")
+
+    def block(self, broker: str, credential: str, seconds: float):
+        """
+        429/418 응답 시 Retry-After 동안 모든 요청 중단
+        """
+        try:
+            self.redis_client.set(
+                name=self._keys(broker, str(credential), "")[1],
+                value="1",
+                px=max(1, int(seconds * 1000))
+            )
+        except Exception as e:
+            Error(f"Rate limiter unavailable : {e}")
+
+rate_limiter = RateLimiter()
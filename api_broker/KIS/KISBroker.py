@@ -1,27 +1,74 @@
 from ..BrokerCommon.BrokerInterface import BrokerInterface
 from ..BrokerCommon.BrokerData import *
-from .constants import API_URL, WS_URL, COLUMN_TO_KOR_DICT, DAY_MARKET_TIME
-from .constants import check_market_time
-from .common import aes_decrypt
+from .constants import API_URL, WS_URL
+from .market_calendar import market_calendar
+from .subscription_registry import SubscriptionRegistry, build_message, REGISTER, UNREGISTER
+from .common import aes_decrypt, send_request
+from .realtime_parser import split_frame, parse_orderbook, parse_trade, parse_order_notice, OrderNoticeRecord
 from .ws_token_manager import get_ws_token
 from .token_manager import get_access_token, get_key
 from ..Common.Debug import *
-from .order import place_order, cancel_order
-from .account import get_assets
-from typing import List, Dict, Any, Callable, Awaitable
+from .order import place_order, place_orders_async, validate_order, cancel_order, cancel_all_orders, cancel_all_orders_async
+from .account import get_assets, get_assets_async, apply_fill
+from .master_file import get_symbols as get_master_symbols
+from ..BrokerCommon.AccountState import balance_store, open_order_store
+from ..Common.AsyncRunner import run_blocking
+from ..Common.FrameRecorder import frame_recorder, NULL_RECORDING, REDACTED
+from ..Common.Metrics import tick_stages, begin_dispatch, end_dispatch
+from time import monotonic, perf_counter
+from typing import List, Dict, Any, Callable, Awaitable, Optional
 from typing import TypedDict, Literal
 import websockets
 import json
 import asyncio
 import requests
-import pandas as pd
 import traceback
+import random
+import os
 from pprint import pprint
 from datetime import datetime, timedelta, time, date
 
 # [ 종목 코드 파일 ]
-# 아래 파일은 업데이트될 가능성이 있음에 유의
-KIS_TICKERS_PATH = "./KIS/NASMST.COD"
+# 아래 파일은 업데이트될 가능성이 있음에 유의(master_file에서 변경 감지 후 캐시 재생성)
+# 심볼 목록에 포함할 거래소(현재 주문은 NASD만 지원)
+KIS_SYMBOL_EXCHANGES = tuple(os.environ.get("KIS_SYMBOL_EXCHANGES", "NAS").split(","))
+
+# [ 웹소켓 재연결 ]
+# KIS는 주기적으로 연결을 끊으므로 연결이 끊기면 백오프(지터 포함) 후 재연결
+KIS_WS_RECONNECT_BASE_SECONDS = float(os.environ.get("KIS_WS_RECONNECT_BASE_SECONDS", "1"))
+KIS_WS_RECONNECT_MAX_SECONDS = float(os.environ.get("KIS_WS_RECONNECT_MAX_SECONDS", "30"))
+# 이 시간 이상 유지된 연결이 끊긴 경우 백오프 초기화
+KIS_WS_STABLE_SECONDS = 60.0
+
+# 재연결 시 구독자에게 전달하는 메시지(연결이 끊긴 동안의 데이터 누락 표시)
+GAP_MARKER = {"type": "gap", "broker": "KIS"}
+
+# 단계별 지연 지표
+_ORDERBOOK_STAGES = tick_stages("KIS", "orderbook")
+_TRADE_STAGES = tick_stages("KIS", "trade")
+
+def _redact_frame(frame: str) -> Optional[str]:
+    """
+    프레임 기록 전 개인 데이터 제거
+    -> 실시간체결통보(H0GSCNI0) 데이터는 WS_RECORD_PRIVATE=1인 경우에만 기록
+    -> 구독 응답의 복호화 키(body.output.key/iv)는 항상 제거
+    """
+    if frame[:1] in ("0", "1"):
+        if frame.startswith("1|H0GSCNI0|") and not frame_recorder.record_private:
+            return None
+        return frame
+
+    try:
+        message = json.loads(frame)
+    except ValueError:
+        return frame
+    output = message.get("body", {}).get("output") if isinstance(message, dict) else None
+    if isinstance(output, dict) and ("key" in output or "iv" in output):
+        for field in ("key", "iv"):
+            if field in output:
+                output[field] = REDACTED
+        return json.dumps(message)
+    return frame
 
 # 같은 app key로 2개 이상의 소켓을 동시에 사용할 수 없음
 # -> 하나의 소켓에서 호가와 체결가를 동시에 가져올수는 있음(최대 41건, 2025-11-01 기준)
@@ -40,6 +87,8 @@ class KISWebSocket():
         self.symbols = []
         # 콜백 등록/삭제를 위한 lock
         self.callbacks_lock = asyncio.Lock()
+        # 실시간 등록(tr_id, 종목) 및 현재 거래소 코드
+        self.subscriptions = SubscriptionRegistry(market_calendar.realtime_market_code())
         # 콜백 리스트
         # -> 콜백 리스트가 비어있으면 웹소켓 close 해야 함!
         self.orderbook_callbacks = []
@@ -69,6 +118,12 @@ class KISBroker(BrokerInterface):
         """
         return get_assets(self.user_id)
 
+    async def get_assets_async(self) -> List[Dict[str, Any]]:
+        """
+        KIS 자산 조회 (하위 요청 병렬 처리)
+        """
+        return await get_assets_async(self.user_id)
+
     def get_candle(self, symbol: str, interval: str, end_time: str = None):
         """
         KIS 캔들 조회
@@ -241,7 +296,7 @@ class KISBroker(BrokerInterface):
                     "custtype": "P",
                 }
 
-                resp = requests.get(url, params=params, headers=headers,  timeout=10)
+                resp = send_request("GET", url, self.user_id, params=params, headers=headers,  timeout=10)
                 resp.raise_for_status()     
                 resp_json = resp.json()
 
@@ -319,7 +374,7 @@ class KISBroker(BrokerInterface):
                     "custtype": "P",
                 }
 
-                resp = requests.get(url, params=params, headers=headers,  timeout=10)
+                resp = send_request("GET", url, self.user_id, params=params, headers=headers,  timeout=10)
                 resp.raise_for_status()     
                 resp_json = resp.json()
 
@@ -359,6 +414,24 @@ class KISBroker(BrokerInterface):
         KIS 주문 전송
         """
         return place_order(self.user_id, order)
+
+    async def place_order_async(self, order) -> Dict[str, Any]:
+        """
+        KIS 주문 전송(스레드 풀에서 실행)
+        """
+        return await run_blocking(place_order, self.user_id, order)
+
+    def validate_order(self, order) -> str:
+        """
+        KIS 주문 전송 전 검사
+        """
+        return validate_order(order)
+
+    async def place_orders_async(self, orders) -> List[Dict[str, Any]]:
+        """
+        KIS 일괄 주문(요청 순서대로 결과 반환)
+        """
+        return await place_orders_async(self.user_id, orders)
     
     def cancel_order(self, order) -> List[Dict[str, Any]]:
         """
@@ -366,48 +439,90 @@ class KISBroker(BrokerInterface):
         """
         return cancel_order(self.user_id, order)
 
-    def get_orders(self):
+    async def cancel_order_async(self, order) -> Dict[str, Any]:
         """
-        KIS 미체결 주문 목록
+        KIS 주문 취소(스레드 풀에서 실행)
+        """
+        return await run_blocking(cancel_order, self.user_id, order)
+
+    def cancel_all_orders(self) -> Dict[str, Any]:
+        """
+        KIS 모든 주문 취소
         """
         try:
-            params = {
-                "CANO": get_key(self.user_id)["account_number_0"],
-                "ACNT_PRDT_CD": get_key(self.user_id)["account_number_1"],
-                "OVRS_EXCG_CD": "NASD",
-                "SORT_SQN": "DS",
-                "CTX_AREA_FK200": "",
-                "CTX_AREA_NK200": "",
-            }
+            orders = self._fetch_orders()
+        except Exception as e:
+            Error(f"KIS open order lookup failed : {e}")
+            return {"result": "error", "message": f"Open order lookup failed : {e}", "orders": []}
+        return cancel_all_orders(self.user_id, orders)
 
-            headers = {
-                "content-type": "application/json; charset=utf-8",
-                "authorization": "Bearer " + get_access_token(self.user_id),
-                "appkey": get_key(self.user_id)["app_key"],
-                "appsecret": get_key(self.user_id)["sec_key"],
-                "tr_id": "TTTS3018R",
-                "custtype": "P",
-            }
+    async def cancel_all_orders_async(self) -> Dict[str, Any]:
+        """
+        KIS 모든 주문 취소(주문별 취소 요청을 병렬 전송)
+        -> 미체결 주문은 메모리 저장소가 아닌 REST로 조회(누락 없이 취소)
+        -> 조회에 실패하면 취소하지 않고 오류 반환(0건 취소를 성공으로 응답하지 않도록)
+        """
+        try:
+            orders = await run_blocking(self._fetch_orders)
+        except Exception as e:
+            Error(f"KIS open order lookup failed : {e}")
+            return {"result": "error", "message": f"Open order lookup failed : {e}", "orders": []}
+        return await cancel_all_orders_async(self.user_id, orders)
 
-            url = API_URL + f"/uapi/overseas-stock/v1/trading/inquire-nccs"
-            resp = requests.get(url, headers=headers, params=params, timeout=10)
-            resp_json = resp.json()
-            
-            #Info("")
-            #pprint(resp_json)
-
-            orders = []
-            for order in resp_json["output"]:
-                orders.append({
-                    "order_id": order["odno"],
-                    "symbol": order["pdno"],
-                    # BUY(02) or SELL(01)
-                    "side": "buy" if str(order["sll_buy_dvsn_cd"]) == "02" else "sell",
-                    "price": order["ft_ord_unpr3"],
-                    "amount": order["nccs_qty"],
-                })
-
-            return orders
+    def _fetch_orders(self):
+        """
+        KIS 미체결 주문 목록(REST 조회)
+
+        Raises:
+            조회 실패 시 예외를 그대로 전달
+        """
+        params = {
+            "CANO": get_key(self.user_id)["account_number_0"],
+            "ACNT_PRDT_CD": get_key(self.user_id)["account_number_1"],
+            "OVRS_EXCG_CD": "NASD",
+            "SORT_SQN": "DS",
+            "CTX_AREA_FK200": "",
+            "CTX_AREA_NK200": "",
+        }
+
+        headers = {
+            "content-type": "application/json; charset=utf-8",
+            "authorization": "Bearer " + get_access_token(self.user_id),
+            "appkey": get_key(self.user_id)["app_key"],
+            "appsecret": get_key(self.user_id)["sec_key"],
+            "tr_id": "TTTS3018R",
+            "custtype": "P",
+        }
+
+        url = API_URL + f"/uapi/overseas-stock/v1/trading/inquire-nccs"
+        resp = send_request("GET", url, self.user_id, headers=headers, params=params, timeout=10)
+        resp_json = resp.json()
+        if resp_json.get("rt_cd") != "0":
+            raise RuntimeError(f"KIS inquire-nccs failed({resp_json.get('msg_cd')}) : {resp_json.get('msg1')}")
+
+        #Info("")
+        #pprint(resp_json)
+
+        orders = []
+        for order in resp_json["output"]:
+            orders.append({
+                "order_id": order["odno"],
+                "symbol": order["pdno"],
+                # BUY(02) or SELL(01)
+                "side": "buy" if str(order["sll_buy_dvsn_cd"]) == "02" else "sell",
+                "price": order["ft_ord_unpr3"],
+                "amount": order["nccs_qty"],
+            })
+
+        return orders
+
+    def get_orders(self):
+        """
+        KIS 미체결 주문 목록
+        -> 조회 실패 시 빈 목록
+        """
+        try:
+            return self._fetch_orders()
         except requests.exceptions.RequestException as e:
             Error("KIS requests.exceptions.RequestException")
             print(e)
@@ -418,6 +533,21 @@ class KISBroker(BrokerInterface):
             traceback.print_exc()
             return []
 
+    async def get_orders_async(self):
+        """
+        KIS 미체결 주문 목록
+        -> 실시간 체결통보가 연결되어 있으면 메모리 주문 목록 사용
+        """
+        cached_orders = open_order_store.get(self.user_id, "KIS")
+        if cached_orders is not None:
+            return cached_orders
+
+        fetched_at = monotonic()
+        # 조회 실패 시 저장소에 반영하지 않고 예외 전달(빈 목록이 미체결 주문 없음으로 저장되지 않도록)
+        orders = await run_blocking(self._fetch_orders)
+        open_order_store.seed(self.user_id, "KIS", orders, fetched_at)
+        return orders
+
     @staticmethod
     async def _ws_connect(user_id: str):
         """웹소켓 연결(Backend <-> KIS)"""
@@ -434,31 +564,223 @@ class KISBroker(BrokerInterface):
             if user_id not in KISBroker._user_ws:
                 KISBroker._user_ws[user_id] = KISWebSocket()
             # 웹소켓 연결이 없는 경우 생성
+            # -> 연결 이후에는 _ws_supervisor가 재연결까지 관리하고, 구독자가 모두 해제되면 ws_task가 종료됨
             if KISBroker._user_ws[user_id].ws_task == None:
-                # ping_interval은 사용하지 않을 것을 권장하고 있음
-                # https://apiportal.koreainvestment.com/community/10000000-0000-0011-0000-000000000002/post/07f312e5-0bf3-4bbe-8179-1ffd7246b392
-                KISBroker._user_ws[user_id].ws = await websockets.connect(WS_URL, ping_interval=None)
-                KISBroker._user_ws[user_id].ws_task = asyncio.create_task(KISBroker._ws_loop(user_id))
+                await KISBroker._ws_start(user_id)
             else:
                 Info("Use existing ws.")
+
+    @staticmethod
+    async def _ws_start(user_id: str):
+        """
+        웹소켓 연결 및 supervisor 시작(_user_lock 안에서 호출)
+        """
+        # ping_interval은 사용하지 않을 것을 권장하고 있음
+        # https://apiportal.koreainvestment.com/community/10000000-0000-0011-0000-000000000002/post/07f312e5-0bf3-4bbe-8179-1ffd7246b392
+        KISBroker._user_ws[user_id].ws = await websockets.connect(WS_URL, ping_interval=None)
+        KISBroker._user_ws[user_id].ws_task = asyncio.create_task(KISBroker._ws_supervisor(user_id))
+
+    @staticmethod
+    def _ws_idle(user_ws: KISWebSocket) -> bool:
+        """
+        실시간 등록과 콜백이 모두 없는지 여부
+        """
+        return (
+            not user_ws.subscriptions.registrations()
+            and not user_ws.orderbook_callbacks
+            and not user_ws.trade_callbacks
+            and user_ws.order_update_callback is None
+        )
+
+    @staticmethod
+    async def _ws_stop_if_idle(user_id: str) -> bool:
+        """
+        구독자가 없으면 웹소켓 정보 정리(supervisor 종료용)
+
+        Returns:
+            정리 여부
+        """
+        async with KISBroker._user_lock[user_id]:
+            user_ws = KISBroker._user_ws[user_id]
+            if not KISBroker._ws_idle(user_ws):
+                return False
+            user_ws.ws = None
+            user_ws.ws_task = None
+            Info("KIS ws stopped(no subscribers)")
+            return True
+
+    @staticmethod
+    async def _ws_supervisor(user_id: str):
+        """
+        웹소켓 연결 유지(Backend <-> KIS)
+        -> 수신 루프가 끝나면(연결 끊김) 지수 백오프 + 지터 후 재연결
+        -> 재연결 후 등록된 실시간 구독을 다시 등록하고 구독자에게 GAP_MARKER 전달
+        -> 실시간 등록과 콜백이 모두 없으면 종료(마지막 구독 해제 시 _unregister가 연결을 닫음)
+        """
+        attempt = 0
+        try:
+            while True:
+                connected_at = monotonic()
+                await KISBroker._ws_loop(user_id)
+                if monotonic() - connected_at > KIS_WS_STABLE_SECONDS:
+                    attempt = 0
+
+                while True:
+                    if await KISBroker._ws_stop_if_idle(user_id):
+                        return
+                    # full jitter(여러 사용자가 동시에 재연결하지 않도록)
+                    delay = random.uniform(0, min(KIS_WS_RECONNECT_MAX_SECONDS, KIS_WS_RECONNECT_BASE_SECONDS * 2 ** attempt))
+                    attempt += 1
+                    Info(f"KIS reconnecting in {delay:.2f}s(attempt {attempt})")
+                    await asyncio.sleep(delay)
+                    try:
+                        await KISBroker._ws_reconnect(user_id)
+                        break
+                    except Exception as e:
+                        Error(f"KIS reconnect failed : {e}")
+
+                await KISBroker._notify_gap(user_id)
+
+        except asyncio.CancelledError:
+            Error("KIS supervisor asyncio.CancelledError")
+            raise
+        finally:
+            # 종료 후 새로 시작된 supervisor의 ws_task는 유지
+            if KISBroker._user_ws[user_id].ws_task is asyncio.current_task():
+                KISBroker._user_ws[user_id].ws_task = None
+
+    @staticmethod
+    async def _ws_reconnect(user_id: str):
+        """
+        웹소켓 재연결 및 실시간 구독 재등록(Backend <-> KIS)
+        -> 체결통보(H0GSCNI0)는 재등록 응답으로 새 복호화 키를 받음
+        """
+        async with KISBroker._user_lock[user_id]:
+            user_ws = KISBroker._user_ws[user_id]
+            ws = await websockets.connect(WS_URL, ping_interval=None)
+            try:
+                approval_key = get_ws_token(user_id)
+                registrations = user_ws.subscriptions.registrations()
+                user_ws.aes_decrypt_key = None
+                user_ws.aes_decrypt_iv = None
+                for tr_id, tr_key in registrations:
+                    await ws.send(build_message(approval_key, REGISTER, tr_id, tr_key))
+            except:
+                await ws.close()
+                raise
+            user_ws.ws = ws
+            Info(f"KIS reconnected({len(registrations)} registrations)")
+
+    @staticmethod
+    async def _notify_gap(user_id: str):
+        """
+        재연결 알림(연결이 끊긴 동안의 호가/체결가/체결통보 누락 가능)
+        """
+        user_ws = KISBroker._user_ws[user_id]
+        await KISBroker._dispatch(user_id, user_ws.orderbook_callbacks, GAP_MARKER)
+        await KISBroker._dispatch(user_id, user_ws.trade_callbacks, GAP_MARKER)
+
+        if user_ws.order_update_callback is not None:
+            # 잔고/미체결 주문은 다음 조회 시 REST 재조회
+            balance_store.mark_gap(user_id, "KIS")
+            open_order_store.mark_gap(user_id, "KIS")
+            try:
+                await user_ws.order_update_callback(GAP_MARKER)
+            except Exception as e:
+                Error(f"KIS order update gap notify failed : {e}")
     
+    @staticmethod
+    async def _register(user_id: str, tr_id: str, key: str):
+        """
+        실시간 등록(Backend <-> KIS)
+        -> 같은 종목을 이미 구독 중이면 전송 없이 구독자 수만 증가
+        """
+        async with KISBroker._user_lock[user_id]:
+            user_ws = KISBroker._user_ws[user_id]
+            # 연결 후 등록 전에 supervisor가 종료된 경우(구독자 없음) 다시 연결
+            if user_ws.ws_task is None:
+                await KISBroker._ws_start(user_id)
+            if not user_ws.subscriptions.acquire(tr_id, key):
+                return
+            try:
+                message = build_message(get_ws_token(user_id), REGISTER, tr_id, user_ws.subscriptions.tr_key(tr_id, key))
+                await user_ws.ws.send(message)
+            except websockets.exceptions.ConnectionClosed:
+                # 재연결 시 다시 등록됨
+                Info(f"KIS ws closed, {tr_id}/{key} will be registered on reconnect")
+            except:
+                user_ws.subscriptions.release(tr_id, key)
+                raise
+
+    @staticmethod
+    async def _unregister(user_id: str, tr_id: str, key: str) -> bool:
+        """
+        실시간 등록 해제(Backend <-> KIS)
+        -> 마지막 구독자인 경우에만 해제 요청 전송
+
+        Returns:
+            등록 해제 여부
+        """
+        async with KISBroker._user_lock[user_id]:
+            user_ws = KISBroker._user_ws[user_id]
+            tr_key = user_ws.subscriptions.tr_key(tr_id, key)
+            if not user_ws.subscriptions.release(tr_id, key):
+                return False
+            try:
+                await user_ws.ws.send(build_message(get_ws_token(user_id), UNREGISTER, tr_id, tr_key))
+            except Exception as e:
+                Error(f"KIS unregister failed({tr_id}/{tr_key}) : {e}")
+            # 마지막 구독 해제 시 연결 종료(_ws_supervisor가 종료 처리)
+            if KISBroker._ws_idle(user_ws) and user_ws.ws is not None:
+                try:
+                    await user_ws.ws.close()
+                except Exception as e:
+                    Error(f"KIS ws close failed : {e}")
+            return True
+
+    @staticmethod
+    async def _on_session_change(old_session: str, new_session: str):
+        """
+        세션 전환 시 모든 사용자의 호가/체결가 등록을 새 거래소 코드로 교체(DNAS <-> RBAQ)
+        -> 콜백은 그대로 유지되므로 클라이언트는 재연결 없이 계속 수신
+        """
+        market_code = market_calendar.realtime_market_code()
+        for user_id, user_ws in list(KISBroker._user_ws.items()):
+            if user_ws.subscriptions.market_code == market_code:
+                continue
+            async with KISBroker._user_lock[user_id]:
+                messages = user_ws.subscriptions.switch_market_code(get_ws_token(user_id), market_code)
+                if not messages or user_ws.ws is None:
+                    continue
+                try:
+                    for message in messages:
+                        await user_ws.ws.send(message)
+                    Info(f"KIS resubscribed {len(messages) // 2} streams({old_session} -> {new_session}, {market_code})")
+                except Exception as e:
+                    Error(f"KIS resubscribe failed : {e}")
+
     @staticmethod
     async def _ws_loop(user_id):
         """웹소켓 루프(Backend <-> KIS)"""
+        recording = NULL_RECORDING
         try:
             ws = KISBroker._user_ws[user_id].ws
+            recording = frame_recorder.open("kis", WS_URL, redact=_redact_frame)
             while True:
                 try:
                     resp = await ws.recv()
-                    await KISBroker._handle_ws_message(user_id, resp)
+                    recv_time = perf_counter()
+                    recording.write(resp)
+                    await KISBroker._handle_ws_message(user_id, resp, recv_time)
                     
                 except asyncio.CancelledError:
                     Error("KIS LOOP asyncio.CancelledError")
                     print(KISBroker._user_ws[user_id].orderbook_callbacks)
                     # raise 하면 웹소켓 연결이 끊어짐 
                     #raise
-                except websockets.exceptions.ConnectionClosedError:
-                    Error("KIS LOOP websockets.exceptions.ConnectionClosedError")
+                except websockets.exceptions.ConnectionClosed as e:
+                    # 정상 종료(ConnectionClosedOK)도 재연결 대상
+                    Error(f"KIS LOOP {type(e).__name__}")
                     break
                 except Exception as e:
                     Info("KIS LOOP Exception")
@@ -474,11 +796,17 @@ class KISBroker(BrokerInterface):
             Error("KIS Exception")
             traceback.print_exc()
         finally:
+            recording.close()
             Error("KIS disconnected.")
     
     @staticmethod
-    async def _handle_ws_message(user_id: str, resp: str):
-        """웹소켓 메시지 핸들러(Backend <-> KIS)"""
+    async def _handle_ws_message(user_id: str, resp: str, recv_time: float):
+        """
+        웹소켓 메시지 핸들러(Backend <-> KIS)
+
+        Args:
+            recv_time: 수신 직후의 perf_counter()(단계별 지연 측정용)
+        """
         # 핑 메시지 처리
         if resp[0] not in ["0", "1"]:
             try:
@@ -504,250 +832,174 @@ class KISBroker(BrokerInterface):
             return
 
         # 데이터 메시지 - tr_id로 구분
-        meta_data = resp.split("|")
-        if len(meta_data) < 2:
+        # [ 응답 형식 ]
+        # 0|HDFSCNT0|002|(레코드1)^...^(레코드2)
+        # 1|H0GSCNI0|001|(암호화 된 데이터)
+        try:
+            encrypted, tr_id, count, body = split_frame(resp)
+        except ValueError:
             return
         
-        tr_id = meta_data[1]
-        
         # 호가 데이터 처리(HDFSASP0)
         if tr_id == "HDFSASP0":
-            await KISBroker._handle_orderbook(user_id, resp)  
+            await KISBroker._handle_orderbook(user_id, body, count, recv_time)
         # 체결가 데이터 처리(HDFSCNT0)
         elif tr_id == "HDFSCNT0":
-            await KISBroker._handle_trade(user_id, resp)
+            await KISBroker._handle_trade(user_id, body, count, recv_time)
         # 실시간체결통보 데이터 처리
-        # [ 응답 형식 ]
-        # 1|H0GSCNI0|001|(암호화 된 데이터)
         elif tr_id == "H0GSCNI0":
-            Info(resp)
+            Debug(resp)
             # 암호화 된 데이터인지 확인
-            if str(meta_data[0]) == "1":
+            if encrypted:
                 # 복호화 수행
-                dec_resp = aes_decrypt(meta_data[3], KISBroker._user_ws[user_id].aes_decrypt_key, KISBroker._user_ws[user_id].aes_decrypt_iv)
-                print(dec_resp)
-                
-                normalized_json = {}
-                # 새 주문
-                if dec_resp.split("^")[5] == "0":
-                    normalized_json = {
-                        # Order Status
-                        "order_status": "NEW",
-                        # Order ID
-                        "order_id": str(dec_resp.split("^")[2]),
-                        # Symbol
-                        "symbol": dec_resp.split("^")[7],
-                        # Side
-                        # -> 대문자 S
-                        "side": "BUY" if dec_resp.split("^")[4] == "02" else "SELL",
-                        # Order price
-                        "price": float(dec_resp.split("^")[9]) / 10000.0,
-                        # Order quantity
-                        "quantity": dec_resp.split("^")[8],
-                    }
-                # 주문 취소
-                if dec_resp.split("^")[5] == "2":
-                    normalized_json = {
-                        # Order Status
-                        "order_status": "CANCELED",
-                        # Order ID
-                        # 원주문번호
-                        "order_id": str(dec_resp.split("^")[3]),
-                        # Symbol
-                        "symbol": dec_resp.split("^")[7],
-                        # Side
-                        # -> 대문자 S
-                        "side": "BUY" if dec_resp.split("^")[4] == "02" else "SELL",
-                    }
-                # 주문 체결
-                elif dec_resp.split("^")[12] == "2":
-                    normalized_json = {
-                        # Order Status
-                        "order_status": "TRADE",
-                        # Order ID
-                        # 원주문번호?
-                        "order_id": str(dec_resp.split("^")[3]),
-                        # Symbol
-                        "symbol": dec_resp.split("^")[7],
-                        # Side
-                        # -> 대문자 S
-                        "side": "BUY" if dec_resp.split("^")[4] == "02" else "SELL",
-                        # Order price
-                        "price": float(dec_resp.split("^")[9]) / 10000.0,
-                        # Order quantity
-                        "quantity": dec_resp.split("^")[8],
-                    }
+                dec_resp = aes_decrypt(body, KISBroker._user_ws[user_id].aes_decrypt_key, KISBroker._user_ws[user_id].aes_decrypt_iv)
+                Debug(dec_resp)
 
-                await KISBroker._user_ws[user_id].order_update_callback(normalized_json)
+                for record in parse_order_notice(dec_resp, count):
+                    await KISBroker._handle_order_notice(user_id, record)
 
         else:
-            Info(resp)
-        
+            Debug(resp)
+
+    @staticmethod
+    async def _handle_order_notice(user_id: str, record: OrderNoticeRecord):
+        """체결통보 레코드 처리"""
+        normalized_json = {}
+        # 주문 취소
+        if record.rctf_cls == "2":
+            normalized_json = {
+                # Order Status
+                "order_status": "CANCELED",
+                # Order ID
+                # 원주문번호
+                "order_id": str(record.original_order_id),
+                # Symbol
+                "symbol": record.symbol,
+                # Side
+                # -> 대문자 S
+                "side": record.side,
+            }
+        # 주문 체결
+        elif record.filled:
+            normalized_json = {
+                # Order Status
+                "order_status": "TRADE",
+                # Order ID
+                # -> 체결은 주문번호 기준(NEW 이벤트 및 미체결 조회의 odno와 동일)
+                "order_id": str(record.order_id),
+                # Symbol
+                "symbol": record.symbol,
+                # Side
+                # -> 대문자 S
+                "side": record.side,
+                # Order price
+                "price": record.price,
+                # Order quantity
+                "quantity": record.quantity,
+                # Executed quantity(체결수량)
+                "filled_quantity": record.quantity,
+            }
+
+            # 잔고 저장소에 체결 내역 반영
+            apply_fill(
+                user_id,
+                record.symbol,
+                record.side,
+                record.price,
+                record.quantity,
+                # 체결종목명
+                display_name=record.display_name
+            )
+        # 새 주문
+        elif record.rctf_cls == "0":
+            normalized_json = {
+                # Order Status
+                "order_status": "NEW",
+                # Order ID
+                "order_id": str(record.order_id),
+                # Symbol
+                "symbol": record.symbol,
+                # Side
+                # -> 대문자 S
+                "side": record.side,
+                # Order price
+                "price": record.price,
+                # Order quantity
+                "quantity": record.quantity,
+            }
+
+        # 미체결 주문 저장소 반영
+        if normalized_json:
+            remaining = open_order_store.apply_event(user_id, "KIS", normalized_json)
+            if remaining is not None:
+                normalized_json["remaining_quantity"] = remaining
+
+        await KISBroker._user_ws[user_id].order_update_callback(normalized_json)
     
     @staticmethod
-    async def _handle_orderbook(user_id: str, resp: str):
+    async def _dispatch(user_id: str, callbacks: list, data: Any):
+        """
+        콜백 리스트 호출
+        -> 한 프레임의 여러 레코드는 리스트 하나로 묶어 구독자별로 한 번만 호출
+        """
+        async with KISBroker._user_ws[user_id].callbacks_lock:
+            # 안전한 원소 제거를 위하여 리스트 복사
+            callbacks_copy = callbacks[:]
+            for callback in callbacks_copy:
+                try:
+                    await callback(data)
+                except asyncio.CancelledError:
+                    # 연결 해제된 callback 제거
+                    try:
+                        if callback in callbacks:
+                            callbacks.remove(callback)
+                    except:
+                        Error("Failed to remove callback.")
+                except Exception as e:
+                    Error("KIS Exception")
+                    print(f"e : {e}")
+
+    @staticmethod
+    async def _handle_orderbook(user_id: str, body: str, count: int, recv_time: float):
         """호가 데이터 처리"""
         try:
-            columns = [
-                "rsym",
-                "symb",
-                "zdiv",
-                "xymd",
-                "xhms",
-                "kymd",
-                "khms",
-                "bvol",
-                "avol",
-                "bdvl",
-                "advl",
-                "pbid1",
-                "pask1",
-                "vbid1",
-                "vask1",
-                "dbid1",
-                "dask1"
-            ]
-            
-            real_data = resp.split("|")[-1].split("^")
-            
-            if len(real_data) < len(columns):
-                return
-            
-            resp_dict = {COLUMN_TO_KOR_DICT[col]: value for col, value in zip(columns, real_data)}
-
-            normalized_data = {
-                "symbol": resp_dict["종목코드"].replace("DNAS", ""),
-                "bids": [
-                    {"price": float(resp_dict["매수호가1"]), "quantity": float(resp_dict["매수잔량1"])}
-                ],
-                "asks": [
-                    {"price": float(resp_dict["매도호가1"]), "quantity": float(resp_dict["매도잔량1"])}
-                ],
-            }
-            #print(normalized_data["asks"])
-            
-            # 콜백 리스트 호출
-            async with KISBroker._user_ws[user_id].callbacks_lock:
-                # 안전한 원소 제거를 위하여 리스트 복사
-                callbacks_copy = KISBroker._user_ws[user_id].orderbook_callbacks[:]
-                for callback in callbacks_copy:
-                    try:
-                        await callback(normalized_data)
-                    except asyncio.CancelledError:
-                        # 연결 해제된 callback 제거
-                        try:
-                            if callback in KISBroker._user_ws[user_id].orderbook_callbacks:
-                                KISBroker._user_ws[user_id].orderbook_callbacks.remove(callback)
-                                break
-                        except:
-                            Error("Failed to remove callback.")
-                    except Exception as e:
-                        Error("KIS Exception")
-                        print(f"e : {e}")
+            records = [record.to_dict() for record in parse_orderbook(body, count)]
+            if records:
+                dispatch_start = begin_dispatch(_ORDERBOOK_STAGES, recv_time)
+                await KISBroker._dispatch(user_id, KISBroker._user_ws[user_id].orderbook_callbacks, records)
+                end_dispatch(_ORDERBOOK_STAGES, dispatch_start)
             
         except Exception as e:
             print(f"❌ Error parsing orderbook: {e}")
     
     @staticmethod
-    async def _handle_trade(user_id: str, resp: str):
+    async def _handle_trade(user_id: str, body: str, count: int, recv_time: float):
         """체결가 데이터 처리"""
         try:
-            columns = [
-                "RSYM",
-                "SYMB",
-                "ZDIV",
-                "TYMD",
-                "XYMD",
-                "XHMS",
-                "KYMD",
-                "KHMS",
-                "OPEN",
-                "HIGH",
-                "LOW",
-                "LAST",
-                "SIGN",
-                "DIFF",
-                "RATE",
-                "PBID",
-                "PASK",
-                "VBID",
-                "VASK",
-                "EVOL",
-                "TVOL",
-                "TAMT",
-                "BIVL",
-                "ASVL",
-                "STRN",
-                "MTYP"
-            ]
-            
-            real_data = resp.split('|')[-1].split("^")
-            
-            if len(real_data) < len(columns):
-                return
-            
-            resp_dict = {COLUMN_TO_KOR_DICT[col]: value for col, value in zip(columns, real_data)}
-
-            normalized_data = {
-                "symbol": resp_dict["종목코드"].replace("DNAS", ""),
-                "price": float(resp_dict["현재가"]) if resp_dict["현재가"] else 0.0,
-                "quantity": float(resp_dict["체결량"]) if resp_dict["체결량"] else 0.0,
-                "time": resp_dict["한국시간"],
-                "isBuyerMaker": True,
-                "timestamp": int(asyncio.get_event_loop().time() * 1000),
-            }
-            
-            # 콜백 리스트 호출
-            async with KISBroker._user_ws[user_id].callbacks_lock:
-                # 안전한 원소 제거를 위하여 리스트 복사
-                callbacks_copy = KISBroker._user_ws[user_id].trade_callbacks[:]
-                for callback in callbacks_copy:
-                    try:
-                        await callback(normalized_data)
-                    except asyncio.CancelledError:
-                        # 연결 해제된 callback 제거
-                        try:
-                            if callback in KISBroker._user_ws[user_id].trade_callbacks:
-                                KISBroker._user_ws[user_id].trade_callbacks.remove(callback)
-                                continue
-                        except:
-                            Error("Failed to remove callback.")
-                    except Exception as e:
-                        Error("KIS Exception")
-                        print(f"e : {e}")
+            timestamp = int(asyncio.get_event_loop().time() * 1000)
+            records = [record.to_dict(timestamp) for record in parse_trade(body, count)]
+            if records:
+                dispatch_start = begin_dispatch(_TRADE_STAGES, recv_time)
+                await KISBroker._dispatch(user_id, KISBroker._user_ws[user_id].trade_callbacks, records)
+                end_dispatch(_TRADE_STAGES, dispatch_start)
             
         except Exception as e:
             print(f"❌ Error parsing trade: {e}")
     
     async def subscribe_orderbook_async(self, user_id: str, ticker_symbol: str, callback: Callable[[Dict[str, Any]], Awaitable[None]]):
-        """KIS 실시간 호가 구독(Frontend <-> Backend)"""
+        """
+        KIS 실시간 호가 구독(Frontend <-> Backend)
+        -> 거래소 코드(DNAS/RBAQ)는 등록 시 현재 세션 기준으로 붙이고 세션 전환 시 자동 교체
+        """
+        ticker_symbol = ticker_symbol.upper()
+        registered = False
         try:
-            # 주간거래 시간 처리
-            market_code = "DNAS"
-            if check_market_time(DAY_MARKET_TIME):
-                market_code = "RBAQ"
-
-            ticker_symbol = market_code + ticker_symbol.upper()
-            print(ticker_symbol)
             # 웹소켓 연결
             await KISBroker._ws_connect(user_id)
 
             # 호가 구독
-            payload = {
-                "header": {
-                    "approval_key": get_ws_token(user_id),
-                    "custtype": "P",
-                    "tr_type": "1",
-                    "content-type": "utf-8",
-                },
-                "body": {
-                    "input": {
-                        "tr_id": "HDFSASP0",
-                        "tr_key": ticker_symbol,
-                    }
-                }
-            }
-            await KISBroker._user_ws[user_id].ws.send(json.dumps(payload))
+            await KISBroker._register(user_id, "HDFSASP0", ticker_symbol)
+            registered = True
 
             # 호가 콜백 등록
             async with KISBroker._user_ws[user_id].callbacks_lock:
@@ -772,37 +1024,24 @@ class KISBroker(BrokerInterface):
                         KISBroker._user_ws[user_id].orderbook_callbacks.remove(callback)
             except:
                 Error("Failed to remove callback.")
+            # 호가 구독 해제(마지막 구독자인 경우)
+            if registered:
+                await KISBroker._unregister(user_id, "HDFSASP0", ticker_symbol)
 
     async def subscribe_trade_price_async(self, user_id: str, ticker_symbol: str, callback: Callable[[Dict[str, Any]], Awaitable[None]]):
-        """KIS 실시간 체결가 구독(Frontend <-> Backend)"""
+        """
+        KIS 실시간 체결가 구독(Frontend <-> Backend)
+        -> 거래소 코드(DNAS/RBAQ)는 등록 시 현재 세션 기준으로 붙이고 세션 전환 시 자동 교체
+        """
+        ticker_symbol = ticker_symbol.upper()
+        registered = False
         try:
-            # 주간거래 시간 처리
-            market_code = "DNAS"
-            if check_market_time(DAY_MARKET_TIME):
-                market_code = "RBAQ"
-
-            ticker_symbol = market_code + ticker_symbol.upper()
-
             # 웹소켓 연결
             await KISBroker._ws_connect(user_id)
 
             # 체결가 구독
-            async with KISBroker._user_lock[user_id]:
-                payload = {
-                    "header": {
-                        "approval_key": get_ws_token(user_id),
-                        "custtype": "P",
-                        "tr_type": "1",
-                        "content-type": "utf-8",
-                    },
-                    "body": {
-                        "input": {
-                            "tr_id": "HDFSCNT0",
-                            "tr_key": ticker_symbol,
-                        }
-                    }
-                }
-                await KISBroker._user_ws[user_id].ws.send(json.dumps(payload))
+            await KISBroker._register(user_id, "HDFSCNT0", ticker_symbol)
+            registered = True
 
             # 체결가 콜백 등록
             async with KISBroker._user_ws[user_id].callbacks_lock:
@@ -827,39 +1066,36 @@ class KISBroker(BrokerInterface):
                         KISBroker._user_ws[user_id].trade_callbacks.remove(callback)
             except:
                 Error("Failed to remove callback.")
+            # 체결가 구독 해제(마지막 구독자인 경우)
+            if registered:
+                await KISBroker._unregister(user_id, "HDFSCNT0", ticker_symbol)
 
     async def subscribe_order_update_async(self, callback: Callable[[Dict[str, Any]], Awaitable[None]]):
         """
         KIS 실시간 주문 업데이트 구독
         -> 주문 접수/체결/취소 등
         """
+        stream_attached = False
+        registered = False
         try:
             # 웹소켓 연결
             await KISBroker._ws_connect(self.user_id)
 
             # 실시간체결통보 구독
-            async with KISBroker._user_lock[self.user_id]:
-                payload = {
-                    "header": {
-                        "approval_key": get_ws_token(self.user_id),
-                        "tr_type": "1",
-                        "custtype": "P",
-                        "content-type": "utf-8",
-                    },
-                    "body": {
-                        "input": {
-                            "tr_id": "H0GSCNI0",
-                            "tr_key": get_key(self.user_id)["hts_id"],
-                        }
-                    }
-                }
-                resp = await KISBroker._user_ws[self.user_id].ws.send(json.dumps(payload))
+            hts_id = get_key(self.user_id)["hts_id"]
+            await KISBroker._register(self.user_id, "H0GSCNI0", hts_id)
+            registered = True
 
             # 실시간체결통보 콜백 등록
             async with KISBroker._user_ws[self.user_id].callbacks_lock:
                 print("실시간체결통보 콜백 등록 완료")
                 KISBroker._user_ws[self.user_id].order_update_callback = callback
 
+            # 잔고/미체결 주문 저장소에 실시간 체결통보 연결 알림
+            balance_store.attach_stream(self.user_id, "KIS")
+            open_order_store.attach_stream(self.user_id, "KIS")
+            stream_attached = True
+
             while True:
                 await asyncio.sleep(1.0)
                 
@@ -871,34 +1107,29 @@ class KISBroker(BrokerInterface):
             print(f"e : {e}")
             traceback.print_exc()
         finally:
+            if stream_attached:
+                balance_store.detach_stream(self.user_id, "KIS")
+                open_order_store.detach_stream(self.user_id, "KIS")
+
             # 실시간체결통보 콜백 제거
             Info("Finally")
             try:
                 async with KISBroker._user_ws[self.user_id].callbacks_lock:
                     print("실시간체결통보 콜백 제거 완료")
                     KISBroker._user_ws[self.user_id].order_update_callback = None
-                    KISBroker._user_ws[self.user_id].aes_decrypt_key = None
-                    KISBroker._user_ws[self.user_id].aes_decrypt_iv = None
             except:
                 Error("Failed to remove callback.")
+            # 실시간체결통보 구독 해제(마지막 구독자인 경우에만 복호화 키 삭제)
+            if registered and await KISBroker._unregister(self.user_id, "H0GSCNI0", hts_id):
+                KISBroker._user_ws[self.user_id].aes_decrypt_key = None
+                KISBroker._user_ws[self.user_id].aes_decrypt_iv = None
 
     def get_symbols(self) -> List[Dict[str, Any]]:
         try:
-            df = pd.read_table(KIS_TICKERS_PATH, sep="\t",encoding="cp949", header=None)
-            
-            symbols = []
-            for row in df.itertuples():
-                if pd.notna(row[5]) and pd.notna(row[8]):
-                    symbols.append({
-                        "symbol": row[5],
-                        "display_name": row[8]
-                    })
-                else:
-                    print(row)
-            
-            return symbols
+            # 마스터 파일은 바이너리 캐시(mmap)에서 읽음
+            return get_master_symbols(KIS_SYMBOL_EXCHANGES)
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching symbols from Binance: {e}")
+            print(f"Error fetching symbols from KIS: {e}")
             return []
         except Exception as e:
             print(f"Unexpected error in get_symbols: {e}")
@@ -923,4 +1154,7 @@ class KISBroker(BrokerInterface):
             'symbol': symbol,
             'price': 50000.0,
             'timestamp': '2025-01-01T00:00:00Z'
-        }
\ No newline at end of file
+        }
+
+# 세션 전환 시 실시간 등록 거래소 코드 교체
+market_calendar.add_listener(KISBroker._on_session_change)
\ No newline at end of file
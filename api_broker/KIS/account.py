@@ -1,13 +1,24 @@
 from .constants import API_URL
 from .token_manager import get_access_token, get_key
+from .common import send_request
 from ..Common.Debug import *
+from ..Common.AsyncRunner import run_blocking
+from ..BrokerCommon.AccountState import balance_store
 
-from typing import List, Dict, Any, Callable, Awaitable
+from typing import List, Dict, Any, Callable, Awaitable, Optional
 import requests
+import asyncio
+import time
 
 from pprint import pprint
 
-def get_assets(user_id) -> List[Dict[str, Any]]:
+def get_stock_assets(user_id) -> Optional[List[Dict[str, Any]]]:
+    """
+    해외 주식 체결 잔고 조회
+
+    Returns:
+        자산 목록(조회 실패 시 None)
+    """
     try:
         # 해외 주식 체결 잔고
         params = {
@@ -29,7 +40,7 @@ def get_assets(user_id) -> List[Dict[str, Any]]:
         }
 
         url = API_URL + f"/uapi/overseas-stock/v1/trading/inquire-balance"
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
+        resp = send_request("GET", url, user_id, headers=headers, params=params, timeout=10)
         resp_json = resp.json()
 
         assets = []
@@ -41,6 +52,26 @@ def get_assets(user_id) -> List[Dict[str, Any]]:
                 "amount": asset["ovrs_cblc_qty"],
             })
 
+        return assets
+    except requests.exceptions.RequestException as e:
+        Error("requests.exceptions.RequestException")
+        print(e)
+        return None
+    except Exception as e:
+        Error("Exception")
+        print(e)
+        return None
+
+def get_deposit_assets(user_id) -> Optional[List[Dict[str, Any]]]:
+    """
+    외화 예수금 조회
+
+    Returns:
+        자산 목록(조회 실패 시 None)
+    """
+    try:
+        assets = []
+
         # 외화 예수금
         params = {
             "CANO": get_key(user_id)["account_number_0"],
@@ -57,7 +88,7 @@ def get_assets(user_id) -> List[Dict[str, Any]]:
         }
 
         url = API_URL + f"/uapi/overseas-stock/v1/trading/foreign-margin"
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
+        resp = send_request("GET", url, user_id, headers=headers, params=params, timeout=10)
         resp_json = resp.json()
 
         #pprint(resp_json)
@@ -77,8 +108,49 @@ def get_assets(user_id) -> List[Dict[str, Any]]:
     except requests.exceptions.RequestException as e:
         Error("requests.exceptions.RequestException")
         print(e)
-        return []
+        return None
     except Exception as e:
         Error("Exception")
         print(e)
-        return []
\ No newline at end of file
+        return None
+
+def get_assets(user_id) -> List[Dict[str, Any]]:
+    return (get_stock_assets(user_id) or []) + (get_deposit_assets(user_id) or [])
+
+async def get_assets_async(user_id) -> List[Dict[str, Any]]:
+    """
+    주식 잔고/외화 예수금을 동시에 조회
+    -> 실시간 체결통보가 연결되어 있으면 메모리 잔고 사용
+    """
+    cached_assets = balance_store.get(user_id, "KIS")
+    if cached_assets is not None:
+        return cached_assets
+
+    fetched_at = time.monotonic()
+
+    # 접근 토큰은 먼저 한 번만 확보
+    # -> 캐시 만료 시 병렬 요청이 각각 토큰을 재발급하는 것을 방지
+    await run_blocking(get_access_token, user_id)
+    stock_assets, deposit_assets = await asyncio.gather(
+        run_blocking(get_stock_assets, user_id),
+        run_blocking(get_deposit_assets, user_id),
+    )
+    assets = (stock_assets or []) + (deposit_assets or [])
+
+    # 일부라도 조회에 실패한 경우 저장소에 반영하지 않음(잘못된 잔고 위에 실시간 변경분이 누적되지 않도록)
+    if stock_assets is None or deposit_assets is None:
+        return assets
+
+    balance_store.seed(user_id, "KIS", assets, fetched_at)
+    return assets
+
+def apply_fill(user_id, symbol: str, side: str, price: float, quantity, display_name: str = None):
+    """
+    실시간 체결통보(H0GSCNI0)의 체결 내역을 잔고 저장소에 반영
+    -> 예수금은 수수료를 제외한 근사값이며, 주기적인 REST 재조회로 보정됨
+    """
+    sign = 1 if side == "BUY" else -1
+    quantity = float(quantity)
+
+    balance_store.apply_delta(user_id, "KIS", "stock", symbol, sign * quantity, default_display_name=display_name)
+    balance_store.apply_delta(user_id, "KIS", "deposit", "USD", -sign * price * quantity)
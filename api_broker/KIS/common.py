@@ -1,5 +1,7 @@
 from ..Common.Debug import *
+from ..Common.RateLimiter import rate_limiter
 
+import requests
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import unpad
 from base64 import b64decode
@@ -14,4 +16,28 @@ def aes_decrypt(cipher_text, key, iv):
         Error("No decryption key or iv.")
 
     cipher = AES.new(key.encode('utf-8'), AES.MODE_CBC, iv.encode('utf-8'))
-    return bytes.decode(unpad(cipher.decrypt(b64decode(cipher_text)), AES.block_size))
\ No newline at end of file
+    return bytes.decode(unpad(cipher.decrypt(b64decode(cipher_text)), AES.block_size))
+
+# 초당 거래건수 초과 응답 코드
+RATE_LIMIT_MSG_CD = "EGW00201"
+
+def send_request(method: str, url: str, user_id, **kwargs) -> requests.Response:
+    """
+    요청 제한을 적용한 REST 요청
+    -> 앱키(사용자)별 초당 거래건수 제한
+    -> 초당 거래건수 초과 응답 시 1초 동안 요청 중단 후 한 번 재요청(거부된 요청이므로 중복 없음)
+
+    Raises:
+        RateLimitExceeded: 요청 제한으로 전송하지 못한 경우
+    """
+    for attempt in range(2):
+        rate_limiter.acquire("KIS", user_id, "tr")
+        resp = requests.request(method, url, **kwargs)
+
+        if resp.status_code == 200 or RATE_LIMIT_MSG_CD not in resp.text:
+            return resp
+
+        Error(f"KIS rate limit({user_id})")
+        rate_limiter.block("KIS", user_id, 1.0)
+
+    return resp
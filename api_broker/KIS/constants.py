@@ -1,35 +1,11 @@
-from datetime import datetime, timedelta, date
+import os
 
 # Reference : https://apiportal.koreainvestment.com/apiservice-summary
-API_URL = "https://openapi.koreainvestment.com:9443"
-WS_URL = "ws://ops.koreainvestment.com:21000"
+# 테스트/벤치마크 시 로컬 서버(Benchmark/mock_exchange.py, ws_replay.py)로 교체할 수 있도록 환경 변수 지원
+API_URL = os.environ.get("KIS_API_URL", "https://openapi.koreainvestment.com:9443")
+WS_URL = os.environ.get("KIS_WS_URL", "ws://ops.koreainvestment.com:21000")
 
-# 서머 타임 여부
-IS_SUMMER_TIME = False
-
-# https://www.truefriend.com/main/bond/research/_static/TF03ca050001.jsp
-# [ 거래 가능 시간 ]
-# 주간거래(ATS)
-DAY_MARKET_TIME = [ "10:00", "18:00" ]
-# 프리마켓
-PRE_MARKET_TIME = [ "18:00", "23:30" ]
-# 정규장
-MAIN_MARKET_TIME = [ "23:30", "06:00" ]
-# 애프터마켓
-AFTER_MARKET_TIME = [ "06:00", "07:00" ]
-# 애프터마켓 연장 신청 시(서머타임 동일)
-EXTENDED_AFTER_MARKET_TIME = [ "07:00", "09:00" ]
-
-# [ 서머타임 ]
-if IS_SUMMER_TIME == True:
-    # 주간거래(ATS)
-    DAY_MARKET_TIME = [ "10:00", "17:00" ]
-    # 프리마켓
-    PRE_MARKET_TIME = [ "17:00", "22:30" ]
-    # 정규장
-    MAIN_MARKET_TIME = [ "22:30", "05:00" ]
-    # 애프터마켓
-    AFTER_MARKET_TIME = [ "05:00", "06:00" ]
+# 거래 시간(세션)은 market_calendar.py 참고
 
 # 컬럼 이름을 한국어로 변환
 # -> 항상 API 문서와 같은지 크로스체크할 것!
@@ -109,31 +85,3 @@ COLUMN_TO_KOR_DICT = {
     "END_TM": "분할매수/매도 종료시간",
     "TM_DIV_TP": "시간분할타입유형",
 }
-
-# 거래 시간 전처리
-def preprocess_market_time(market_time):
-    #return datetime.strptime(market_time[0], "%H:%M").time(), datetime.strptime(market_time[1], "%H:%M").time()
-    start_str, end_str = market_time
-    today = date.today()
-    
-    start_time = datetime.strptime(start_str, "%H:%M").time()
-    end_time = datetime.strptime(end_str, "%H:%M").time()
-    
-    start_dt = datetime.combine(today, start_time)
-    end_dt = datetime.combine(today, end_time)
-    
-    # 자정 이후 시각 처리
-    if end_dt < start_dt:
-        end_dt += timedelta(days=1)
-        
-    return start_dt, end_dt
-
-def check_market_time(market_time):
-    market_time_dt = preprocess_market_time(market_time)
-
-    print(market_time_dt[0])
-    print(market_time_dt[1])
-
-    if market_time_dt[0] <= datetime.now() < market_time_dt[1]:
-        return True
-    return False
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+미국 주식 거래 세션 달력(KIS 해외주식)
+-> 미국 동부 시간(America/New_York) 기준으로 세션 경계를 미리 계산하므로 서머타임은 자동 반영
+-> 휴장일은 기본 목록 + KIS_MARKET_HOLIDAYS 환경 변수(YYYY-MM-DD,...)
+-> current_session()은 캐시된 구간 안이면 비교 한 번으로 응답(구간을 벗어날 때만 이진 탐색)
+-> run()을 실행하면 세션이 바뀔 때마다 등록된 콜백 호출(서버 시작 시 실행)
+-> 주문 경로(작업 스레드)에서도 호출하므로 상태는 불변 튜플로 한 번에 교체(읽을 때는 한 번만 참조)
+
+[ 세션(KST, 서머타임 미적용 / 적용) ]
+day   : 주간거래(ATS) 10:00 ~ 18:00 / 10:00 ~ 17:00
+pre   : 프리마켓 18:00 ~ 23:30 / 17:00 ~ 22:30
+main  : 정규장 23:30 ~ 06:00 / 22:30 ~ 05:00
+after : 애프터마켓 06:00 ~ 07:00 / 05:00 ~ 06:00(연장 신청 시 09:00까지)
+closed : 그 외
+"""
+from ..Common.Debug import *
+from typing import List, Tuple, Optional, Callable, Awaitable
+from datetime import datetime, date, time as dt_time, timedelta
+from zoneinfo import ZoneInfo
+import asyncio
+import bisect
+import time
+import os
+
+# https://www.truefriend.com/main/bond/research/_static/TF03ca050001.jsp
+ET = ZoneInfo("America/New_York")
+KST = ZoneInfo("Asia/Seoul")
+
+DAY = "day"
+PRE = "pre"
+MAIN = "main"
+AFTER = "after"
+CLOSED = "closed"
+
+# [ 거래 가능 시간 ]
+# 주간거래 시작(KST 고정, 종료는 프리마켓 시작)
+DAY_MARKET_START_KST = dt_time(10, 0)
+# 프리마켓/정규장/애프터마켓(ET)
+PRE_MARKET_START_ET = dt_time(4, 0)
+MAIN_MARKET_START_ET = dt_time(9, 30)
+MAIN_MARKET_END_ET = dt_time(16, 0)
+AFTER_MARKET_END_ET = dt_time(17, 0)
+# 애프터마켓 연장 신청 시 종료(KST 고정, 서머타임 동일)
+EXTENDED_AFTER_MARKET_END_KST = dt_time(9, 0)
+EXTENDED_AFTER_MARKET = os.environ.get("KIS_EXTENDED_AFTER_MARKET", "0") == "1"
+
+# NYSE/NASDAQ 휴장일(ET 날짜)
+# -> 매년 갱신 필요, 임시 휴장은 KIS_MARKET_HOLIDAYS로 추가
+US_MARKET_HOLIDAYS = {
+    # 2026
+    "2026-01-01", "2026-01-19", "2026-02-16", "2026-04-03", "2026-05-25",
+    "2026-06-19", "2026-07-03", "2026-09-07", "2026-11-26", "2026-12-25",
+    # 2027
+    "2027-01-01", "2027-01-18", "2027-02-15", "2027-03-26", "2027-05-31",
+    "2027-06-18", "2027-07-05", "2027-09-06", "2027-11-25", "2027-12-24",
+}
+
+# 미리 계산할 기간(일)
+SCHEDULE_DAYS_BEFORE = 2
+SCHEDULE_DAYS_AFTER = 14
+
+# 세션 변경 감시 루프의 최대 대기 시간(초, 시스템 시각 변경 대비)
+SESSION_WATCH_MAX_SLEEP_SECONDS = 60.0
+
+def _load_holidays() -> set:
+    holidays = set()
+    extra = os.environ.get("KIS_MARKET_HOLIDAYS", "")
+    for value in list(US_MARKET_HOLIDAYS) + extra.split(","):
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            holidays.add(date.fromisoformat(value))
+        except ValueError:
+            Error(f"Invalid market holiday : {value}")
+    return holidays
+
+def _ts(day: date, at: dt_time, tz: ZoneInfo) -> float:
+    return datetime.combine(day, at, tzinfo=tz).timestamp()
+
+class MarketCalendar:
+    def __init__(self, holidays: Optional[set] = None, extended_after_market: bool = EXTENDED_AFTER_MARKET):
+        self.holidays = _load_holidays() if holidays is None else holidays
+        self.extended_after_market = extended_after_market
+
+        # (세션 경계(타임스탬프 오름차순), 각 경계부터 시작되는 세션, 미리 계산한 기간)
+        self._schedule: Tuple[Tuple[float, ...], Tuple[str, ...], Tuple[float, float]] = ((), (), (0.0, 0.0))
+
+        # 마지막 조회 결과(세션, 시작, 종료), [시작, 종료) 구간 안이면 재사용
+        self._cached: Tuple[str, float, float] = (CLOSED, 0.0, 0.0)
+
+        self._listeners: List[Callable[[str, str], Awaitable[None]]] = []
+
+    def is_trading_day(self, day: date) -> bool:
+        """
+        미국 시장 거래일 여부(ET 날짜)
+        """
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _sessions_of(self, day: date) -> List[Tuple[float, float, str]]:
+        """
+        ET 거래일 하나에 속한 세션 목록
+
+        Returns:
+            [(시작, 종료, 세션), ...]
+        """
+        if not self.is_trading_day(day):
+            return []
+
+        pre_start = _ts(day, PRE_MARKET_START_ET, ET)
+        main_start = _ts(day, MAIN_MARKET_START_ET, ET)
+        main_end = _ts(day, MAIN_MARKET_END_ET, ET)
+        if self.extended_after_market:
+            after_end = _ts(day + timedelta(days=1), EXTENDED_AFTER_MARKET_END_KST, KST)
+        else:
+            after_end = _ts(day, AFTER_MARKET_END_ET, ET)
+
+        # 주간거래는 같은 날짜(KST) 10시부터 프리마켓 시작 전까지
+        # -> ET 04:00은 항상 같은 날짜의 KST 17:00 또는 18:00
+        day_start = _ts(day, DAY_MARKET_START_KST, KST)
+
+        return [
+            (day_start, pre_start, DAY),
+            (pre_start, main_start, PRE),
+            (main_start, main_end, MAIN),
+            (main_end, after_end, AFTER),
+        ]
+
+    def build(self, now: Optional[float] = None):
+        """
+        now 기준 앞뒤 기간의 세션 경계 계산
+
+        Returns:
+            (세션 경계, 세션, 기간)
+        """
+        if now is None:
+            now = time.time()
+        today = datetime.fromtimestamp(now, ET).date()
+        first = today - timedelta(days=SCHEDULE_DAYS_BEFORE)
+        last = today + timedelta(days=SCHEDULE_DAYS_AFTER)
+
+        bounds = []
+        sessions = []
+        day = first
+        while day <= last:
+            for start, end, session in self._sessions_of(day):
+                # 앞 세션 종료와 바로 이어지면 휴장 경계를 덮어씀
+                if bounds and bounds[-1] == start:
+                    sessions[-1] = session
+                else:
+                    bounds.append(start)
+                    sessions.append(session)
+                bounds.append(end)
+                sessions.append(CLOSED)
+            day += timedelta(days=1)
+
+        window = (
+            datetime.combine(first, dt_time(0, 0), tzinfo=ET).timestamp(),
+            datetime.combine(last, dt_time(0, 0), tzinfo=ET).timestamp(),
+        )
+        schedule = (tuple(bounds), tuple(sessions), window)
+        self._schedule = schedule
+        return schedule
+
+    def _lookup(self, now: float) -> Tuple[str, float, float]:
+        """
+        Returns:
+            (세션, 시작, 종료)
+        """
+        schedule = self._schedule
+        if not (schedule[2][0] <= now < schedule[2][1]):
+            schedule = self.build(now)
+        bounds, sessions, window = schedule
+
+        index = bisect.bisect_right(bounds, now) - 1
+        if index < 0:
+            cached = (CLOSED, window[0], bounds[0] if bounds else window[1])
+        else:
+            cached = (sessions[index], bounds[index], bounds[index + 1] if index + 1 < len(bounds) else window[1])
+        self._cached = cached
+        return cached
+
+    def current_session(self, now: Optional[float] = None) -> str:
+        """
+        현재 세션 조회
+
+        Args:
+            now: 타임스탬프(기본값은 현재 시각)
+
+        Returns:
+            day/pre/main/after/closed
+        """
+        if now is None:
+            now = time.time()
+        current, valid_from, valid_until = self._cached
+        if valid_from <= now < valid_until:
+            return current
+        return self._lookup(now)[0]
+
+    def is_day_session(self, now: Optional[float] = None) -> bool:
+        """
+        주간거래(ATS) 시간 여부(주문 tr_id 선택용)
+        """
+        return self.current_session(now) == DAY
+
+    def realtime_market_code(self, now: Optional[float] = None) -> str:
+        """
+        실시간 시세 tr_key 거래소 코드(주간거래 : RBAQ, 그 외 : DNAS)
+        """
+        return "RBAQ" if self.current_session(now) == DAY else "DNAS"
+
+    def next_change(self, now: Optional[float] = None) -> Tuple[float, str]:
+        """
+        다음 세션 변경 시각과 변경 후 세션
+
+        Returns:
+            (타임스탬프, 세션)
+        """
+        if now is None:
+            now = time.time()
+        cached = self._cached
+        if not (cached[1] <= now < cached[2]):
+            cached = self._lookup(now)
+        until = cached[2]
+        # 조회 캐시(현재 구간)는 유지
+        bounds, sessions, _ = self._schedule
+        index = bisect.bisect_right(bounds, until) - 1
+        return until, sessions[index] if index >= 0 else CLOSED
+
+    def add_listener(self, callback: Callable[[str, str], Awaitable[None]]):
+        """
+        세션 변경 콜백 등록
+
+        Args:
+            callback: async def callback(이전 세션, 새 세션)
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, str], Awaitable[None]]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    async def run(self):
+        """
+        세션 변경 시각마다 콜백 호출(서버 시작 시 실행)
+        """
+        session = self.current_session()
+        Info(f"KIS market session : {session}")
+        while True:
+            until, _ = self.next_change()
+            delay = until - time.time()
+            if delay > 0:
+                await asyncio.sleep(min(delay, SESSION_WATCH_MAX_SLEEP_SECONDS))
+                continue
+
+            new_session = self.current_session()
+            if new_session == session:
+                continue
+            Info(f"KIS market session : {session} -> {new_session}")
+            for callback in list(self._listeners):
+                try:
+                    await callback(session, new_session)
+                except Exception as e:
+                    Error(f"Session change callback failed : {e}")
+            session = new_session
+
+market_calendar = MarketCalendar()
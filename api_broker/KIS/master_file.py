@@ -0,0 +1,224 @@
+"""
+KIS 해외주식 종목 마스터 파일(NASMST/NYSMST/AMSMST.COD) 로더
+-> cp949 탭 구분 텍스트를 한 번만 파싱하여 열 단위 바이너리 캐시(.bin)로 저장
+-> 캐시는 mmap으로 읽고, 원본 파일의 mtime/크기/해시가 바뀐 경우에만 다시 생성
+https://github.com/koreainvestment/open-trading-api/tree/main/stocks_info
+"""
+from ..Common.Debug import *
+
+from typing import List, Dict, Any, Optional, Iterable
+import bisect
+import hashlib
+import mmap
+import struct
+import threading
+import os
+
+# 마스터 파일 위치(기본값 : 이 모듈과 같은 디렉토리)
+MASTER_DIR = os.environ.get("KIS_MASTER_DIR", os.path.dirname(os.path.abspath(__file__)))
+# 바이너리 캐시 위치
+MASTER_CACHE_DIR = os.environ.get("KIS_MASTER_CACHE_DIR", MASTER_DIR)
+
+# 거래소 코드 -> 마스터 파일
+MASTER_FILES = {
+    "NAS": "NASMST.COD",
+    "NYS": "NYSMST.COD",
+    "AMS": "AMSMST.COD",
+}
+
+# 캐시에 저장할 열(이름, 원본 파일의 열 번호)
+COLUMNS = (
+    ("exchange", 2),
+    ("symbol", 4),
+    ("realtime_symbol", 5),
+    ("korean_name", 6),
+    ("english_name", 7),
+    ("currency", 9),
+)
+
+_MAGIC = b"KISM"
+_VERSION = 1
+# magic, version, 원본 mtime(ns), 원본 크기, 원본 sha1, 레코드 수, 열 수
+_HEADER = struct.Struct("<4sHQQ20sII")
+# 열별 (offsets 위치, blob 위치, blob 크기)
+_COLUMN_DIR = struct.Struct("<QQQ")
+
+def _source_sha1(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+def _parse_source(path: str) -> List[List[str]]:
+    """
+    원본 파일 파싱(심볼 기준 정렬)
+    """
+    rows = []
+    with open(path, "rb") as f:
+        for line in f:
+            fields = line.decode("cp949", errors="replace").rstrip("\r\n").split("\t")
+            if len(fields) <= COLUMNS[-1][1]:
+                continue
+            row = [fields[index].strip() for _, index in COLUMNS]
+            # 심볼 또는 영문 이름이 없는 행 제외
+            if row[1] and row[4]:
+                rows.append(row)
+    rows.sort(key=lambda row: row[1])
+    return rows
+
+def _build_cache(source_path: str, cache_path: str, stat: os.stat_result, sha1: bytes):
+    """
+    열 단위 바이너리 캐시 생성(임시 파일에 쓴 뒤 교체)
+    """
+    rows = _parse_source(source_path)
+
+    columns = []
+    for col in range(len(COLUMNS)):
+        offsets = [0]
+        blob = bytearray()
+        for row in rows:
+            blob += row[col].encode("utf-8")
+            offsets.append(len(blob))
+        columns.append((struct.pack(f"<{len(offsets)}I", *offsets), bytes(blob)))
+
+    header = _HEADER.pack(_MAGIC, _VERSION, stat.st_mtime_ns, stat.st_size, sha1, len(rows), len(COLUMNS))
+    position = _HEADER.size + _COLUMN_DIR.size * len(COLUMNS)
+    directory = bytearray()
+    for offsets, blob in columns:
+        directory += _COLUMN_DIR.pack(position, position + len(offsets), len(blob))
+        position += len(offsets) + len(blob)
+
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(directory)
+        for offsets, blob in columns:
+            f.write(offsets)
+            f.write(blob)
+    os.replace(tmp_path, cache_path)
+
+    Info(f"KIS master cache built({os.path.basename(source_path)}, {len(rows)})")
+
+class MasterFile:
+    """
+    mmap으로 연 마스터 파일 캐시(읽기 전용)
+    """
+    def __init__(self, exchange: str, cache_path: str, source_stat: tuple):
+        self.exchange = exchange
+        # 캐시를 만들 때의 원본 (mtime, 크기)
+        self.source_stat = source_stat
+        self._file = open(cache_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, _, _, self.count, column_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION or column_count != len(COLUMNS):
+            raise ValueError(f"Invalid KIS master cache({cache_path})")
+
+        self._columns = [
+            _COLUMN_DIR.unpack_from(self._mm, _HEADER.size + _COLUMN_DIR.size * col)
+            for col in range(column_count)
+        ]
+        self._column_index = {name: col for col, (name, _) in enumerate(COLUMNS)}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def value(self, column: str, i: int) -> str:
+        offsets_pos, blob_pos, _ = self._columns[self._column_index[column]]
+        start, end = struct.unpack_from("<II", self._mm, offsets_pos + 4 * i)
+        return self._mm[blob_pos + start:blob_pos + end].decode("utf-8")
+
+    def record(self, i: int) -> Dict[str, str]:
+        return {name: self.value(name, i) for name, _ in COLUMNS}
+
+    def find(self, symbol: str) -> Optional[Dict[str, str]]:
+        """
+        심볼로 종목 조회(심볼 기준 정렬되어 있으므로 이진 탐색)
+        """
+        symbol = symbol.upper()
+        lo = bisect.bisect_left(range(self.count), symbol, key=lambda i: self.value("symbol", i))
+        if lo < self.count and self.value("symbol", lo) == symbol:
+            return self.record(lo)
+        return None
+
+    def symbols(self) -> List[Dict[str, Any]]:
+        """
+        심볼 목록(get_symbols() 형식)
+        """
+        return [
+            {
+                "symbol": self.value("symbol", i),
+                "display_name": self.value("english_name", i),
+            }
+            for i in range(self.count)
+        ]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+# 거래소 코드 -> MasterFile
+_masters: Dict[str, MasterFile] = {}
+_lock = threading.Lock()
+
+def _cache_is_valid(source_path: str, cache_path: str, stat: os.stat_result) -> bool:
+    """
+    캐시가 원본과 일치하는지 검사
+    -> mtime/크기가 같으면 유효, 다르면 해시 비교(같으면 캐시의 mtime만 갱신)
+    """
+    if not os.path.exists(cache_path):
+        return False
+
+    with open(cache_path, "r+b") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return False
+        magic, version, mtime_ns, size, sha1, count, column_count = _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION or column_count != len(COLUMNS):
+            return False
+        if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+            return True
+        if size != stat.st_size or sha1 != _source_sha1(source_path):
+            return False
+
+        f.seek(0)
+        f.write(_HEADER.pack(magic, version, stat.st_mtime_ns, size, sha1, count, column_count))
+        return True
+
+def load_master(exchange: str) -> Optional[MasterFile]:
+    """
+    거래소 마스터 파일 로드(필요 시 캐시 재생성)
+
+    Returns:
+        MasterFile 또는 원본 파일이 없는 경우 None
+    """
+    exchange = exchange.upper()
+    with _lock:
+        source_path = os.path.join(MASTER_DIR, MASTER_FILES[exchange])
+        cache_path = os.path.join(MASTER_CACHE_DIR, MASTER_FILES[exchange] + ".bin")
+
+        if not os.path.exists(source_path):
+            Info(f"KIS master file not found({source_path})")
+            return _masters.get(exchange)
+
+        stat = os.stat(source_path)
+        master = _masters.get(exchange)
+        if master is not None and master.source_stat == (stat.st_mtime_ns, stat.st_size):
+            return master
+
+        if not _cache_is_valid(source_path, cache_path, stat):
+            _build_cache(source_path, cache_path, stat, _source_sha1(source_path))
+
+        new_master = MasterFile(exchange, cache_path, (stat.st_mtime_ns, stat.st_size))
+        # 이전 mmap은 참조 중인 요청이 있을 수 있으므로 닫지 않음(GC 시 해제)
+        _masters[exchange] = new_master
+        return new_master
+
+def get_symbols(exchanges: Iterable[str] = ("NAS",)) -> List[Dict[str, Any]]:
+    """
+    여러 거래소의 심볼 목록
+    """
+    symbols = []
+    for exchange in exchanges:
+        master = load_master(exchange)
+        if master is not None:
+            symbols.extend(master.symbols())
+    return symbols
@@ -1,24 +1,45 @@
-from .constants import API_URL, COLUMN_TO_KOR_DICT, DAY_MARKET_TIME
-from .constants import check_market_time
+from .constants import API_URL, COLUMN_TO_KOR_DICT
+from .market_calendar import market_calendar
 from ..Common.Debug import *
 from .token_manager import get_access_token, get_key
+from .common import send_request
+from ..Common.AsyncRunner import run_blocking, gather_bounded
+from ..BrokerCommon.DataTypes import summarize_cancel_results
 
+from typing import List, Dict, Any
 import traceback
 import requests
+import os
 from pprint import pprint
 
-def place_order(user_id, order):
+# 모든 주문 취소 시 동시에 전송할 취소 요청 수
+# -> KIS는 일괄 취소 API가 없으므로 주문별로 취소 요청(초당 요청 수 제한에 유의)
+CANCEL_ALL_CONCURRENCY = int(os.environ.get("KIS_CANCEL_ALL_CONCURRENCY", "5"))
+# 일괄 주문 시 동시에 전송할 주문 수
+PLACE_ORDERS_CONCURRENCY = int(os.environ.get("KIS_PLACE_ORDERS_CONCURRENCY", "5"))
+
+def place_order(user_id, order, key=None, access_token=None):
+    """
+    Args:
+        key: 미리 조회한 get_key() 결과(일괄 주문 시 한 번만 조회)
+        access_token: 미리 조회한 접근 토큰
+    """
     try:
         result = {
             "result": "error",
             "message": "Unknown error.",
         }
 
+        if key is None:
+            key = get_key(user_id)
+        if access_token is None:
+            access_token = get_access_token(user_id)
+
         tr_id = ""
         resp_json = {}
 
         # 주간거래 시간 처리
-        if check_market_time(DAY_MARKET_TIME):
+        if market_calendar.is_day_session():
             # 매수 주문
             if order["side"] == "BUY":
                 tr_id = "TTTS6036U"
@@ -30,8 +51,8 @@ def place_order(user_id, order):
                 return result
 
             payload = {
-                "CANO": get_key(user_id)["account_number_0"],
-                "ACNT_PRDT_CD": get_key(user_id)["account_number_1"],
+                "CANO": key["account_number_0"],
+                "ACNT_PRDT_CD": key["account_number_1"],
                 "OVRS_EXCG_CD": "NASD",
                 "PDNO": str(order["symbol"]).upper(),
                 "ORD_QTY": str(order["quantity"]),
@@ -45,16 +66,16 @@ def place_order(user_id, order):
 
             headers = {
                 "content-type": "application/json; charset=utf-8",
-                "authorization": "Bearer " + get_access_token(user_id),
-                "appkey": get_key(user_id)["app_key"],
-                "appsecret": get_key(user_id)["sec_key"],
+                "authorization": "Bearer " + access_token,
+                "appkey": key["app_key"],
+                "appsecret": key["sec_key"],
                 "tr_id": tr_id,
                 "custtype": "P",
             }
 
             url = API_URL + f"/uapi/overseas-stock/v1/trading/daytime-order"
             # POST 요청시 data가 아닌 json 파라미터로 요청 필요
-            resp = requests.post(url, json=payload, headers=headers, timeout=10)
+            resp = send_request("POST", url, user_id, json=payload, headers=headers, timeout=10)
             pprint(resp.text)
             resp_json = resp.json()
         else:
@@ -69,8 +90,8 @@ def place_order(user_id, order):
                 return result
 
             payload = {
-                "CANO": get_key(user_id)["account_number_0"],
-                "ACNT_PRDT_CD": get_key(user_id)["account_number_1"],
+                "CANO": key["account_number_0"],
+                "ACNT_PRDT_CD": key["account_number_1"],
                 "OVRS_EXCG_CD": "NASD",
                 "PDNO": str(order["symbol"]).upper(),
                 "ORD_QTY": str(order["quantity"]),
@@ -82,16 +103,16 @@ def place_order(user_id, order):
 
             headers = {
                 "content-type": "application/json; charset=utf-8",
-                "authorization": "Bearer " + get_access_token(user_id),
-                "appkey": get_key(user_id)["app_key"],
-                "appsecret": get_key(user_id)["sec_key"],
+                "authorization": "Bearer " + access_token,
+                "appkey": key["app_key"],
+                "appsecret": key["sec_key"],
                 "tr_id": tr_id,
                 "custtype": "P",
             }
 
             url = API_URL + f"/uapi/overseas-stock/v1/trading/order"
             # POST 요청시 data가 아닌 json 파라미터로 요청 필요
-            resp = requests.post(url, json=payload, headers=headers, timeout=10)
+            resp = send_request("POST", url, user_id, json=payload, headers=headers, timeout=10)
             #pprint(resp.text)
             resp_json = resp.json()
 
@@ -114,6 +135,57 @@ def place_order(user_id, order):
         Error("KIS Exception")
         traceback.print_exc()
         return {}
+
+def validate_order(order) -> str:
+    """
+    주문 전송 전 검사
+
+    Returns:
+        오류 메시지(문제가 없으면 빈 문자열)
+    """
+    for field in ("symbol", "side", "price", "quantity"):
+        if field not in order:
+            return f"Missing field({field})"
+
+    if order["side"] not in ("BUY", "SELL"):
+        return f"Invalid side({order["side"]})"
+
+    try:
+        if float(order["price"]) <= 0:
+            return "Price must be positive"
+        # 해외주식은 정수 단위 주문만 가능
+        if int(str(order["quantity"])) <= 0:
+            return "Quantity must be a positive integer"
+    except (TypeError, ValueError):
+        return "Invalid price or quantity"
+
+    return ""
+
+async def place_orders_async(user_id, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    여러 주문을 동시에 전송(최대 PLACE_ORDERS_CONCURRENCY 건씩)
+    -> 키와 접근 토큰은 한 번만 조회하여 모든 주문에 사용
+
+    Returns:
+        주문별 결과 리스트(요청 순서 유지)
+    """
+    key = await run_blocking(get_key, user_id)
+    access_token = await run_blocking(get_access_token, user_id)
+
+    place_results = await gather_bounded(
+        [run_blocking(place_order, user_id, order, key, access_token) for order in orders],
+        PLACE_ORDERS_CONCURRENCY
+    )
+
+    results = []
+    for result in place_results:
+        if isinstance(result, Exception):
+            results.append({"result": "error", "message": str(result)})
+        elif not result:
+            results.append({"result": "error", "message": "Unknown error."})
+        else:
+            results.append(result)
+    return results
     
 def cancel_order(user_id, order):
     try:
@@ -123,7 +195,7 @@ def cancel_order(user_id, order):
         }
 
         # 주간거래 시간 처리
-        if check_market_time(DAY_MARKET_TIME):
+        if market_calendar.is_day_session():
             payload = {
                 "CANO": get_key(user_id)["account_number_0"],
                 "ACNT_PRDT_CD": get_key(user_id)["account_number_1"],
@@ -149,7 +221,7 @@ def cancel_order(user_id, order):
 
             url = API_URL + f"/uapi/overseas-stock/v1/trading/daytime-order-rvsecncl"
             # POST 요청시 data가 아닌 json 파라미터로 요청 필요
-            resp = requests.post(url, json=payload, headers=headers, timeout=10)
+            resp = send_request("POST", url, user_id, json=payload, headers=headers, timeout=10)
             resp_json = resp.json()
 
             Info(resp_json)
@@ -190,7 +262,7 @@ def cancel_order(user_id, order):
 
             url = API_URL + f"/uapi/overseas-stock/v1/trading/order-rvsecncl"
             # POST 요청시 data가 아닌 json 파라미터로 요청 필요
-            resp = requests.post(url, json=payload, headers=headers, timeout=10)
+            resp = send_request("POST", url, user_id, json=payload, headers=headers, timeout=10)
             resp_json = resp.json()
 
             if "ODNO" in resp_json["output"]:
@@ -211,4 +283,40 @@ def cancel_order(user_id, order):
     except Exception as e:
         Error("KIS Exception")
         traceback.print_exc()
-        return {}
\ No newline at end of file
+        return {}
+
+def _cancel_result(order, result) -> Dict[str, Any]:
+    """
+    cancel_order() 결과를 주문별 취소 결과 형식으로 변환
+    """
+    if isinstance(result, Exception):
+        return {"order_id": order["order_id"], "symbol": order["symbol"], "result": "error", "message": str(result)}
+    return {
+        "order_id": order["order_id"],
+        "symbol": order["symbol"],
+        "result": result.get("result", "error") if result else "error",
+        "message": result.get("message", "") if result else "",
+    }
+
+def cancel_all_orders(user_id, orders: List[Dict[str, Any]]):
+    """
+    주어진 미체결 주문 모두 취소(순차)
+    """
+    results = [_cancel_result(order, cancel_order(user_id, order)) for order in orders]
+    return summarize_cancel_results(results)
+
+async def cancel_all_orders_async(user_id, orders: List[Dict[str, Any]]):
+    """
+    주어진 미체결 주문 모두 취소
+    -> 최대 CANCEL_ALL_CONCURRENCY 건씩 동시에 전송
+    """
+    # 접근 토큰은 먼저 한 번만 확보
+    await run_blocking(get_access_token, user_id)
+
+    cancel_results = await gather_bounded(
+        [run_blocking(cancel_order, user_id, order) for order in orders],
+        CANCEL_ALL_CONCURRENCY
+    )
+
+    results = [_cancel_result(order, result) for order, result in zip(orders, cancel_results)]
+    return summarize_cancel_results(results)
@@ -0,0 +1,162 @@
+"""
+KIS 실시간 데이터 프레임 파서
+-> 프레임 형식 : (암호화 여부)|(tr_id)|(레코드 수)|(레코드1 필드^...^레코드N 필드)
+-> 본문은 한 번만 split 하고, 필요한 필드만 미리 계산한 인덱스로 꺼내 __slots__ 레코드로 변환
+"""
+from typing import List, Tuple
+
+# [ 해외주식 실시간호가(HDFSASP0) ]
+ORDERBOOK_COLUMNS = (
+    "rsym", "symb", "zdiv", "xymd", "xhms", "kymd", "khms",
+    "bvol", "avol", "bdvl", "advl",
+    "pbid1", "pask1", "vbid1", "vask1", "dbid1", "dask1",
+)
+
+# [ 해외주식 실시간체결가(HDFSCNT0) ]
+TRADE_COLUMNS = (
+    "RSYM", "SYMB", "ZDIV", "TYMD", "XYMD", "XHMS", "KYMD", "KHMS",
+    "OPEN", "HIGH", "LOW", "LAST", "SIGN", "DIFF", "RATE",
+    "PBID", "PASK", "VBID", "VASK", "EVOL", "TVOL", "TAMT",
+    "BIVL", "ASVL", "STRN", "MTYP",
+)
+
+# [ 해외주식 실시간체결통보(H0GSCNI0), 복호화 후 ]
+ORDER_NOTICE_COLUMNS = (
+    "CUST_ID", "ACNT_NO", "ODER_NO", "OODER_NO", "SELN_BYOV_CLS", "RCTF_CLS",
+    "ODER_KIND2", "STCK_SHRN_ISCD", "CNTG_QTY", "CNTG_UNPR", "STCK_CNTG_HOUR",
+    "RFUS_YN", "CNTG_YN", "ACPT_YN", "BRNC_NO", "ODER_QTY", "ACNT_NAME",
+    "CNTG_ISNM", "ODER_COND", "DEBT_GB", "DEBT_DATE", "START_TM", "END_TM",
+    "TM_DIV_TP", "CNTG_UNPR12",
+)
+
+# 레코드당 필드 수
+ORDERBOOK_WIDTH = len(ORDERBOOK_COLUMNS)
+TRADE_WIDTH = len(TRADE_COLUMNS)
+ORDER_NOTICE_WIDTH = len(ORDER_NOTICE_COLUMNS)
+
+# 필요한 필드의 인덱스(모듈 로드 시 한 번만 계산)
+_OB_SYMB = ORDERBOOK_COLUMNS.index("symb")
+_OB_PBID = ORDERBOOK_COLUMNS.index("pbid1")
+_OB_PASK = ORDERBOOK_COLUMNS.index("pask1")
+_OB_VBID = ORDERBOOK_COLUMNS.index("vbid1")
+_OB_VASK = ORDERBOOK_COLUMNS.index("vask1")
+
+_TR_SYMB = TRADE_COLUMNS.index("SYMB")
+_TR_KHMS = TRADE_COLUMNS.index("KHMS")
+_TR_LAST = TRADE_COLUMNS.index("LAST")
+_TR_EVOL = TRADE_COLUMNS.index("EVOL")
+
+_ON_ODER_NO = ORDER_NOTICE_COLUMNS.index("ODER_NO")
+_ON_OODER_NO = ORDER_NOTICE_COLUMNS.index("OODER_NO")
+_ON_SIDE = ORDER_NOTICE_COLUMNS.index("SELN_BYOV_CLS")
+_ON_RCTF = ORDER_NOTICE_COLUMNS.index("RCTF_CLS")
+_ON_SYMBOL = ORDER_NOTICE_COLUMNS.index("STCK_SHRN_ISCD")
+_ON_QTY = ORDER_NOTICE_COLUMNS.index("CNTG_QTY")
+_ON_PRICE = ORDER_NOTICE_COLUMNS.index("CNTG_UNPR")
+_ON_CNTG_YN = ORDER_NOTICE_COLUMNS.index("CNTG_YN")
+_ON_ISNM = ORDER_NOTICE_COLUMNS.index("CNTG_ISNM")
+
+def _symbol(code: str) -> str:
+    # 야간(정규장) 종목코드의 시장 접두어 제거
+    return code.replace("DNAS", "")
+
+def _float(value: str) -> float:
+    return float(value) if value else 0.0
+
+class OrderbookRecord:
+    __slots__ = ("symbol", "bid_price", "bid_quantity", "ask_price", "ask_quantity")
+
+    def __init__(self, fields: List[str], base: int):
+        self.symbol = _symbol(fields[base + _OB_SYMB])
+        self.bid_price = float(fields[base + _OB_PBID])
+        self.bid_quantity = float(fields[base + _OB_VBID])
+        self.ask_price = float(fields[base + _OB_PASK])
+        self.ask_quantity = float(fields[base + _OB_VASK])
+
+    def to_dict(self):
+        return {
+            "symbol": self.symbol,
+            "bids": [
+                {"price": self.bid_price, "quantity": self.bid_quantity}
+            ],
+            "asks": [
+                {"price": self.ask_price, "quantity": self.ask_quantity}
+            ],
+        }
+
+class TradeRecord:
+    __slots__ = ("symbol", "price", "quantity", "time")
+
+    def __init__(self, fields: List[str], base: int):
+        self.symbol = _symbol(fields[base + _TR_SYMB])
+        self.price = _float(fields[base + _TR_LAST])
+        self.quantity = _float(fields[base + _TR_EVOL])
+        # 한국시간
+        self.time = fields[base + _TR_KHMS]
+
+    def to_dict(self, timestamp: int):
+        return {
+            "symbol": self.symbol,
+            "price": self.price,
+            "quantity": self.quantity,
+            "time": self.time,
+            "isBuyerMaker": True,
+            "timestamp": timestamp,
+        }
+
+class OrderNoticeRecord:
+    __slots__ = (
+        "order_id", "original_order_id", "side", "rctf_cls",
+        "symbol", "quantity", "price", "filled", "display_name",
+    )
+
+    def __init__(self, fields: List[str], base: int):
+        self.order_id = fields[base + _ON_ODER_NO]
+        # 원주문번호(정정/취소)
+        self.original_order_id = fields[base + _ON_OODER_NO]
+        # 매도매수구분(02 : 매수)
+        self.side = "BUY" if fields[base + _ON_SIDE] == "02" else "SELL"
+        # 정정구분(0 : 정상, 1 : 정정, 2 : 취소)
+        self.rctf_cls = fields[base + _ON_RCTF]
+        self.symbol = fields[base + _ON_SYMBOL]
+        # 체결수량(접수 통보인 경우 주문수량)
+        self.quantity = fields[base + _ON_QTY]
+        # 체결단가(소수점 4자리까지 정수로 전달됨)
+        self.price = _float(fields[base + _ON_PRICE]) / 10000.0
+        # 체결여부(1 : 주문/정정/취소/거부, 2 : 체결)
+        self.filled = fields[base + _ON_CNTG_YN] == "2"
+        self.display_name = fields[base + _ON_ISNM] if len(fields) > base + _ON_ISNM else None
+
+def split_frame(resp: str) -> Tuple[bool, str, int, str]:
+    """
+    프레임 헤더 분리
+
+    Returns:
+        (암호화 여부, tr_id, 레코드 수, 본문)
+    """
+    encrypted, tr_id, count, body = resp.split("|", 3)
+    return encrypted == "1", tr_id, int(count), body
+
+def _records(record_class, body: str, count: int, width: int) -> list:
+    fields = body.split("^")
+    # 레코드 수만큼 필드가 없으면 완전한 레코드만 처리
+    count = min(count, len(fields) // width)
+    return [record_class(fields, i * width) for i in range(count)]
+
+def parse_orderbook(body: str, count: int = 1) -> List[OrderbookRecord]:
+    return _records(OrderbookRecord, body, count, ORDERBOOK_WIDTH)
+
+def parse_trade(body: str, count: int = 1) -> List[TradeRecord]:
+    return _records(TradeRecord, body, count, TRADE_WIDTH)
+
+def parse_order_notice(body: str, count: int = 1) -> List[OrderNoticeRecord]:
+    """
+    복호화된 체결통보 본문 파싱
+    -> 마지막 필드가 빠진 단일 레코드도 허용
+    """
+    fields = body.split("^")
+    if count <= 1 or len(fields) < count * ORDER_NOTICE_WIDTH:
+        if len(fields) <= _ON_CNTG_YN:
+            return []
+        return [OrderNoticeRecord(fields, 0)]
+    return [OrderNoticeRecord(fields, i * ORDER_NOTICE_WIDTH) for i in range(count)]
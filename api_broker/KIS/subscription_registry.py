@@ -0,0 +1,104 @@
+"""
+KIS 실시간 구독 등록 관리(사용자 웹소켓 하나당 하나)
+-> 같은 (tr_id, 종목)을 여러 클라이언트가 구독해도 KIS에는 한 번만 등록(참조 카운트)
+-> 마지막 구독자가 해제되면 등록 해제(최대 41건 제한)
+-> 해외주식 시세(호가/체결가)는 세션에 따라 거래소 코드가 달라지므로(주간거래 : RBAQ, 그 외 : DNAS)
+   코드를 제외한 종목만 저장하고 전송 시 현재 코드를 붙임
+"""
+from typing import Dict, List, Tuple
+import json
+
+# 거래소 코드를 붙이는 실시간 tr_id(호가, 체결가)
+MARKET_CODE_TR_IDS = ("HDFSASP0", "HDFSCNT0")
+
+# tr_type : 1 - 등록, 2 - 해제
+REGISTER = "1"
+UNREGISTER = "2"
+
+def build_tr_key(tr_id: str, key: str, market_code: str) -> str:
+    if tr_id in MARKET_CODE_TR_IDS:
+        return market_code + key
+    return key
+
+def build_message(approval_key: str, tr_type: str, tr_id: str, tr_key: str) -> str:
+    """
+    실시간 등록/해제 요청 메시지
+    """
+    return json.dumps({
+        "header": {
+            "approval_key": approval_key,
+            "custtype": "P",
+            "tr_type": tr_type,
+            "content-type": "utf-8",
+        },
+        "body": {
+            "input": {
+                "tr_id": tr_id,
+                "tr_key": tr_key,
+            }
+        }
+    })
+
+class SubscriptionRegistry:
+    def __init__(self, market_code: str):
+        # (tr_id, 종목) -> 구독자 수
+        self._refs: Dict[Tuple[str, str], int] = {}
+        # 현재 등록에 사용 중인 거래소 코드
+        self.market_code = market_code
+
+    def acquire(self, tr_id: str, key: str) -> bool:
+        """
+        구독자 추가
+
+        Returns:
+            첫 구독자인지 여부(True이면 KIS에 등록 필요)
+        """
+        count = self._refs.get((tr_id, key), 0)
+        self._refs[(tr_id, key)] = count + 1
+        return count == 0
+
+    def release(self, tr_id: str, key: str) -> bool:
+        """
+        구독자 제거
+
+        Returns:
+            마지막 구독자였는지 여부(True이면 KIS에 등록 해제 필요)
+        """
+        count = self._refs.get((tr_id, key), 0)
+        if count <= 1:
+            self._refs.pop((tr_id, key), None)
+            return count == 1
+        self._refs[(tr_id, key)] = count - 1
+        return False
+
+    def tr_key(self, tr_id: str, key: str) -> str:
+        return build_tr_key(tr_id, key, self.market_code)
+
+    def registrations(self) -> List[Tuple[str, str]]:
+        """
+        현재 등록된 (tr_id, tr_key) 목록
+        """
+        return [(tr_id, self.tr_key(tr_id, key)) for tr_id, key in self._refs]
+
+    def switch_market_code(self, approval_key: str, market_code: str) -> List[str]:
+        """
+        거래소 코드 변경(세션 전환)
+
+        Returns:
+            전송할 메시지 목록(기존 코드 해제 후 새 코드 등록, 등록 건수 제한 초과 방지)
+        """
+        if market_code == self.market_code:
+            return []
+
+        keys = [(tr_id, key) for tr_id, key in self._refs if tr_id in MARKET_CODE_TR_IDS]
+        messages = [
+            build_message(approval_key, UNREGISTER, tr_id, build_tr_key(tr_id, key, self.market_code))
+            for tr_id, key in keys
+        ]
+        messages += [
+            build_message(approval_key, REGISTER, tr_id, build_tr_key(tr_id, key, market_code))
+            for tr_id, key in keys
+        ]
+        self.market_code = market_code
+        return messages
+
@@ -25,46 +25,24 @@ def get_key(user_id):
 
         hts_id = ""
         
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "APP",)
-        )
-        token = cursor.fetchone()
-
-        if token != None:
-            app_key = token["token"]
-
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "SEC",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            sec_key = token["token"]
-
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "ACCOUNT_NUMBER_0",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            account_number_0 = token["token"]
-
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "ACCOUNT_NUMBER_1",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            account_number_1 = token["token"]
-
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "HTS_ID",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            hts_id = token["token"]
+        # 브로커의 모든 토큰을 한 번에 조회
+        conn.execute_prepared(cursor, "user_tokens_by_broker", (user_id, "KIS"))
+        tokens = {row["token_name"]: row["token"] for row in cursor.fetchall()}
+
+        if "APP" in tokens:
+            app_key = tokens["APP"]
+
+        if "SEC" in tokens:
+            sec_key = tokens["SEC"]
+
+        if "ACCOUNT_NUMBER_0" in tokens:
+            account_number_0 = tokens["ACCOUNT_NUMBER_0"]
+
+        if "ACCOUNT_NUMBER_1" in tokens:
+            account_number_1 = tokens["ACCOUNT_NUMBER_1"]
+
+        if "HTS_ID" in tokens:
+            hts_id = tokens["HTS_ID"]
 
         conn.close()
 
@@ -102,21 +80,15 @@ def get_access_token(user_id):
         app_key = ""
         sec_key = ""
         
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "APP",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            app_key = token["token"]
-
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "SEC",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            sec_key = token["token"]
+        # 브로커의 모든 토큰을 한 번에 조회
+        conn.execute_prepared(cursor, "user_tokens_by_broker", (user_id, "KIS"))
+        tokens = {row["token_name"]: row["token"] for row in cursor.fetchall()}
+
+        if "APP" in tokens:
+            app_key = tokens["APP"]
+
+        if "SEC" in tokens:
+            sec_key = tokens["SEC"]
 
         conn.close()
 
@@ -22,21 +22,15 @@ def get_ws_token(user_id):
         app_key = ""
         sec_key = ""
         
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "APP",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            app_key = token["token"]
-
-        cursor.execute(
-            "SELECT token FROM user_tokens WHERE user_id = %s and broker_name = 'KIS' and token_name = %s",
-            (user_id, "SEC",)
-        )
-        token = cursor.fetchone()
-        if token != None:
-            sec_key = token["token"]
+        # 브로커의 모든 토큰을 한 번에 조회
+        conn.execute_prepared(cursor, "user_tokens_by_broker", (user_id, "KIS"))
+        tokens = {row["token_name"]: row["token"] for row in cursor.fetchall()}
+
+        if "APP" in tokens:
+            app_key = tokens["APP"]
+
+        if "SEC" in tokens:
+            sec_key = tokens["SEC"]
 
         conn.close()
 
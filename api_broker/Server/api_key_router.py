@@ -24,7 +24,7 @@ class UpdateAPIKeyRequest(BaseModel):
     apikey: str
 
 @router.get("/list", response_model=List[APIKeyListResponse])
-async def list_apikeys(current_user: Dict[str, Any] = Depends(get_current_user)):
+def list_apikeys(current_user: Dict[str, Any] = Depends(get_current_user)):
     user_id = current_user["user_id"]
     
     try:
@@ -81,7 +81,7 @@ async def list_apikeys(current_user: Dict[str, Any] = Depends(get_current_user))
 
 
 @router.post("/add")
-async def add_apikey(
+def add_apikey(
     request: AddAPIKeyRequest,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
@@ -114,7 +114,7 @@ async def add_apikey(
 
 
 @router.put("/update/{broker_name}/{apikey_name}")
-async def update_apikey(
+def update_apikey(
     broker_name: str,
     apikey_name: str,
     request: UpdateAPIKeyRequest,
@@ -150,7 +150,7 @@ async def update_apikey(
 
 
 @router.delete("/delete/{broker_name}/{apikey_name}")
-async def delete_apikey(
+def delete_apikey(
     broker_name: str,
     apikey_name: str,
     current_user: Dict[str, Any] = Depends(get_current_user)
@@ -1,7 +1,8 @@
-from .session_manager import SecureSessionManager, ACCESS_TOKEN_EXPIRE_MINUTES
-from .auth_dependency import get_current_user
+from .session_manager import ACCESS_TOKEN_EXPIRE_MINUTES
+from .auth_dependency import get_current_user, session_manager
 from ..Common.RedisManager import redis_manager
 from ..Common.DBManager import get_db_conn
+from ..Common.AsyncRunner import run_blocking
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from pydantic import BaseModel
 from typing import Optional, List, Any
@@ -34,9 +35,6 @@ RP_ID = "localhost"
 RP_NAME = "Trade Everything"
 RP_ORIGIN = "http://localhost:5173"
 
-# 세션 관리자 인스턴스
-session_manager = SecureSessionManager(redis_manager.redis_client)
-
 # Challenge 관리 클래스
 class ChallengeManager:
     def __init__(self, redis_client):
@@ -142,7 +140,7 @@ class UserResponse(BaseModel):
 # ==================== Passkey 엔드포인트 ====================
 
 @router.post("/passkey/register/begin")
-async def passkey_register_begin(req: PasskeyRegisterBeginRequest):
+def passkey_register_begin(req: PasskeyRegisterBeginRequest):
     """
     Passkey 등록 시작
     
@@ -205,7 +203,7 @@ async def passkey_register_begin(req: PasskeyRegisterBeginRequest):
 
 
 @router.post("/passkey/register/complete")
-async def passkey_register_complete(req: PasskeyRegisterCompleteRequest):
+def passkey_register_complete(req: PasskeyRegisterCompleteRequest):
     """
     Passkey 등록 완료
     
@@ -292,7 +290,7 @@ async def passkey_register_complete(req: PasskeyRegisterCompleteRequest):
 
 
 @router.post("/passkey/login/begin")
-async def passkey_login_begin(req: PasskeyLoginBeginRequest):
+def passkey_login_begin(req: PasskeyLoginBeginRequest):
     """
     Passkey 로그인 시작
     
@@ -392,6 +390,24 @@ async def passkey_login_complete(request: Request):
     try:
         # JSON 본문을 수동으로 파싱 (Pydantic의 자동 파싱 우회)
         body = await request.json()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{type(e).__name__}: {str(e)}"
+        )
+    
+    client_ip = request.client.host if request.client else "unknown"
+    user_agent = request.headers.get("user-agent", "")
+    
+    # DB/Redis/WebAuthn 검증은 블로킹 호출이므로 스레드 풀에서 실행
+    return await run_blocking(_passkey_login_complete, body, client_ip, user_agent)
+
+
+def _passkey_login_complete(body: dict, client_ip: str, user_agent: str) -> TokenResponse:
+    """
+    Passkey 로그인 완료 처리 (동기)
+    """
+    try:
         username = body.get('username')
         assertion_response = body.get('assertionResponse')
         
@@ -425,10 +441,7 @@ async def passkey_login_complete(request: Request):
             cursor = conn.cursor()
             
             # 사용자 조회
-            cursor.execute(
-                "SELECT user_id FROM users WHERE username = %s",
-                (username,)
-            )
+            conn.execute_prepared(cursor, "passkey_user_by_username", (username,))
             user = cursor.fetchone()
             
             if not user:
@@ -471,14 +484,7 @@ async def passkey_login_complete(request: Request):
                     detail=f"Invalid credential ID format: {str(e)}"
                 )
 
-            cursor.execute(
-                """
-                SELECT credential_id, public_key, sign_count
-                FROM passkey_credentials
-                WHERE user_id = %s AND credential_id = %s
-                """,
-                (user_id, credential_id)
-            )
+            conn.execute_prepared(cursor, "passkey_credential", (user_id, credential_id))
             credential = cursor.fetchone()
             
             if not credential:
@@ -532,9 +538,6 @@ async def passkey_login_complete(request: Request):
             refresh_token = session_manager.create_refresh_token(token_data)
             
             # 세션 저장
-            client_ip = request.client.host if request.client else "unknown"
-            user_agent = request.headers.get("user-agent", "")
-            
             session_manager.save_session(
                 user_id=user_id,
                 token=access_token,
@@ -572,7 +575,7 @@ async def passkey_login_complete(request: Request):
 
 
 @router.post("/passkey/add/begin")
-async def passkey_add_begin(req: PasskeyRegisterBeginRequest, current_user: dict = Depends(get_current_user)):
+def passkey_add_begin(req: PasskeyRegisterBeginRequest, current_user: dict = Depends(get_current_user)):
     """
     기존 사용자에게 추가 Passkey 등록 시작 (인증 필요)
     
@@ -657,7 +660,7 @@ async def passkey_add_begin(req: PasskeyRegisterBeginRequest, current_user: dict
 
 
 @router.post("/passkey/add/complete")
-async def passkey_add_complete(req: PasskeyRegisterCompleteRequest, current_user: dict = Depends(get_current_user)):
+def passkey_add_complete(req: PasskeyRegisterCompleteRequest, current_user: dict = Depends(get_current_user)):
     """
     추가 Passkey 등록 완료 (인증 필요)
     
@@ -761,7 +764,7 @@ async def passkey_add_complete(req: PasskeyRegisterCompleteRequest, current_user
 
 
 @router.get("/passkey/list")
-async def passkey_list(current_user: dict = Depends(get_current_user)):
+def passkey_list(current_user: dict = Depends(get_current_user)):
     """
     현재 사용자의 등록된 Passkey 목록 조회
     
@@ -814,7 +817,7 @@ async def passkey_list(current_user: dict = Depends(get_current_user)):
 
 
 @router.delete("/passkey/remove/{credential_id}")
-async def passkey_remove(credential_id: str, current_user: dict = Depends(get_current_user)):
+def passkey_remove(credential_id: str, current_user: dict = Depends(get_current_user)):
     """
     Passkey 삭제
     
@@ -885,7 +888,7 @@ async def passkey_remove(credential_id: str, current_user: dict = Depends(get_cu
 
 
 @router.post("/logout")
-async def logout(current_user: dict = Depends(get_current_user)):
+def logout(current_user: dict = Depends(get_current_user)):
     """
     로그아웃 (현재 세션만)
     
@@ -912,7 +915,7 @@ async def logout(current_user: dict = Depends(get_current_user)):
 
 
 @router.post("/logout-all")
-async def logout_all_devices(current_user: dict = Depends(get_current_user)):
+def logout_all_devices(current_user: dict = Depends(get_current_user)):
     """
     모든 디바이스에서 로그아웃
     
@@ -934,7 +937,7 @@ async def logout_all_devices(current_user: dict = Depends(get_current_user)):
 
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(request: Request, refresh_data: RefreshRequest):
+def refresh_token(request: Request, refresh_data: RefreshRequest):
     """
     Access Token 갱신
     
@@ -1000,7 +1003,7 @@ async def get_me(current_user: dict = Depends(get_current_user)):
 
 
 @router.get("/sessions", response_model=List[SessionInfo])
-async def get_active_sessions(current_user: dict = Depends(get_current_user)):
+def get_active_sessions(current_user: dict = Depends(get_current_user)):
     """
     현재 사용자의 활성 세션 목록
     
@@ -2,15 +2,25 @@ from ..BrokerCommon.BrokerFactory import BrokerFactory
 from ..Common.TokenManager import TokenManager
 from .auth_dependency import get_current_user, get_user_from_token
 from ..Common.Debug import *
+from ..Common.AsyncRunner import configure_thread_pool
 import uvicorn
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from typing import List
 import asyncio
+import os
+from contextlib import asynccontextmanager
 from pprint import pprint
 
 #from ..Binance.BinanceBroker import *
 #from ..KIS.KISBroker import *
 from ..KIS.token_manager import get_key
+from ..Binance.ws_api import close_all_sessions, get_order_latency_stats
+from ..Binance.symbol_rules import refresh_rules_loop
+from ..BrokerCommon.SymbolCatalog import symbol_catalog
+from ..KIS.market_calendar import market_calendar
+from ..Common.Metrics import REGISTRY, Gauge, current_tick, record_send
+from time import perf_counter
 
 # 라우터 import
 from .auth import router as auth_router
@@ -20,7 +30,35 @@ from .api_key_router import router as api_key_router
 SERVER_NAME = "Trade Everything API Broker Server"
 SERVER_PORT = 8001
 
-app = FastAPI(title=SERVER_NAME)
+# /assets 조회 시 브로커별 제한 시간(초)
+ASSETS_BROKER_TIMEOUT_SECONDS = float(os.environ.get("ASSETS_BROKER_TIMEOUT_SECONDS", "5"))
+# /place_orders 한 번에 전송할 수 있는 최대 주문 수
+MAX_BATCH_ORDERS = int(os.environ.get("MAX_BATCH_ORDERS", "20"))
+
+# 웹소켓 엔드포인트별 연결 수
+WS_CONNECTIONS = {
+    endpoint: Gauge("ws_connections", {"endpoint": endpoint})
+    for endpoint in ("order_update", "userdata", "orderbook", "trade")
+}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 동기(def) 엔드포인트/의존성 및 run_blocking이 공유하는 스레드 풀 크기 설정
+    configure_thread_pool()
+    # Binance 주문 규칙(exchangeInfo 필터) 누락/만료 시 재조회(주기 갱신은 심볼 목록 갱신에서 처리)
+    rules_task = asyncio.create_task(refresh_rules_loop())
+    # 브로커별 심볼 목록 주기적 갱신
+    catalog_task = asyncio.create_task(symbol_catalog.refresh_loop())
+    # KIS 거래 세션 변경 감시
+    session_task = asyncio.create_task(market_calendar.run())
+    yield
+    rules_task.cancel()
+    catalog_task.cancel()
+    session_task.cancel()
+    # Binance WebSocket API 주문 세션 종료
+    await close_all_sessions()
+
+app = FastAPI(title=SERVER_NAME, lifespan=lifespan)
 
 # CORS 설정 - 모든 오리진 허용
 app.add_middleware(
@@ -36,6 +74,23 @@ app.include_router(auth_router)
 app.include_router(user_settings_router)
 app.include_router(api_key_router)
 
+def filter_symbol(data, symbol: str):
+    """
+    구독 심볼의 데이터만 선택
+    -> 브로커가 여러 레코드를 리스트로 묶어 전달하는 경우(KIS) 리스트로 전송
+    -> 브로커 재연결 알림({"type": "gap"})은 그대로 전송
+
+    Returns:
+        전송할 데이터 또는 해당 심볼의 데이터가 없는 경우 None
+    """
+    symbol = symbol.lower()
+    if isinstance(data, dict) and data.get("type") == "gap":
+        return data
+    if isinstance(data, list):
+        items = [item for item in data if item["symbol"].lower() == symbol]
+        return items if items else None
+    return data if data["symbol"].lower() == symbol else None
+
 @app.websocket("/ws/order_update/{broker_name}")
 async def websocket_order_update(ws: WebSocket, broker_name: str):
     """
@@ -43,6 +98,7 @@ async def websocket_order_update(ws: WebSocket, broker_name: str):
     -> 주문 접수/체결/취소 등
     """
     await ws.accept()
+    WS_CONNECTIONS["order_update"].inc()
     
     broker = None
     subscription_task = None
@@ -91,10 +147,14 @@ async def websocket_order_update(ws: WebSocket, broker_name: str):
             if not is_connected:
                 raise asyncio.CancelledError("Client disconnected")
             try:
-                await ws.send_json({
-                    "type": "userdata",
-                    "data": data
-                })
+                # 브로커 재연결 알림({"type": "gap"})은 그대로 전송
+                if data.get("type") == "gap":
+                    await ws.send_json(data)
+                else:
+                    await ws.send_json({
+                        "type": "userdata",
+                        "data": data
+                    })
             except WebSocketDisconnect:
                 is_connected = False
                 raise asyncio.CancelledError("Client disconnected")
@@ -136,6 +196,7 @@ async def websocket_order_update(ws: WebSocket, broker_name: str):
             pass
     finally:
         is_connected = False
+        WS_CONNECTIONS["order_update"].dec()
         if subscription_task and not subscription_task.done():
             subscription_task.cancel()
             try:
@@ -157,11 +218,25 @@ def get_brokers():
         "brokers": BrokerFactory.get_available_brokers()
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus 텍스트 형식
+    # -> 단계별 지연 지표는 이벤트 루프에서만 기록되므로 async로 조회
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats/order_latency")
+def get_order_latency(current_user: dict = Depends(get_current_user)):
+    # Binance 주문 경로별(WebSocket API, REST) 왕복 시간 히스토그램
+    return {
+        "message": "success",
+        "Binance": get_order_latency_stats(),
+    }
+
 @app.post("/place_order/{broker_name}")
 async def place_order(broker_name: str, order: dict, current_user: dict = Depends(get_current_user)):
     try:
         broker = BrokerFactory.create_broker(broker_name, current_user["user_id"])
-        result = broker.place_order(order)
+        result = await broker.place_order_async(order)
 
         if result["result"] == "success":
             return {
@@ -179,11 +254,50 @@ async def place_order(broker_name: str, order: dict, current_user: dict = Depend
             "message": str(e)
         }
     
+@app.post("/place_orders/{broker_name}")
+async def place_orders(broker_name: str, orders: List[dict], current_user: dict = Depends(get_current_user)):
+    try:
+        if len(orders) == 0 or len(orders) > MAX_BATCH_ORDERS:
+            return {
+                "result": "error",
+                "message": f"Number of orders must be between 1 and {MAX_BATCH_ORDERS}",
+            }
+
+        broker = BrokerFactory.create_broker(broker_name, current_user["user_id"])
+
+        # 하나라도 잘못된 주문이 있으면 전송하지 않음
+        errors = []
+        for index, order in enumerate(orders):
+            message = broker.validate_order(order)
+            if message:
+                errors.append({"index": index, "message": message})
+
+        if errors:
+            return {
+                "result": "error",
+                "message": "Invalid orders",
+                "errors": errors,
+            }
+
+        # 요청 순서대로 주문별 결과 반환
+        results = await broker.place_orders_async(orders)
+
+        return {
+            "result": "success" if all(r.get("result") == "success" for r in results) else "error",
+            "broker": broker_name,
+            "orders": results,
+        }
+    except Exception as e:
+        return {
+            "result": "error",
+            "message": str(e)
+        }
+
 @app.post("/cancel_order/{broker_name}")
 async def cancel_order(broker_name: str, order: dict, current_user: dict = Depends(get_current_user)):
     try:
         broker = BrokerFactory.create_broker(broker_name, current_user["user_id"])
-        result = broker.cancel_order(order)
+        result = await broker.cancel_order_async(order)
 
         if result["result"] == "success":
             return {
@@ -206,7 +320,7 @@ async def cancel_order(broker_name: str, order: dict, current_user: dict = Depen
 async def cancel_all_orders(broker_name: str, current_user: dict = Depends(get_current_user)):
     try:
         broker = BrokerFactory.create_broker(broker_name, current_user["user_id"])
-        result = broker.cancel_all_orders()
+        result = await broker.cancel_all_orders_async()
 
         if result["result"] == "success":
             return {
@@ -218,6 +332,8 @@ async def cancel_all_orders(broker_name: str, current_user: dict = Depends(get_c
             return {
                 "message": "error",
                 "error": result["message"],
+                # 주문별 취소 결과
+                "result": result,
             }
     except Exception as e:
         return {
@@ -229,7 +345,7 @@ async def cancel_all_orders(broker_name: str, current_user: dict = Depends(get_c
 async def get_orders(broker_name: str, current_user: dict = Depends(get_current_user)):
     try:
         broker = BrokerFactory.create_broker(broker_name, current_user["user_id"])
-        orders = broker.get_orders()
+        orders = await broker.get_orders_async()
         # Info("") ; print(orders)
         return {
             "message": "success",
@@ -248,6 +364,7 @@ async def websocket_userdata(
     broker_name: str,
 ):
     await ws.accept()
+    WS_CONNECTIONS["userdata"].inc()
     
     broker = None
     subscription_task = None
@@ -342,6 +459,7 @@ async def websocket_userdata(
             pass
     finally:
         is_connected = False
+        WS_CONNECTIONS["userdata"].dec()
         if subscription_task and not subscription_task.done():
             subscription_task.cancel()
             try:
@@ -351,22 +469,46 @@ async def websocket_userdata(
         print(f"Userdata closed: {broker_name}")
 
 @app.get("/assets")
-def get_assets(current_user: dict = Depends(get_current_user)):
+async def get_assets(current_user: dict = Depends(get_current_user)):
     """
     통합 자산 조회
+    -> 모든 브로커를 동시에 조회하고, 브로커별 제한 시간을 넘기면 해당 브로커만 제외
     """
+    async def get_broker_assets(broker_name: str):
+        broker = BrokerFactory.create_broker(broker_name, current_user["user_id"])
+        return await asyncio.wait_for(
+            broker.get_assets_async(),
+            timeout=ASSETS_BROKER_TIMEOUT_SECONDS
+        )
+
     try:
+        broker_names = BrokerFactory.get_available_brokers()
+        results = await asyncio.gather(
+            *[get_broker_assets(broker_name) for broker_name in broker_names],
+            return_exceptions=True
+        )
+
         total_assets = []
-        for broker_name in BrokerFactory.get_available_brokers():
-            broker = BrokerFactory.create_broker(broker_name, current_user["user_id"])
-            broker_assets = broker.get_assets()
-            for asset in broker_assets:
+        broker_status = []
+        for broker_name, result in zip(broker_names, results):
+            if isinstance(result, asyncio.TimeoutError):
+                Error(f"Assets timeout: {broker_name}")
+                broker_status.append({"broker": broker_name, "status": "timeout"})
+                continue
+            if isinstance(result, Exception):
+                Error(f"Assets error: {broker_name} / {result}")
+                broker_status.append({"broker": broker_name, "status": "error", "error": str(result)})
+                continue
+
+            for asset in result:
                 asset["broker"] = broker_name
                 total_assets.append(asset)
-            #total_assets.extend(broker_assets)
+            broker_status.append({"broker": broker_name, "status": "success"})
+
         return {
             "message": "success",
-            "assets": total_assets
+            "assets": total_assets,
+            "brokers": broker_status,
         }
     except Exception as e:
         return {
@@ -375,15 +517,38 @@ def get_assets(current_user: dict = Depends(get_current_user)):
         }
 
 @app.get("/symbols/{broker_name}")
-def get_symbols(broker_name: str):
-    """브로커의 거래 가능한 심볼 목록 조회"""
+def get_symbols(broker_name: str, if_none_match: str = Header(None)):
+    """브로커의 거래 가능한 심볼 목록 조회(캐시된 응답, ETag 지원)"""
+    try:
+        entry = symbol_catalog.get(broker_name)
+        if entry is None:
+            return {
+                "message": "error",
+                "error": "Symbol list is not available",
+            }
+
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": "no-cache",
+        }
+        if if_none_match == entry.etag:
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+    except Exception as e:
+        return {
+            "message": "error",
+            "error": str(e)
+        }
+
+@app.get("/symbols/{broker_name}/search")
+def search_symbols(broker_name: str, q: str = "", limit: int = 20):
+    """심볼/표시 이름 검색(접두어 우선)"""
     try:
-        broker = BrokerFactory.create_broker(broker_name)
-        symbols = broker.get_symbols()
         return {
             "message": "success",
             "broker": broker_name,
-            "symbols": symbols
+            "symbols": symbol_catalog.search(broker_name, q, limit),
         }
     except Exception as e:
         return {
@@ -419,6 +584,7 @@ async def websocket_orderbook(ws: WebSocket, broker_name: str, symbol: str):
     호가 데이터 구독
     """
     await ws.accept()
+    WS_CONNECTIONS["orderbook"].inc()
     Info(f"[ {broker_name}/{symbol} ]")
     
     broker = None
@@ -470,8 +636,17 @@ async def websocket_orderbook(ws: WebSocket, broker_name: str, symbol: str):
             if not is_connected:
                 raise asyncio.CancelledError("Client disconnected")
             try:
-                if data["symbol"].lower() == symbol.lower():
-                    await ws.send_json(data)
+                payload = filter_symbol(data, symbol)
+                if payload is not None:
+                    # 단계별 지연 기록(브로커 수신 루프에서 호출된 경우)
+                    tick = current_tick()
+                    send_start = perf_counter()
+                    try:
+                        await ws.send_json(payload)
+                    except Exception:
+                        record_send(tick, send_start, sent=False)
+                        raise
+                    record_send(tick, send_start)
                     
             except WebSocketDisconnect:
                 is_connected = False
@@ -514,6 +689,7 @@ async def websocket_orderbook(ws: WebSocket, broker_name: str, symbol: str):
             pass
     finally:
         is_connected = False
+        WS_CONNECTIONS["orderbook"].dec()
         if subscription_task and not subscription_task.done():
             subscription_task.cancel()
             try:
@@ -529,6 +705,7 @@ async def websocket_trade(ws: WebSocket, broker_name: str, symbol: str):
     실시간 체결 데이터 구독
     """
     await ws.accept()
+    WS_CONNECTIONS["trade"].inc()
     
     broker = None
     subscription_task = None
@@ -579,8 +756,17 @@ async def websocket_trade(ws: WebSocket, broker_name: str, symbol: str):
             if not is_connected:
                 raise asyncio.CancelledError("Client disconnected")
             try:
-                if data["symbol"].lower() == symbol.lower():
-                    await ws.send_json(data)
+                payload = filter_symbol(data, symbol)
+                if payload is not None:
+                    # 단계별 지연 기록(브로커 수신 루프에서 호출된 경우)
+                    tick = current_tick()
+                    send_start = perf_counter()
+                    try:
+                        await ws.send_json(payload)
+                    except Exception:
+                        record_send(tick, send_start, sent=False)
+                        raise
+                    record_send(tick, send_start)
             except WebSocketDisconnect:
                 is_connected = False
                 raise asyncio.CancelledError("Client disconnected")
@@ -622,6 +808,7 @@ async def websocket_trade(ws: WebSocket, broker_name: str, symbol: str):
             pass
     finally:
         is_connected = False
+        WS_CONNECTIONS["trade"].dec()
         if subscription_task and not subscription_task.done():
             subscription_task.cancel()
             try:
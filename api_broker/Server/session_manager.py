@@ -7,12 +7,16 @@ from typing import Optional, Dict, Any
 import secrets
 import hashlib
 import json
+import threading
+import time
+import os
 from jose import JWTError, jwt
 
 # JWT 설정
 
 # 테스트 환경이므로 랜덤 값 사용
-SECRET_KEY = secrets.token_urlsafe(32)
+# -> JWT_SECRET_KEY가 설정된 경우 해당 값 사용(벤치마크 등 외부 프로세스에서 토큰 발급 시)
+SECRET_KEY = os.environ.get("JWT_SECRET_KEY") or secrets.token_urlsafe(32)
 ALGORITHM = "HS256"
 
 # Access 토큰 만료 시간(분 단위) 지정
@@ -20,9 +24,32 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 15
 # Refresh 토큰 만료 시간(일 단위) 지정
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# 세션 갱신 임계값(초 단위)
+# -> 남은 TTL이 임계값보다 클 때는 EXPIRE를 보내지 않음
+SESSION_REFRESH_THRESHOLD_SECONDS = 60 * 10
+# 대기중인 세션 갱신을 Redis에 반영하는 주기(초 단위)
+SESSION_REFRESH_FLUSH_INTERVAL_SECONDS = 1.0
+
+# [ Redis 키 ]
+# 세션 데이터(jti 기준)
+SESSION_KEY = "session:{jti}"
+# 사용자별 활성 세션 인덱스(Sorted Set, member : jti, score : 만료 시각)
+USER_SESSION_INDEX_KEY = "user_session_index:{user_id}"
+# 사용자별 세션 무효화 기준 시각(epoch 초)
+# -> 이 시각 이전에 발급된 모든 토큰은 무효
+USER_REVOKED_AT_KEY = "user_revoked_at:{user_id}"
+
 class SecureSessionManager:
     def __init__(self, redis_client):
         self.redis_client = redis_client
+
+        # 세션(jti)별 만료 예상 시각(epoch 초)
+        # -> Redis TTL을 매번 조회하지 않기 위한 로컬 캐시
+        self._session_expire_at: Dict[str, float] = {}
+        # Redis에 반영 대기중인 세션 갱신 목록(jti -> user_id)
+        self._pending_refresh: Dict[str, Any] = {}
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
     
     def create_access_token(self, data: Dict[str, Any]) -> str:
         """
@@ -39,6 +66,8 @@ class SecureSessionManager:
             "jti": secrets.token_urlsafe(16),  # JWT ID (고유 식별자)
             "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
             "iat": datetime.utcnow(),
+            # 모든 디바이스 로그아웃 시각과 비교할 발급 시각(ms, iat는 초 단위)
+            "iat_ms": int(time.time() * 1000),
             "type": "access"
         }
         
@@ -63,34 +92,61 @@ class SecureSessionManager:
             "jti": secrets.token_urlsafe(16),
             "exp": datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
             "iat": datetime.utcnow(),
+            "iat_ms": int(time.time() * 1000),
             "type": "refresh"
         }
         return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     
     def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
         """
-        JWT 검증 + 블랙리스트 확인
+        JWT 검증 + 블랙리스트 + 사용자 세션 무효화 시각 확인
         
         Args:
             token: 검증할 JWT 토큰
         
         Returns:
             토큰 payload 또는 None
-        
-        Raises:
-            JWTError: 토큰 검증 실패 시
         """
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            
-            # 블랙리스트 확인 (로그아웃된 토큰)
-            if self.is_token_blacklisted(payload.get("jti")):
-                return None
-            
-            return payload
         except JWTError:
             return None
+        
+        # 블랙리스트(로그아웃된 토큰)와 무효화 시각을 한 번의 왕복으로 조회
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.exists(f"blacklist:{payload.get('jti')}")
+        pipe.get(USER_REVOKED_AT_KEY.format(user_id=payload.get("user_id")))
+        is_blacklisted, revoked_at = pipe.execute()
+        
+        if is_blacklisted:
+            return None
+        
+        # 모든 디바이스 로그아웃 이전에 발급된 토큰(ms 단위로 비교)
+        # -> 같은 초라도 무효화 이후에 발급된 토큰(직후 재로그인 등)은 허용
+        if revoked_at is not None and self._issued_at_ms(payload) <= self._revoked_at_ms(revoked_at):
+            return None
+        
+        return payload
     
+    @staticmethod
+    def _issued_at_ms(payload: Dict[str, Any]) -> int:
+        """
+        토큰 발급 시각(ms)
+        -> iat_ms 클레임이 없는 이전 토큰은 iat(초)로 계산
+        """
+        if "iat_ms" in payload:
+            return int(payload["iat_ms"])
+        return int(payload.get("iat", 0)) * 1000
+
+    @staticmethod
+    def _revoked_at_ms(revoked_at) -> int:
+        """
+        모든 디바이스 로그아웃 시각(ms)
+        -> 이전에 초 단위로 저장된 값은 ms로 변환
+        """
+        value = int(revoked_at)
+        return value * 1000 if value < 10 ** 12 else value
+
     def blacklist_token(self, jti: str, exp: datetime) -> None:
         """
         토큰을 블랙리스트에 등록 (강제 무효화)
@@ -116,6 +172,16 @@ class SecureSessionManager:
         """
         return self.redis_client.exists(f"blacklist:{jti}") > 0
     
+    def _get_jti(self, token: str) -> Optional[str]:
+        """
+        토큰에서 jti 추출 (서명 검증 없음)
+        -> verify_token을 통과한 토큰에만 사용할 것
+        """
+        try:
+            return jwt.get_unverified_claims(token).get("jti")
+        except JWTError:
+            return None
+    
     def save_session(
         self,
         user_id: int,
@@ -134,6 +200,8 @@ class SecureSessionManager:
             user_agent: User-Agent 헤더
             metadata: 추가 메타데이터
         """
+        jti = self._get_jti(token)
+        
         # 디바이스 핑거프린트 생성
         fingerprint = hashlib.sha256(
             f"{ip}:{user_agent}".encode()
@@ -150,16 +218,26 @@ class SecureSessionManager:
         if metadata:
             session_data.update(metadata)
         
+        now = time.time()
+        expire_at = now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        index_key = USER_SESSION_INDEX_KEY.format(user_id=user_id)
+        
+        pipe = self.redis_client.pipeline(transaction=False)
         # Redis에 세션 저장
-        session_key = f"session:{token}"
-        self.redis_client.set(
-            name=session_key,
+        pipe.set(
+            name=SESSION_KEY.format(jti=jti),
             value=json.dumps(session_data),
             ex=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         )
-        
-        # 사용자별 활성 세션 추적
-        self.redis_client.sadd(f"user_sessions:{user_id}", token)
+        # 사용자별 활성 세션 인덱스 갱신 + 만료된 세션 정리
+        pipe.zadd(index_key, {jti: expire_at})
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        # 인덱스 자체도 마지막 세션과 함께 만료
+        pipe.expire(index_key, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+        pipe.execute()
+        
+        with self._refresh_lock:
+            self._session_expire_at[jti] = expire_at
         print(f"✅ Session saved: user_id={user_id}, ip={ip}")
     
     def get_session(self, token: str) -> Optional[Dict[str, Any]]:
@@ -172,8 +250,11 @@ class SecureSessionManager:
         Returns:
             세션 데이터 또는 None
         """
-        session_key = f"session:{token}"
-        session_data = self.redis_client.get(name=session_key)
+        jti = self._get_jti(token)
+        if not jti:
+            return None
+        
+        session_data = self.redis_client.get(name=SESSION_KEY.format(jti=jti))
         
         if session_data:
             return json.loads(session_data)
@@ -211,14 +292,92 @@ class SecureSessionManager:
         """
         세션 만료 시간 갱신 (슬라이딩 윈도우)
         
+        남은 TTL이 임계값 이하인 경우에만 갱신을 예약하고,
+        예약된 갱신은 백그라운드 스레드에서 파이프라인으로 일괄 반영
+        
         Args:
             token: Access Token
         """
-        session_key = f"session:{token}"
-        self.redis_client.expire(
-            name=session_key,
-            time=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        )
+        try:
+            claims = jwt.get_unverified_claims(token)
+        except JWTError:
+            return
+        jti = claims.get("jti")
+        
+        now = time.time()
+        with self._refresh_lock:
+            expire_at = self._session_expire_at.get(jti)
+            if expire_at is not None and expire_at - now > SESSION_REFRESH_THRESHOLD_SECONDS:
+                return
+            
+            # 갱신 예약 후 만료 예상 시각을 미리 반영(중복 예약 방지)
+            self._session_expire_at[jti] = now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+            self._pending_refresh[jti] = claims.get("user_id")
+            
+            if self._refresh_thread is None:
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_flush_loop,
+                    name="session-refresh-flusher",
+                    daemon=True
+                )
+                self._refresh_thread.start()
+    
+    def flush_pending_refreshes(self) -> int:
+        """
+        예약된 세션 갱신을 Redis 파이프라인으로 일괄 반영
+        
+        Returns:
+            반영된 세션 개수
+        """
+        with self._refresh_lock:
+            pending = self._pending_refresh
+            self._pending_refresh = {}
+            
+            # 만료된 로컬 캐시 정리
+            now = time.time()
+            expired = [jti for jti, expire_at in self._session_expire_at.items() if expire_at <= now]
+            for jti in expired:
+                del self._session_expire_at[jti]
+        
+        if not pending:
+            return 0
+        
+        expire_at = time.time() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        pipe = self.redis_client.pipeline(transaction=False)
+        for jti, user_id in pending.items():
+            index_key = USER_SESSION_INDEX_KEY.format(user_id=user_id)
+            pipe.expire(
+                name=SESSION_KEY.format(jti=jti),
+                time=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            )
+            # 인덱스에 남아있는 세션만 점수 갱신(무효화된 세션은 다시 추가하지 않음)
+            pipe.zadd(index_key, {jti: expire_at}, xx=True)
+            pipe.expire(index_key, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+        try:
+            pipe.execute()
+        except Exception:
+            # 반영 실패 시 다음 flush에서 다시 시도(그 사이 새로 예약된 항목은 유지)
+            with self._refresh_lock:
+                for jti, user_id in pending.items():
+                    self._pending_refresh.setdefault(jti, user_id)
+            raise
+        return len(pending)
+    
+    def _refresh_flush_loop(self) -> None:
+        """세션 갱신 flusher 루프 (백그라운드 스레드)"""
+        while True:
+            time.sleep(SESSION_REFRESH_FLUSH_INTERVAL_SECONDS)
+            try:
+                self.flush_pending_refreshes()
+            except Exception as e:
+                print(f"❌ Session refresh flush error: {e}")
+    
+    def _forget_local_sessions(self, jtis) -> None:
+        """로컬 갱신 캐시에서 세션 제거"""
+        with self._refresh_lock:
+            for jti in jtis:
+                self._pending_refresh.pop(jti, None)
+                self._session_expire_at.pop(jti, None)
     
     def delete_session(self, token: str, user_id: int) -> None:
         """
@@ -228,11 +387,15 @@ class SecureSessionManager:
             token: Access Token
             user_id: 사용자 ID
         """
-        session_key = f"session:{token}"
-        self.redis_client.delete(name=session_key)
+        jti = self._get_jti(token)
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.delete(SESSION_KEY.format(jti=jti))
+        # 사용자 세션 인덱스에서 제거
+        pipe.zrem(USER_SESSION_INDEX_KEY.format(user_id=user_id), jti)
+        pipe.execute()
         
-        # 사용자 세션 목록에서 제거
-        self.redis_client.srem(f"user_sessions:{user_id}", token)
+        self._forget_local_sessions([jti])
 
         print(f"🔌 Session deleted: user_id={user_id}")
     
@@ -240,34 +403,34 @@ class SecureSessionManager:
         """
         사용자의 모든 세션 강제 무효화
         
+        무효화 기준 시각을 기록하면 verify_token에서 그 이전에 발급된
+        모든 토큰(Refresh 토큰 포함)을 거부하므로 토큰별 블랙리스트 등록이 필요 없음
+        
         Args:
             user_id: 사용자 ID
         
         Returns:
             무효화된 세션 개수
         """
-        sessions_key = f"user_sessions:{user_id}"
-        tokens = self.redis_client.smembers(sessions_key)
-        
-        count = 0
-        for token in tokens:
-            # 토큰 디코딩하여 jti 추출
-            try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                self.blacklist_token(
-                    payload["jti"],
-                    datetime.fromtimestamp(payload["exp"])
-                )
-                count += 1
-            except JWTError:
-                pass
-            
-            # 세션 삭제
-            self.redis_client.delete(f"session:{token}")
+        now = time.time()
+        index_key = USER_SESSION_INDEX_KEY.format(user_id=user_id)
+        
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.set(
+            name=USER_REVOKED_AT_KEY.format(user_id=user_id),
+            value=int(now * 1000),
+            ex=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+        pipe.zrangebyscore(index_key, now, "+inf")
+        pipe.delete(index_key)
+        _, jtis, _ = pipe.execute()
         
-        # 세션 리스트 삭제
-        self.redis_client.delete(sessions_key)
+        # 세션 데이터 삭제
+        if jtis:
+            self.redis_client.delete(*[SESSION_KEY.format(jti=jti) for jti in jtis])
+        self._forget_local_sessions(jtis)
         
+        count = len(jtis)
         print(f"🚫 All sessions revoked for user_id={user_id} (count={count})")
         return count
     
@@ -281,13 +444,30 @@ class SecureSessionManager:
         Returns:
             활성 세션 리스트
         """
-        sessions_key = f"user_sessions:{user_id}"
-        tokens = self.redis_client.smembers(sessions_key)
+        now = time.time()
+        index_key = USER_SESSION_INDEX_KEY.format(user_id=user_id)
+        
+        # 만료된 세션 정리 + 활성 세션 조회
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        pipe.zrange(index_key, 0, -1)
+        _, jtis = pipe.execute()
+        
+        if not jtis:
+            return []
+        
+        values = self.redis_client.mget([SESSION_KEY.format(jti=jti) for jti in jtis])
         
         sessions = []
-        for token in tokens:
-            session_data = self.get_session(token)
+        stale_jtis = []
+        for jti, session_data in zip(jtis, values):
             if session_data:
-                sessions.append(session_data)
+                sessions.append(json.loads(session_data))
+            else:
+                stale_jtis.append(jti)
+        
+        # 세션 데이터가 먼저 삭제된 항목은 인덱스에서도 정리
+        if stale_jtis:
+            self.redis_client.zrem(index_key, *stale_jtis)
         
-        return sessions
\ No newline at end of file
+        return sessions
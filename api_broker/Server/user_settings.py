@@ -1,67 +1,52 @@
 from ..Common.DBManager import get_db_conn
+from ..Common.RedisManager import redis_manager
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import json
 from typing import List, Dict, Optional
-from datetime import datetime
+
+# 사용자별 즐겨찾기 목록 캐시
+FAVORITES_CACHE_KEY = "favorites:{user_id}"
+FAVORITES_CACHE_TTL_SECONDS = 60 * 60
+# 사용자별 즐겨찾기 변경 세대(변경 커밋 후 증가)
+# -> 캐시에는 DB 조회 직전의 세대를 함께 저장하고, 현재 세대와 다르면 사용하지 않음
+# -> 조회와 캐시 저장 사이에 변경이 커밋되어도 오래된 목록이 사용되지 않음
+FAVORITES_GENERATION_KEY = "favorites_gen:{user_id}"
 
 class UserSettingsManager:
     def __init__(self):
         pass
     
     # 즐겨찾기 관리
+    # -> user_favorites 테이블(UNIQUE(user_id, broker, symbol))에 심볼 1개당 1행으로 저장
+    # -> 조회 결과는 사용자별로 Redis에 캐싱하고 변경 시 무효화
+
+    def _invalidate_favorites_cache(self, user_id: int):
+        redis_manager.redis_client.incr(FAVORITES_GENERATION_KEY.format(user_id=user_id))
+
     def add_favorite_symbol(self, user_id: int, broker: str, symbol: str, display_name: Optional[str] = None) -> bool:
         try:
             with get_db_conn() as conn:
                 with conn.cursor() as cursor:
+                    # 중복이면 무시(UNIQUE 제약 조건으로 검사)
                     cursor.execute("""
-                        SELECT setting_data FROM user_settings
-                        WHERE user_id = %s AND setting_type = 'favorites'
-                    """, (user_id,))
-                    
-                    row = cursor.fetchone()
-                    
-                    if row:
-                        favorites = row['setting_data']
-                        
-                        # 중복 검사
-                        for fav in favorites:
-                            if fav['broker'] == broker and fav['symbol'] == symbol:
-                                return False
-                        
-                        # 새 항목 추가
-                        favorites.append({
-                            'broker': broker,
-                            'symbol': symbol,
-                            'display_name': display_name,
-                            'added_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-                        
-                        # 업데이트
-                        cursor.execute("""
-                            UPDATE user_settings
-                            SET setting_data = %s, updated_at = CURRENT_TIMESTAMP
-                            WHERE user_id = %s AND setting_type = 'favorites'
-                        """, (json.dumps(favorites), user_id))
-                    else:
-                        # 새로 생성
-                        favorites = [{
-                            'broker': broker,
-                            'symbol': symbol,
-                            'display_name': display_name,
-                            'added_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        }]
-                        
-                        cursor.execute("""
-                            INSERT INTO user_settings (user_id, setting_type, setting_data)
-                            VALUES (%s, 'favorites', %s)
-                        """, (user_id, json.dumps(favorites)))
-                    
+                        INSERT INTO user_favorites (user_id, broker, symbol, display_name, position)
+                        VALUES (
+                            %s, %s, %s, %s,
+                            (SELECT COALESCE(MAX(position) + 1, 0) FROM user_favorites WHERE user_id = %s)
+                        )
+                        ON CONFLICT (user_id, broker, symbol) DO NOTHING
+                        RETURNING id
+                    """, (user_id, broker, symbol, display_name, user_id))
+                    
+                    added = cursor.fetchone() is not None
                     conn.commit()
-                    return True
+            
+            if added:
+                self._invalidate_favorites_cache(user_id)
+            return added
         except Exception as e:
-            with get_db_conn() as conn:
-                conn.rollback()
+            # 커밋되지 않은 트랜잭션은 커넥션 반환 시 rollback 됨
             print(f"Error adding favorite: {e}")
             return False
     
@@ -69,64 +54,143 @@ class UserSettingsManager:
         try:
             with get_db_conn() as conn:
                 with conn.cursor() as cursor:
-                    # 기존 즐겨찾기 조회
-                    cursor.execute("""
-                        SELECT setting_data FROM user_settings
-                        WHERE user_id = %s AND setting_type = 'favorites'
-                    """, (user_id,))
-                    
-                    row = cursor.fetchone()
-                    
-                    if not row:
-                        return False
-                    
-                    favorites = row['setting_data']
-                    
-                    # 해당 항목 제거
-                    new_favorites = [
-                        fav for fav in favorites
-                        if not (fav['broker'] == broker and fav['symbol'] == symbol)
-                    ]
-                    
-                    if len(new_favorites) == len(favorites):
-                        return False  # 제거할 항목 없음
-                    
-                    # 업데이트
                     cursor.execute("""
-                        UPDATE user_settings
-                        SET setting_data = %s, updated_at = CURRENT_TIMESTAMP
-                        WHERE user_id = %s AND setting_type = 'favorites'
-                    """, (json.dumps(new_favorites), user_id))
+                        DELETE FROM user_favorites
+                        WHERE user_id = %s AND broker = %s AND symbol = %s
+                        RETURNING id
+                    """, (user_id, broker, symbol))
                     
+                    removed = cursor.fetchone() is not None
                     conn.commit()
-                    return True
+            
+            if removed:
+                self._invalidate_favorites_cache(user_id)
+            return removed
         except Exception as e:
-            with get_db_conn() as conn:
-                conn.rollback()
             print(f"Error removing favorite: {e}")
             return False
     
-    def get_favorite_symbols(self, user_id: int, broker: Optional[str] = None) -> List[Dict]:
+    def bulk_update_favorites(
+        self,
+        user_id: int,
+        add: List[Dict],
+        remove: List[Dict],
+        order: Optional[List[Dict]] = None
+    ) -> Optional[Dict[str, int]]:
+        """
+        즐겨찾기 추가/삭제/순서 변경을 하나의 트랜잭션으로 처리
+
+        Args:
+            user_id: 사용자 ID
+            add: 추가할 항목 리스트 [{"broker", "symbol", "display_name"}]
+            remove: 삭제할 항목 리스트 [{"broker", "symbol"}]
+            order: 새 표시 순서 [{"broker", "symbol"}] (없으면 순서 유지)
+
+        Returns:
+            {"added", "removed", "reordered"} 처리 건수 또는 실패 시 None
+        """
         try:
             with get_db_conn() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT setting_data FROM user_settings
-                        WHERE user_id = %s AND setting_type = 'favorites'
-                    """, (user_id,))
-                    
-                    row = cursor.fetchone()
-                    
-                    if not row:
-                        return []
-                    
-                    favorites = row['setting_data']
-                    
-                    # broker 필터링
-                    if broker:
-                        favorites = [fav for fav in favorites if fav['broker'] == broker]
+                    removed = 0
+                    if remove:
+                        cursor.execute("""
+                            DELETE FROM user_favorites f
+                            USING unnest(%s::text[], %s::text[]) AS r(broker, symbol)
+                            WHERE f.user_id = %s AND f.broker = r.broker AND f.symbol = r.symbol
+                        """, (
+                            [fav["broker"] for fav in remove],
+                            [fav["symbol"] for fav in remove],
+                            user_id
+                        ))
+                        removed = cursor.rowcount
+                    
+                    added = 0
+                    if add:
+                        # 새 항목은 기존 목록 뒤에 요청 순서대로 추가
+                        cursor.execute("""
+                            INSERT INTO user_favorites (user_id, broker, symbol, display_name, position)
+                            SELECT
+                                %s, a.broker, a.symbol, a.display_name,
+                                (SELECT COALESCE(MAX(position) + 1, 0) FROM user_favorites WHERE user_id = %s)
+                                    + a.ordinality - 1
+                            FROM unnest(%s::text[], %s::text[], %s::text[])
+                                WITH ORDINALITY AS a(broker, symbol, display_name, ordinality)
+                            ON CONFLICT (user_id, broker, symbol) DO NOTHING
+                        """, (
+                            user_id,
+                            user_id,
+                            [fav["broker"] for fav in add],
+                            [fav["symbol"] for fav in add],
+                            [fav.get("display_name") for fav in add]
+                        ))
+                        added = cursor.rowcount
+                    
+                    reordered = 0
+                    if order:
+                        cursor.execute("""
+                            UPDATE user_favorites f
+                            SET position = o.ordinality - 1
+                            FROM unnest(%s::text[], %s::text[])
+                                WITH ORDINALITY AS o(broker, symbol, ordinality)
+                            WHERE f.user_id = %s AND f.broker = o.broker AND f.symbol = o.symbol
+                        """, (
+                            [fav["broker"] for fav in order],
+                            [fav["symbol"] for fav in order],
+                            user_id
+                        ))
+                        reordered = cursor.rowcount
                     
-                    return favorites
+                    conn.commit()
+            
+            self._invalidate_favorites_cache(user_id)
+            return {
+                "added": added,
+                "removed": removed,
+                "reordered": reordered,
+            }
+        except Exception as e:
+            print(f"Error updating favorites: {e}")
+            return None
+    
+    def get_favorite_symbols(self, user_id: int, broker: Optional[str] = None) -> List[Dict]:
+        try:
+            cache_key = FAVORITES_CACHE_KEY.format(user_id=user_id)
+            pipe = redis_manager.redis_client.pipeline(transaction=False)
+            pipe.get(cache_key)
+            pipe.get(FAVORITES_GENERATION_KEY.format(user_id=user_id))
+            cached, generation = pipe.execute()
+            generation = int(generation or 0)
+            
+            # 세대 정보가 없는 이전 형식(리스트)의 캐시는 사용하지 않음
+            cached = json.loads(cached) if cached is not None else None
+            if isinstance(cached, dict) and cached.get("generation") == generation:
+                favorites = cached["favorites"]
+            else:
+                with get_db_conn() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("""
+                            SELECT
+                                broker, symbol, display_name,
+                                to_char(added_at, 'YYYY-MM-DD HH24:MI:SS') AS added_at
+                            FROM user_favorites
+                            WHERE user_id = %s
+                            ORDER BY position, id
+                        """, (user_id,))
+                        
+                        favorites = [dict(row) for row in cursor.fetchall()]
+                
+                redis_manager.redis_client.set(
+                    name=cache_key,
+                    value=json.dumps({"generation": generation, "favorites": favorites}),
+                    ex=FAVORITES_CACHE_TTL_SECONDS
+                )
+            
+            # broker 필터링
+            if broker:
+                favorites = [fav for fav in favorites if fav['broker'] == broker]
+            
+            return favorites
         except Exception as e:
             print(f"Error getting favorites: {e}")
             return []
@@ -12,6 +12,16 @@ class AddFavoriteRequest(BaseModel):
     symbol: str
     display_name: Optional[str] = None
 
+class FavoriteKey(BaseModel):
+    broker: str
+    symbol: str
+
+class BulkFavoritesRequest(BaseModel):
+    add: List[AddFavoriteRequest] = []
+    remove: List[FavoriteKey] = []
+    # 전체 표시 순서 (없으면 기존 순서 유지)
+    order: Optional[List[FavoriteKey]] = None
+
 class FavoriteSymbol(BaseModel):
     broker: str
     symbol: str
@@ -31,7 +41,7 @@ def get_db():
         pass
 
 @router.post("/add")
-async def add_favorite(
+def add_favorite(
     request: AddFavoriteRequest,
     current_user: Dict[str, Any] = Depends(get_current_user),
     db: UserSettingsManager = Depends(get_db)
@@ -51,7 +61,7 @@ async def add_favorite(
         return {"message": "Already in favorites", "success": False}
 
 @router.delete("/remove")
-async def remove_favorite(
+def remove_favorite(
     broker: str,
     symbol: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
@@ -67,7 +77,7 @@ async def remove_favorite(
         raise HTTPException(status_code=404, detail="Not found in favorites")
 
 @router.get("/list", response_model=List[FavoriteSymbol])
-async def get_favorites(
+def get_favorites(
     broker: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(get_current_user),
     db: UserSettingsManager = Depends(get_db)
@@ -77,3 +87,25 @@ async def get_favorites(
     favorites = db.get_favorite_symbols(user_id, broker)
     return favorites
 
+@router.post("/bulk")
+def bulk_update_favorites(
+    request: BulkFavoritesRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    db: UserSettingsManager = Depends(get_db)
+):
+    """
+    즐겨찾기 추가/삭제/순서 변경을 한 번에 처리 (단일 트랜잭션)
+    """
+    user_id = current_user["user_id"]
+    
+    result = db.bulk_update_favorites(
+        user_id,
+        [fav.model_dump() for fav in request.add],
+        [fav.model_dump() for fav in request.remove],
+        [fav.model_dump() for fav in request.order] if request.order is not None else None
+    )
+    
+    if result is None:
+        raise HTTPException(status_code=500, detail="Failed to update favorites")
+    
+    return {"message": "Favorites updated", "success": True, **result}
@@ -71,6 +71,20 @@ CREATE TABLE IF NOT EXISTS user_settings (
 CREATE INDEX idx_user_settings_user_id ON user_settings(user_id);
 CREATE INDEX idx_user_settings_type ON user_settings(user_id, setting_type);
 
+-- 즐겨찾기 심볼 (사용자별 1행 = 심볼 1개)
+CREATE TABLE IF NOT EXISTS user_favorites (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    broker TEXT NOT NULL,                -- 거래소/브로커명 (예: 'Binance', 'KIS')
+    symbol TEXT NOT NULL,                -- 심볼 (예: 'BTCUSDT', 'NVDA')
+    display_name TEXT,
+    position INTEGER NOT NULL DEFAULT 0, -- 표시 순서
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, broker, symbol)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_favorites_user_position ON user_favorites(user_id, position);
+
 -- 토큰 저장 데이터베이스
 CREATE TABLE IF NOT EXISTS user_tokens (
     id SERIAL PRIMARY KEY,
@@ -0,0 +1,39 @@
+-- ==========================================
+-- 001. 즐겨찾기 user_settings(JSONB 배열) -> user_favorites(심볼 1개당 1행)
+-- ==========================================
+-- 기존 데이터베이스에 적용(여러 번 실행해도 결과 동일)
+-- sudo -u postgres psql -d tedb -f ./database/migrations/001_user_favorites.sql
+
+CREATE TABLE IF NOT EXISTS user_favorites (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    broker TEXT NOT NULL,                -- 거래소/브로커명 (예: 'Binance', 'KIS')
+    symbol TEXT NOT NULL,                -- 심볼 (예: 'BTCUSDT', 'NVDA')
+    display_name TEXT,
+    position INTEGER NOT NULL DEFAULT 0, -- 표시 순서
+    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, broker, symbol)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_favorites_user_position ON user_favorites(user_id, position);
+
+-- 기존 user_settings 의 favorites(JSONB 배열) 데이터 이관
+-- -> 이미 이관된 심볼은 UNIQUE 제약 조건으로 무시
+INSERT INTO user_favorites (user_id, broker, symbol, display_name, position, added_at)
+SELECT
+    s.user_id,
+    f.value->>'broker',
+    f.value->>'symbol',
+    f.value->>'display_name',
+    (f.ordinality - 1)::INTEGER,
+    COALESCE((f.value->>'added_at')::TIMESTAMP, CURRENT_TIMESTAMP)
+FROM user_settings s,
+    jsonb_array_elements(s.setting_data) WITH ORDINALITY AS f(value, ordinality)
+WHERE s.setting_type = 'favorites'
+ON CONFLICT (user_id, broker, symbol) DO NOTHING;
+
+-- 권한 설정(init_schema.sql 과 동일)
+GRANT ALL PRIVILEGES ON user_favorites TO teuser;
+GRANT ALL PRIVILEGES ON SEQUENCE user_favorites_id_seq TO teuser;
+GRANT SELECT, INSERT, UPDATE, DELETE ON user_favorites TO backend_user;
+GRANT USAGE, SELECT ON SEQUENCE user_favorites_id_seq TO backend_user;
@@ -64,16 +64,25 @@ export const WebSocketProvider: React.FC<{ children: ReactNode }> = ({ children
           if (data.type === 'ping') {
             return;
           }
+
+          // 브로커 재연결 알림 무시(재연결 동안 누락된 데이터가 있을 수 있음)
+          if (data.type === 'gap') {
+            return;
+          }
           
           // 등록된 모든 콜백 호출
           const callbacks = callbacksRef.current.get(key);
           if (callbacks) {
-            callbacks.forEach(cb => {
-              try {
-                cb(data);
-              } catch (error) {
-                console.error('Callback error:', error);
-              }
+            // KIS는 한 프레임의 여러 레코드를 리스트로 묶어 전송
+            const items = Array.isArray(data) ? data : [data];
+            items.forEach(item => {
+              callbacks.forEach(cb => {
+                try {
+                  cb(item);
+                } catch (error) {
+                  console.error('Callback error:', error);
+                }
+              });
             });
           }
         } catch (error) {
@@ -156,15 +165,24 @@ export const WebSocketProvider: React.FC<{ children: ReactNode }> = ({ children
           if (data.type === 'ping') {
             return;
           }
+
+          // 브로커 재연결 알림 무시(재연결 동안 누락된 데이터가 있을 수 있음)
+          if (data.type === 'gap') {
+            return;
+          }
           
           const callbacks = callbacksRef.current.get(key);
           if (callbacks) {
-            callbacks.forEach(cb => {
-              try {
-                cb(data);
-              } catch (error) {
-                console.error('Callback error:', error);
-              }
+            // KIS는 한 프레임의 여러 레코드를 리스트로 묶어 전송
+            const items = Array.isArray(data) ? data : [data];
+            items.forEach(item => {
+              callbacks.forEach(cb => {
+                try {
+                  cb(item);
+                } catch (error) {
+                  console.error('Callback error:', error);
+                }
+              });
             });
           }
         } catch (error) {
@@ -100,7 +100,14 @@ const OpenOrder: React.FC<OpenOrderProps> = ({ broker, onRefreshRequest }) => {
           console.error(`Order update error:`, message.message);
           return;
         }
-        
+
+        // 브로커 재연결 알림(연결이 끊긴 동안의 주문 업데이트 누락 가능) -> 목록 다시 조회
+        if (message.type === 'gap') {
+          console.log(`Order update gap, refetching orders`);
+          fetchOrders();
+          return;
+        }
+
         // 주문 업데이트 데이터 처리
         if (message.type === 'userdata' && message.data) {
           const orderData = message.data;
@@ -108,9 +115,21 @@ const OpenOrder: React.FC<OpenOrderProps> = ({ broker, onRefreshRequest }) => {
           
           // 주문 체결
           if (orderData.order_status === 'TRADE') {
-            setOpenOrders(prev => 
-              prev.filter(order => order.order_id !== orderData.order_id)
-            );
+            // 부분 체결이면 잔여 수량만 갱신, 전량 체결이면 목록에서 제거
+            const remaining = orderData.remaining_quantity;
+            if (remaining !== undefined && parseFloat(remaining) > 0) {
+              setOpenOrders(prev =>
+                prev.map(order =>
+                  order.order_id === orderData.order_id
+                    ? { ...order, amount: String(remaining) }
+                    : order
+                )
+              );
+            } else {
+              setOpenOrders(prev =>
+                prev.filter(order => order.order_id !== orderData.order_id)
+              );
+            }
             showToast.success(`Order filled: ${orderData.symbol} ${orderData.side} @ ${orderData.price}`);
           }
           // 주문 취소
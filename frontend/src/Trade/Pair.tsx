@@ -88,9 +88,8 @@ const Pair: React.FC<PairProps> = ({ broker: propBroker }) => {
     pair.symbol.toLowerCase().includes(searchTerm.toLowerCase())
   );
 
-  const modalFilteredPairs = allSymbols.filter(pair => 
-    pair.symbol.toLowerCase().includes(modalSearchTerm.toLowerCase())
-  );
+  // 모달 검색은 서버에서 처리(/symbols/{broker}/search)
+  const modalFilteredPairs = allSymbols;
   
   // 즐겨찾기 토글 핸들러
   const toggleFavorite = async (symbol: string, displayName: string, event: React.MouseEvent) => {
@@ -161,19 +160,28 @@ const Pair: React.FC<PairProps> = ({ broker: propBroker }) => {
     }
   };
 
-    // 모달이 열릴 때 심볼 목록 가져오기
+    // 모달이 열려 있는 동안 검색어가 바뀌면 심볼 검색(입력 중에는 요청하지 않도록 지연)
   useEffect(() => {
-    if (isModalOpen) {
-      fetchSymbols(effectiveBroker);
+    if (!isModalOpen) {
+      return;
     }
-  }, [isModalOpen, effectiveBroker]);
 
-  const fetchSymbols = async (selectedBroker: string) => {
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetchSymbols(effectiveBroker, modalSearchTerm, controller.signal);
+    }, 150);
+
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [isModalOpen, effectiveBroker, modalSearchTerm]);
+
+  const fetchSymbols = async (selectedBroker: string, query: string, signal: AbortSignal) => {
     setIsLoading(true);
-    setAllSymbols([]); // 기존 목록 초기화
     try {
-      const url = `${API_URL}/symbols/${selectedBroker}`;
-      const response = await fetch(url);
+      const url = `${API_URL}/symbols/${selectedBroker}/search?q=${encodeURIComponent(query)}&limit=50`;
+      const response = await fetch(url, { signal });
       const data = await response.json();
       
       if (data.message === 'success' && data.symbols && Array.isArray(data.symbols)) {
@@ -197,9 +205,15 @@ const Pair: React.FC<PairProps> = ({ broker: propBroker }) => {
         setAllSymbols(formattedSymbols);
       }
     } catch (error) {
+      // 새 검색어로 취소된 요청은 무시
+      if ((error as Error).name === 'AbortError') {
+        return;
+      }
       console.error('Failed to fetch symbols:', error);
     } finally {
-      setIsLoading(false);
+      if (!signal.aborted) {
+        setIsLoading(false);
+      }
     }
   };
 
@@ -290,7 +304,7 @@ const Pair: React.FC<PairProps> = ({ broker: propBroker }) => {
 
             {/* 페어 목록 */}
             <div className="flex-1 overflow-y-auto space-y-2 scrollbar-thin scrollbar-thumb-gray-600 scrollbar-track-gray-800">
-              {isLoading ? (
+              {isLoading && allSymbols.length === 0 ? (
                 <div className="text-center text-gray-400 py-8">
                   <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-blue-500 mx-auto"></div>
                   <p className="mt-2">Loading symbols...</p>
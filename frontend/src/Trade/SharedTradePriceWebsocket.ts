@@ -85,10 +85,19 @@ export const useSharedTradeWebSocket = (broker: string, symbol: string): TradeDa
             ws.close(1008, 'Authentication failed');
             return;
           }
+
+          // 브로커 재연결 알림 무시(재연결 동안 누락된 데이터가 있을 수 있음)
+          if (data.type === 'gap') {
+            return;
+          }
           
-          sharedState.data = data;
-          // 모든 리스너에게 데이터 전달
-          sharedState.listeners.forEach(l => l(data));
+          // KIS는 한 프레임의 여러 체결을 리스트로 묶어 전송
+          const items = Array.isArray(data) ? data : [data];
+          items.forEach(item => {
+            sharedState.data = item;
+            // 모든 리스너에게 데이터 전달
+            sharedState.listeners.forEach(l => l(item));
+          });
         } catch (error) {
           console.error('WebSocket message parse error:', error);
         }